@@ -5,339 +5,459 @@ Raw Data Cleaner for the Olympics Data Base
 __author__ = "Minjae Lee, 45363809"
 
 
-from assign1_utilities import get_column, replace_column, truncate_string
+import argparse
+import sys
 
-def remove_athlete_id(row) :    # Removes athlete id
-    
-    """ Remove data in every column 0 (Athlete Identifier) from every row
+from assign1_utilities import parse_row, rewrite_columns, truncate_string
+from assign1_rules import compile_rules, compile_schema, chain_checks
+from assign1_rules import ColumnCaches, RuleProfiler, WARM_UP_ROWS
+from assign1_io import read_input_blocks, prefetch, BulkWriter, BackgroundWriter
+from assign1_io import STANDARD_STREAM
+from assign1_index import rule_mask, IndexWriter
+from assign1_stats import DataStatistics
+from assign1_dedup import DuplicateFilter, MEMORY_LIMIT, ERROR_RATE, BLOOM_CAPACITY
+from assign1_events import find_event_violations, MEMORY_BUDGET
+from assign1_partition import PartitionedWriter, MAX_OPEN_FILES
+
+
+MEDAL_NAMES = {"GOLD": "Gold", "SILVER": "Silver", "BRONZE": "Bronze"}  # Correct casing of each medal
+LEGAL_CHARACTERS = " abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890-'"   # Legal in names
+# The 8 character limit on column 12 has always counted the end of line, which
+# parse_row leaves out of the last column, so 8 characters there are corrupt.
+LAST_COLUMN_LIMIT = 7
+COLUMN_COUNT = 12       # Columns in each row of the raw data file
+
+def fix_medal_name(medal):     # Fix casing of one medal name
+
+    """ Return the medal name with correct letter casing.
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        medal (str): Data from the Medal column.
 
     Return:
-        str: Updated row with blank("")/no data in column 1.
+        str: "Gold", "Silver" or "Bronze" for a valid medal in any casing,
+             otherwise 'medal' unchanged.
     """
-    row = replace_column(row,"", 0)     # First column of data now contain blank ""
-    # Column number '0' actually indicates column 1, as according to the property of array
-    return row[1:]          # Remove first column of the string altogether
+    return MEDAL_NAMES.get(medal.upper(), medal)
+
+def truncate_30(data):     # Truncates one column to 30 characters
 
-def max_char_30(row):  # Truncates sport, atheletes' first and family name to 30 characters
-    
-    """ Truncate data in indicated column to 30 characters. 
+    """ Return data truncated to 30 characters.
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        data (str): Data from one column of the row.
 
     Return:
-        str: Updated row with truncated data in columns 1 ~ 4.
+        str: First 30 characters of 'data'.
     """
-    for i in range(4):                      
-        row_update = get_column(row, i)     # row_update now contain data from row and in the 'i' value of column
-        row_updated = truncate_string(row_update, 30)   # Truncates string to 30 characters and stores in row_updated
-        row = replace_column(row, row_updated, i)       # Updated data replaces the exisiting data at indicated column in the row  
-    return row
-
-def max_char_corrupt(row): # Check maximum character length and corrupts them if exceeded
-    
-    """ Return a boolean if data at the indicated column in the row is satisfied by a condition.. 
+    return truncate_string(data, 30)
+
+# Corruption rules, in the order they are checked. Each is named after the
+# function that used to check it, e.g. for profiling (see assign1_rules for
+# the kinds of rule and their arguments).
+ATHLETE_SCHEMA = [
+    ("check_missing_entry", "required", {"columns": (0, 1, 2, 3, 4)}),
+    ("max_char_corrupt", "max_length",
+     {"limits": {4: 3, 5: 3, 6: 6, 7: 8, 8: 6, 9: 8, 10: 8, 11: LAST_COLUMN_LIMIT}}),
+    ("check_valid_medal", "enum",
+     {"column": 8, "values": ("GOLD", "SILVER", "BRONZE", ""), "ignore_case": True}),
+    ("check_col_6_7_8", "exactly_one", {"columns": (6, 7), "when": (5, "whole")}),
+    ("check_col_9_6", "mapping",
+     {"key": 5, "column": 8, "values": {"1": "GOLD", "2": "SILVER", "3": "BRONZE"},
+      "ignore_case": True}),
+    ("check_world_olympic_record", "equal", {"column": 10, "other": 9}),
+    ("rule_place", "format",
+     {"columns": (5,), "format": "whole", "allow": ("DNS", "DNF", "PEN", "")}),
+    ("rule_illegal_character", "charset",
+     {"columns": (1, 2, 3, 4), "characters": LEGAL_CHARACTERS}),
+    ("rule_numbers", "format",
+     {"columns": (6, 7, 9, 10, 11), "format": "decimal", "first_present": True}),
+]
+
+ATHLETE_RULES = compile_rules(ATHLETE_SCHEMA)     # (name, check) of each rule
+
+_check_schema = compile_schema(ATHLETE_SCHEMA)
+
+def is_corrupt(fields) :
+    """ Return True if any of the corruption rules is satisfied by the row.
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        fields (list[str]): Data in each column of the row (see parse_row).
 
     Return:
-        bool: Corrupt is True for 'row' data in the indicated column.
-        
-    Preconditions:
-        corrupt = False
+        bool: True if the row is corrupt.
     """
-    corrupt = False     # Assign corrupt as a boolean variable
-    for i in range (12):    
-        if 4 <= i <= 5:                         # For column 5 to 6    
-            row_update = get_column(row, i)     # Stores a string from the indicated 'i' value of column of row
-            if len(row_update) > 3:             
-                corrupt = True                  # Corrupt if the length of the characters in 'row_update' > 3
-        elif i == 6 or i == 8:                  # For column 7 or 9
-            row_update = get_column(row, i)
-            if len(row_update) > 6:             
-                corrupt = True                  # Corrupt if length > 6 character limit
-        elif i == 7 or i == 9 or i == 10 or i == 11:    # Apply to column 8,10,11,12
-            row_update = get_column(row, i)
-            if len(row_update) > 8:                     
-                corrupt = True                          # Corrupt if length exceeds max 8 char length
-    return corrupt
-
-def check_missing_entry(row):   # Corrupt if any missing entries in columns 1 to 5
-    
-    """ Return a boolean if data at the indicated column in the row is satisfied by a condition..  
+    return _check_schema(fields)
+
+# Transforms applied to each column of the cleaned row (column number: function)
+CLEAN_TRANSFORMS = {1: truncate_30, 2: truncate_30, 3: truncate_30,     # Sport and names
+                    4: str.upper,                                       # Country code
+                    8: fix_medal_name}                                  # Medal
+REMOVED_COLUMNS = frozenset([0])                                        # Athlete Identifier
+CACHED_COLUMNS = frozenset([1, 4, 5, 8])        # Columns with few distinct values (event,
+                                                # country, place, medal); names are not
+
+# Columns summarised by a dry run (see dry_run)
+DISTINCT_COLUMNS = {1: "Sport", 4: "Country"}       # Column number: name
+NUMERIC_COLUMNS = {5: ("Place", 0, 100, 20),        # Column number: (name, histogram
+                   6: ("Score", 0, 100, 20),        # low, high, number of buckets)
+                   7: ("Time", 0, 1000, 20),
+                   9: ("Olympic Record", 0, 1000, 20),
+                   10: ("World Record", 0, 1000, 20),
+                   11: ("Track Record", 0, 1000, 20)}
+
+def cached_transforms(caches) :
+    """ Return CLEAN_TRANSFORMS with each transform memoized in a column cache.
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        caches (ColumnCaches): Caches to memoize the transforms in.
 
     Return:
-        bool: Corrupt is True for 'row' data in the indicated column.
-        
-    Preconditions:
-        corrupt = False
+        dict[int, callable]: Memoized transform for each column.
     """
-    corrupt = False     # Assign corrupt as a boolean variable
-    for i in range(5):
-        if 0 <= i <= 4:     # Apply to column 1 to 5
-            row_update = get_column(row, i) # String containing the data from indicated column
-            if row_update == "":        # Corrupt if value is missing/blank
-                corrupt = True
-    return corrupt
-
-def check_valid_medal(row):     # Check for non-legal values in the Medal column
-    
-    """ Return a boolean if data at the indicated column in the row is satisfied by a condition.. 
+    memo = caches.memoizer("clean_row")
+    return dict([(column, memo(column, transform))
+                 for column, transform in CLEAN_TRANSFORMS.items()])
+
+def clean_row(fields, corrupt, transforms=None) :
+    """ Return the cleaned output line for one parsed row.
+
+    All column transforms (see CLEAN_TRANSFORMS) are applied in a single pass
+    and the row is joined only once.
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        fields (list[str]): Data in each column of the row (see parse_row).
+        corrupt (bool): True if the row failed one of the corruption rules.
+        transforms (dict[int, callable]): Transforms to apply instead of
+                                          CLEAN_TRANSFORMS, e.g. memoized ones.
 
     Return:
-        bool: Corrupt is True for 'row' data in the indicated column.
-        
-    Preconditions:
-        corrupt = False
+        str: Cleaned row in CSV format, marked CORRUPT if 'corrupt'.
     """
-    corrupt = False                     # Assign corrupt as a boolean variable
-    row_update = get_column(row, 8)     # Obtain a string from the Medal Column 
-    row_updated = row_update.upper()    # Uppercases the string obtained
-    # Upper casing all characters in the string is convenient for checking conditions below
-    if row_updated == "GOLD" or row_updated == "SILVER" or row_updated == "BRONZE" or row_updated == "":
-        pass            
-    else:
-        corrupt = True
-    return corrupt
-
-def fix_medal_letters(row):     # Fix medal name (upper/lower case)
+    transforms = transforms or CLEAN_TRANSFORMS
+    if corrupt :
+        return rewrite_columns(fields, transforms, REMOVED_COLUMNS, ["CORRUPT"])
+    return rewrite_columns(fields, transforms, REMOVED_COLUMNS)
 
-    """ Fix letter casing of valid medal names. 
+def clean_raw_row(row, corrupt_check=None, transforms=None) :
+    """ Return the cleaned output line for one raw row of the data file.
 
     Parameters:
         row (str): String of data with comma separators (CSV format).
+        corrupt_check (callable): is_corrupt(fields) function to check the row
+                                  with (None for is_corrupt).
+        transforms (dict[int, callable]): See clean_row.
 
     Return:
-        str: Updated row with correct casing of medal names.
+        str: Cleaned row in CSV format, marked CORRUPT if any rule failed.
     """
-    row_update = get_column(row, 8)             # A new variable store string from the Medal Column
-    row_updated = row_update.upper()            # Uppercases the string contained in row_update and stores it in row_updated 
-    if row_updated == "GOLD":                   
-        row = replace_column(row, "Gold", 8)    # Fix GOLD as Gold in the indicated column in the row
-    elif row_updated == "SILVER":       
-        row = replace_column(row, "Silver", 8)  # Fix SILVER as Silver
-    elif row_updated == "BRONZE":
-        row = replace_column(row, "Bronze", 8)  # Fix Bronze as Bronze
-    return row
-    
-def upper_case_country(row):    # Upper cases country code
-    """ Upper case all values in the Country Code column. 
+    fields = parse_row(row)     # Split the row into its columns once, for every rule below
+    return clean_row(fields, (corrupt_check or is_corrupt)(fields), transforms)
+
+def clean_rows(rows, corrupt_check=None, transforms=None) :
+    """ Return the cleaned output for a block of raw rows.
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        rows (list[str]): Raw rows of the data file, in file order.
+        corrupt_check (callable): See clean_raw_row.
+        transforms (dict[int, callable]): See clean_row.
 
     Return:
-        str: Updated row with upper casing of country code.
+        str: Cleaned rows in CSV format, in the same order.
     """
-    row_update = get_column(row, 4)             # String from column 4 in the row
-    row_updated = row_update.upper()            # Upper cases the string
-    row = replace_column(row, row_updated, 4)   # Store updated string in the indicated column in row
-    return row
+    corrupt_check = corrupt_check or is_corrupt
+    transforms = transforms or CLEAN_TRANSFORMS
+    return "".join([clean_raw_row(row, corrupt_check, transforms) for row in rows])
 
-def check_col_6_7_8(row):   # Corrupt if the value stored in column 6 is a whole number and occupied entries in BOTH column 7,8
-                           # Also corrupt if no values stored in column 7,8 in row
-    """ Return a boolean if data at the indicated column in the row is satisfied by a condition.  
+def clean_rows_deduplicated(rows, duplicates, drop=False, corrupt_check=None, transforms=None) :
+    """ Return the cleaned output for a block of raw rows, finding duplicate rows.
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        rows (list[str]): Raw rows of the data file, in file order.
+        duplicates (DuplicateFilter): Filter that has seen the earlier rows.
+        drop (bool): Leave duplicate rows out, instead of marking them DUPLICATE.
+        corrupt_check (callable): See clean_raw_row.
+        transforms (dict[int, callable]): See clean_row.
 
     Return:
-        bool: Corrupt is True for 'row' data in the indicated column.
-        
-    Preconditions:
-        corrupt = False
+        str: Cleaned rows in CSV format, in the same order.
     """
-    corrupt = False                     # Assign corrupt as a boolean variable
-    row_update = get_column(row, 5)     # Obtain string from column 6 in row
-    if row_update.isdigit():            # Determine if the string is a digit
-        # Digit indicates a WHOLE number
-        if len(get_column(row, 6)) > 0 and len(get_column(row, 7)) > 0: # Check if both column 7,8 store a value
-            corrupt = True
-        elif len(get_column(row, 6)) == 0 and len(get_column(row, 7)) == 0: # Check if both column 7,8 are empty entries
-            corrupt = True
-        else:
-            pass
-        return corrupt
-
-def check_col_9_6(row):                  # Check if the value in column 6 is appropriate to the respective data in column 9
-    """ Return a boolean if data at the indicated column in the row is satisfied by a condition.  
+    corrupt_check = corrupt_check or is_corrupt
+    transforms = transforms or CLEAN_TRANSFORMS
+    cleaned = []
+    for row in rows :
+        fields = parse_row(row)
+        duplicate = duplicates.is_duplicate(fields)
+        if duplicate and drop :
+            continue
+        markers = ["CORRUPT"] if corrupt_check(fields) else []
+        if duplicate :
+            markers.append("DUPLICATE")
+        cleaned.append(rewrite_columns(fields, transforms, REMOVED_COLUMNS, markers))
+    return "".join(cleaned)
+
+def clean_rows_indexed(rows, offset, rules=None, transforms=None) :
+    """ Return the cleaned output for a block of raw rows, checking every rule
+    of every row, and the index record of each row (see assign1_index).
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        rows (list[str]): Raw rows of the data file, in file order.
+        offset (int): Byte offset of the first row in the cleaned data file.
+        rules (list[tuple<str, callable>]): Rules to check (None for ATHLETE_RULES).
+        transforms (dict[int, callable]): See clean_row.
 
     Return:
-        bool: Corrupt is True for 'row' data in the indicated column.
-        
-    Preconditions:
-        corrupt = False
+        tuple<str, list[tuple<int, int>], int>: Cleaned rows in CSV format, the
+            (offset, rule mask) of each of them, and the offset after the block.
     """
-    corrupt = False                     # Assign corrupt as a boolean variable
-    row_update = get_column(row, 8)     # String from the Medal column
-    medal = row_update.upper()          # Variable 'medal' no store the upper cased string
-    place = get_column(row, 5)          # Store a value from the Place column in 'place' variable
-    if place == "1" and medal != "GOLD":
-        corrupt = True                  # Corrupt if 1st place but no GOLD medal
-    elif place == "2" and medal != "SILVER":
-        corrupt = True                  # Corrupt if 2nd place but no SILVER medal
-    elif place == "3"and medal != "BRONZE":
-        corrupt = True                  # Corrupt if 3rd place but no BRONZE medal
-    return corrupt
-
-def check_world_olympic_record(row):    # Check if the world record corresponds to the olympic record
-    """ Return a boolean if data at the indicated column in the row is satisfied by conditions.  
+    rules = rules or ATHLETE_RULES
+    cleaned = []
+    records = []
+    for row in rows :
+        fields = parse_row(row)
+        mask = rule_mask(rules, fields)
+        line = clean_row(fields, mask != 0, transforms)
+        cleaned.append(line)
+        records.append((offset, mask))
+        offset += len(line) if line.isascii() else len(line.encode("utf-8"))
+    return "".join(cleaned), records, offset
+
+def clean_file(raw_path, clean_path, corrupt_check=None, transforms=None,
+               pipeline=False, index_path=None, rules=None, duplicates=None,
+               drop_duplicates=False) :
+    """ Clean every row of the raw data file into the cleaned data file.
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        raw_path (str): Name of the raw data file, or "-" for standard input.
+                        Compressed files (.gz, .bz2, .xz) are decompressed.
+        clean_path (str): Name of the cleaned data file to (over)write, or "-"
+                          for standard output. Compressed by file name extension.
+        corrupt_check (callable): See clean_raw_row.
+        transforms (dict[int, callable]): See clean_row.
+        pipeline (bool): Read and write in their own threads, so that disk
+                         waits overlap with validation.
+        index_path (str): Also check every rule of every row and write the
+                          offset and rule mask of each row to this index file
+                          (None for no index). 'corrupt_check' is not used.
+        rules (list[tuple<str, callable>]): Rules checked for the index (None
+                                            for ATHLETE_RULES).
+        duplicates (DuplicateFilter): Mark rows with a key seen before as
+                                      DUPLICATE (None to keep every row as is).
+                                      Not used with 'index_path'.
+        drop_duplicates (bool): Leave duplicate rows out instead of marking them.
 
     Return:
-        bool: Corrupt is True for 'row' data in the indicated column.
-        
-    Preconditions:
-        corrupt = False
+        int: Number of rows cleaned.
     """
-    corrupt = False                         # Assign corrupt as a boolean var
-    world_record = get_column(row, 10)      
-    olympic_record = get_column(row, 9)
-    if len(world_record) > 0:               # If entry is occupied in the world record column
-        if world_record != olympic_record:  # Compare world record and olympic record
-            corrupt = True                  # Data is corrupt if two records do not match
-        return corrupt
+    row_count = 0
+    blocks = read_input_blocks(raw_path)
+    clean_data_file = BulkWriter(clean_path)
+    if pipeline :
+        blocks = prefetch(blocks)                           # Reader thread
+        clean_data_file = BackgroundWriter(clean_data_file) # Writer thread
+    if index_path is not None :
+        return _clean_blocks_indexed(blocks, clean_data_file, index_path,
+                                     rules or ATHLETE_RULES, transforms)
+    with clean_data_file :
+        for rows in blocks :
+            # Check for corrupt data in each row, then save the rows to the cleaned data file.
+            if duplicates is not None :
+                clean_data_file.write(clean_rows_deduplicated(
+                    rows, duplicates, drop_duplicates, corrupt_check, transforms))
+            else :
+                clean_data_file.write(clean_rows(rows, corrupt_check, transforms))
+            row_count += len(rows)
+    return row_count
 
-def rule_illegal_character(row):    # Check if there are any illegal characters according to format rules
-    """ Return a boolean if data at the indicated column in the row is satisfied by conditions.  
+def clean_file_partitioned(raw_path, directory, column, corrupt_check=None, transforms=None,
+                           max_open=MAX_OPEN_FILES) :
+    """ Clean every row of the raw data file into one file per value of a column.
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        raw_path (str): Name of the raw data file, or "-" for standard input.
+                        Compressed files (.gz, .bz2, .xz) are decompressed.
+        directory (str): Directory to write the partitions and their manifest
+                         in (see assign1_partition).
+        column (int): Column of the raw data file to partition the rows by.
+                      Partitions are named after its cleaned value, e.g. the
+                      upper case country code.
+        corrupt_check (callable): See clean_raw_row.
+        transforms (dict[int, callable]): See clean_row.
+        max_open (int): Number of partition files open at a time.
 
     Return:
-        bool: Corrupt is True for 'row' data in the indicated column.
-        
-    Preconditions:
-        corrupt = False
+        int: Number of rows cleaned.
     """
-    corrupt = False     # Assign Boolean variable
-    legal_character = " abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890-'"# Assign a list of legal characters
-    row_update = get_column(row, 1)     # String in column 1 in row
-    for c in row_update:                # For every character in the string
-        if c not in legal_character:    # Check if any of these characters belong to 'legal_character' 
-             corrupt = True             # If any character is found to be 'non-legal', data in row is corrupt
-    row_update = get_column(row, 2)     # Same rules apply to corresponding columns as above
-    for c in row_update:                
-        if c not in legal_character:    
-            corrupt = True
-    row_update = get_column(row, 3)     # Same rules apply to corresponding columns as above
-    for c in row_update:
-        if c not in legal_character:
-            corrupt = True
-    row_update = get_column(row, 4)     # Same rules apply to corresponding columns as above
-    for c in row_update:
-        if c not in legal_character:
-            corrupt = True
-    return corrupt
-    
-def rule_place(row):    # Check for any illegal values in the 'Place' column
-    """ Return a boolean if data at the indicated column in the row is satisfied by conditions.  
+    corrupt_check = corrupt_check or is_corrupt
+    transforms = transforms or CLEAN_TRANSFORMS
+    key = transforms.get(column, str)
+    row_count = 0
+    with PartitionedWriter(directory, column, max_open) as partitions :
+        for rows in read_input_blocks(raw_path) :
+            cleaned = []
+            for row in rows :
+                fields = parse_row(row)
+                cleaned.append((key(fields[column]),
+                                clean_row(fields, corrupt_check(fields), transforms)))
+            partitions.write_rows(cleaned)
+            row_count += len(rows)
+    return row_count
+
+def _clean_blocks_indexed(blocks, clean_data_file, index_path, rules, transforms) :
+    """ Clean blocks of rows into the cleaned data file, and index every row.
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        blocks (iterator[list[str]]): Blocks of raw rows, in file order.
+        clean_data_file (BulkWriter): Writer of the cleaned data file.
+        index_path (str): Name of the index file to (over)write.
+        rules (list[tuple<str, callable>]): Rules to check, in bit order.
+        transforms (dict[int, callable]): See clean_row.
 
     Return:
-        bool: Corrupt is True for 'row' data in the indicated column.
-        
-    Preconditions:
-        corrupt = False
+        int: Number of rows cleaned.
     """
-    corrupt = False                 # Assign boolean variable
-    row_update = get_column(row, 5) # Store string from the 'Place' column in row_update
-    if not row_update.isdigit():    # If the string in row_update is not a digit
-            if row_update == "DNS" or row_update == "DNF" or row_update == "PEN" or row_update == "":
-                pass                # Strings such as DNS, DNF, PEN are exceptions
-            else:
-                corrupt = True      # Everything else means corrupted data
-            return corrupt
-        
-def rule_numbers(row):  # Check for any illegal values in the indicated columns
-    """ Return a boolean if data at the indicated column in the row is satisfied by conditions.  
+    row_count = 0
+    offset = 0
+    with clean_data_file, \
+         IndexWriter(index_path, [name for name, check in rules]) as index_file :
+        for rows in blocks :
+            cleaned, records, offset = clean_rows_indexed(rows, offset, rules, transforms)
+            clean_data_file.write(cleaned)
+            index_file.write_records(records)
+            row_count += len(rows)
+    return row_count
+
+def dry_run(raw_path, rules=None) :
+    """ Check every rule of every row of the raw data file and summarise its
+    columns, in one pass, without cleaning or writing anything.
 
     Parameters:
-        row (str): String of data with comma separators (CSV format).
+        raw_path (str): Name of the raw data file, or "-" for standard input.
+                        Compressed files (.gz, .bz2, .xz) are decompressed.
+        rules (list[tuple<str, callable>]): Rules to check (None for ATHLETE_RULES).
 
     Return:
-        bool: Corrupt is True for 'row' data in the indicated column.
-        
-    Preconditions:
-        corrupt = False
+        DataStatistics: Corruption rate of each rule, distinct counts of
+                        DISTINCT_COLUMNS and histograms of NUMERIC_COLUMNS.
     """
-    corrupt = False                             # Assign a boolean variable
-    legal_number_format = "1234567890.\n"       # List of legal numbers('.' accounts for float)
-    # ' \n ' - 'new line' must be assigned to prevent the last column from satisfying the boolean
-    
-    if len(get_column(row, 6)) > 0:             # When column 7 contain a value
-        row_update = get_column(row, 6)         
-        for c in row_update:                    # For every character in the string of column 67in row
-            if c not in legal_number_format:    # Check for characters that do not belong to legal_number_format
-                corrupt = True                  # If illegal, data in row is corrupted
-    elif len(get_column(row, 7)) > 0:           #-- Same rules apply as above for column 8
-        row_update = get_column(row, 7)         
-        for c in row_update:                            
-            if c not in legal_number_format:    
-                corrupt = True                  
-    elif len(get_column(row, 9)) > 0:           #-- Same rules apply as above for column 10
-        row_update = get_column(row, 9)         
-        for c in row_update:                    
-            if c not in legal_number_format:    
-                corrupt = True                  
-    elif len(get_column(row, 10)) > 0:          #-- Same rules apply as above for column 11
-        row_update = get_column(row, 10)        
-        for c in row_update:                    
-            if c not in legal_number_format:    
-                corrupt = True                  
-    elif len(get_column(row, 11)) > 0:          #--Same rules apply as above for column 12
-        row_update = get_column(row, 11)        
-        for c in row_update :                  
-            if c not in legal_number_format:
-                corrupt = True                  
-    return corrupt
+    statistics = DataStatistics(rules or ATHLETE_RULES, DISTINCT_COLUMNS, NUMERIC_COLUMNS)
+    for rows in read_input_blocks(raw_path) :
+        statistics.add_rows(rows)
+    return statistics
+
+def parse_columns(text) :
+    """ Return the column numbers in a comma separated list, e.g. "1,2,3,4".
+
+    Raises:
+        argparse.ArgumentTypeError: If a column is not a number.
+    """
+    try :
+        return [int(column) for column in text.split(",")]
+    except ValueError :
+        raise argparse.ArgumentTypeError("invalid column list: " + repr(text))
 
 def main() :
     """Main functionality of program."""
-    with open("athlete_data.csv", "r") as raw_data_file, \
-         open("athlete_data_clean.csv", "w") as clean_data_file :
-        for row in raw_data_file :
-            corrupt = False     # Assignation of the boolean variable, 'corrupt'
-            
-            # List of functions that check for corrupt data in row
-            # 'or' operator used to prevent functions from overwriting each other's boolean outcome
-            corrupt = (check_missing_entry(row) or max_char_corrupt(row)
-                       or check_valid_medal(row) or check_col_6_7_8(row)
-                       or check_col_9_6(row) or check_world_olympic_record(row)
-                       or rule_place(row) or rule_illegal_character(row)
-                       or rule_numbers(row))
-            
-            row = max_char_30(row)          # Data in 'row' updated accordingly to max_char_30(row) function
-            row = upper_case_country(row)   # Data in 'row' updated accordingly to upper_case_country(row) function
-            row = fix_medal_letters(row)    # Data in 'row' updated accordingly to fix_medal_letters(row) function
-            row = remove_athlete_id(row)    # Remove Athlete ID from data in row
-            
-            row_to_process = row    # Saves row in original state, minus athlete id.
-
-            # Save the row data to the cleaned data file.
-            if not corrupt :
-                clean_data_file.write(row_to_process)
-            else :
-                row = row[:-1]      # Remove new line character at end of row.
-                clean_data_file.write(row + ",CORRUPT\n")    
-        
+    parser = argparse.ArgumentParser(description="Raw Data Cleaner for the Olympics Data Base")
+    parser.add_argument("raw_path", nargs="?", default="athlete_data.csv",
+                        help="raw data file, may be compressed (- for standard input)")
+    parser.add_argument("clean_path", nargs="?", default="athlete_data_clean.csv",
+                        help="cleaned data file, may be compressed (- for standard output)")
+    parser.add_argument("--profile", action="store_true",
+                        help="report the calls, hits and time of each rule")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="reorder the rules by cost per hit after a warm up")
+    parser.add_argument("--warm-up", type=int, default=WARM_UP_ROWS,
+                        help="rows profiled before adaptive reordering")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="read and write in background threads")
+    parser.add_argument("--index", default=None, metavar="INDEX_PATH",
+                        help="check every rule and write a corrupt row index (see assign1_index)")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="memoize up to this many values per column (0 for off)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only report rule failure rates and column statistics")
+    parser.add_argument("--dedup", choices=("flag", "drop"), default=None,
+                        help="mark duplicate rows DUPLICATE, or drop them")
+    parser.add_argument("--dedup-columns", type=parse_columns, default=None,
+                        metavar="COLUMNS", help="columns that identify a row, e.g. 1,2,3,4 "
+                                                "(default all)")
+    parser.add_argument("--dedup-memory", type=int, default=MEMORY_LIMIT // (1024 * 1024),
+                        metavar="MIB", help="MiB of exact keys before using a Bloom filter")
+    parser.add_argument("--dedup-error-rate", type=float, default=ERROR_RATE,
+                        help="false positive rate of the Bloom filter")
+    parser.add_argument("--dedup-capacity", type=int, default=BLOOM_CAPACITY,
+                        help="number of rows the Bloom filter is sized for")
+    parser.add_argument("--events", action="store_true",
+                        help="also mark rows sharing a place, or a gold medal, in an event")
+    parser.add_argument("--events-memory", type=int, default=MEMORY_BUDGET // (1024 * 1024),
+                        metavar="MIB", help="MiB of memory used to check the events")
+    parser.add_argument("--partition-by", type=int, default=None, metavar="COLUMN",
+                        help="write one file per value of this column into the directory "
+                             "clean_path, with a manifest")
+    parser.add_argument("--max-open", type=int, default=MAX_OPEN_FILES,
+                        help="partition files open at a time")
+    args = parser.parse_args()
+    if args.partition_by is not None and (args.index is not None or args.dedup is not None
+                                          or args.pipeline or args.clean_path == STANDARD_STREAM) :
+        parser.error("--partition-by cannot be combined with --index, --dedup, --pipeline "
+                     "or standard output")
+    if args.partition_by is not None and not 0 <= args.partition_by < COLUMN_COUNT :
+        parser.error("--partition-by must be a column from 0 to {0}".format(COLUMN_COUNT - 1))
+    if args.events_memory < 1 :
+        parser.error("--events-memory must be at least 1 MiB")
+    if args.events and args.raw_path == STANDARD_STREAM :
+        parser.error("--events reads the raw data file twice, so it cannot be standard input")
+    if args.dedup is not None and (args.index is not None or args.dry_run) :
+        parser.error("--dedup cannot be combined with --index or --dry-run")
+    if args.dry_run and (args.profile or args.adaptive or args.index is not None) :
+        parser.error("--dry-run checks every rule and writes nothing, so it cannot be "
+                     "profiled, reordered or indexed")
+    if args.index is not None and (args.profile or args.adaptive) :
+        parser.error("--index checks every rule, so it cannot be profiled or reordered")
+
+    caches = ColumnCaches(args.cache_size, CACHED_COLUMNS) if args.cache_size > 0 else None
+    rules = ATHLETE_RULES if caches is None else compile_rules(ATHLETE_SCHEMA, caches)
+    events = None
+    if args.events :
+        events = find_event_violations(args.raw_path, args.events_memory * 1024 * 1024)
+        rules = rules + events.get_rules()      # Checked after the single row rules
+    corrupt_check = None
+    if caches is not None or events is not None :
+        corrupt_check = chain_checks([check for name, check in rules])
+    transforms = None if caches is None else cached_transforms(caches)
+    profiler = None
+    if args.profile or args.adaptive :
+        profiler = RuleProfiler(rules, args.adaptive, args.warm_up)
+        corrupt_check = profiler.is_corrupt
+    duplicates = None
+    if args.dedup is not None :
+        duplicates = DuplicateFilter(args.dedup_columns, args.dedup_memory * 1024 * 1024,
+                                     args.dedup_error_rate, args.dedup_capacity)
+
+    if args.dry_run :
+        print(dry_run(args.raw_path, rules))
+        if caches is not None :
+            print(caches)
+        if events is not None :
+            print(events)
+        return
+    if args.partition_by is not None :
+        clean_file_partitioned(args.raw_path, args.clean_path, args.partition_by,
+                               corrupt_check, transforms, args.max_open)
+    else :
+        clean_file(args.raw_path, args.clean_path, corrupt_check, transforms, args.pipeline,
+                   args.index, rules, duplicates, args.dedup == "drop")
+    report = sys.stderr if args.clean_path == STANDARD_STREAM else sys.stdout   # Keep reports out of the cleaned data
+    if profiler is not None :
+        print(profiler, file=report)
+    if caches is not None :
+        print(caches, file=report)
+    if duplicates is not None :
+        print(duplicates, file=report)
+    if events is not None :
+        print(events, file=report)
+
 
 # Call the main() function if this module is executed
 if __name__ == "__main__" :
@@ -0,0 +1,233 @@
+"""
+Batch cleaning of many raw Olympics data files on a pool of worker processes.
+
+Takes directories, file names or glob patterns, and cleans each raw data file
+found into <name>_clean.csv (keeping any compressed file name extension),
+next to it or in an output directory. Raw files of the same name from
+different directories would be cleaned into the same file of an output
+directory, so such a batch is refused. Files whose cleaned file is newer than
+the raw file are skipped, so a batch can be re-run as new files arrive. The
+workers are started once for the whole batch, and a throughput summary is
+printed at the end.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import argparse
+import glob
+import multiprocessing
+import os
+import time
+
+from assign1 import clean_file
+from assign1_io import COMPRESSED_OPENERS
+
+
+CLEAN_SUFFIX = "_clean"     # Added to the name of a raw data file for its cleaned file
+RAW_EXTENSION = ".csv"      # Extension of raw data files found in a directory
+
+
+def split_name(path) :
+    """ Return the base name of a file without its extensions, and its extensions.
+
+    Parameters:
+        path (str): Name of a file, e.g. "venue/day1.csv.gz".
+
+    Return:
+        tuple<str, str>: e.g. ("day1", ".csv.gz").
+    """
+    name, compression = os.path.splitext(os.path.basename(path))
+    if compression.lower() not in COMPRESSED_OPENERS :
+        name, compression = name + compression, ""
+    name, extension = os.path.splitext(name)
+    return name, extension + compression
+
+
+def is_raw_file(path) :
+    """(bool) True if the file is a (possibly compressed) CSV file that is not
+              itself a cleaned data file.
+    """
+    name, extensions = split_name(path)
+    return (extensions.lower().startswith(RAW_EXTENSION)
+            and not name.endswith(CLEAN_SUFFIX))
+
+
+def find_raw_files(inputs) :
+    """ Return the raw data files in directories, file names and glob patterns.
+
+    Parameters:
+        inputs (list[str]): Directories and glob patterns (every raw data
+                            file in or matching them is used, see is_raw_file),
+                            or names of raw data files.
+
+    Return:
+        list[str]: Names of the raw data files, sorted, without repeats.
+    """
+    raw_paths = set()
+    for name in inputs :
+        if os.path.isdir(name) :
+            raw_paths.update([os.path.join(name, entry) for entry in os.listdir(name)
+                              if is_raw_file(entry)
+                              and os.path.isfile(os.path.join(name, entry))])
+        elif glob.escape(name) != name :
+            raw_paths.update([path for path in glob.glob(name)
+                              if is_raw_file(path) and os.path.isfile(path)])
+        elif os.path.isfile(name) :
+            raw_paths.add(name)
+    return sorted(raw_paths)
+
+
+def clean_path_for(raw_path, output_dir=None) :
+    """ Return the name of the cleaned data file for a raw data file.
+
+    Parameters:
+        raw_path (str): Name of the raw data file.
+        output_dir (str): Directory of the cleaned data file (None for the
+                          directory of the raw data file).
+
+    Return:
+        str: e.g. "out/day1_clean.csv.gz" for "venue/day1.csv.gz".
+    """
+    name, extensions = split_name(raw_path)
+    directory = os.path.dirname(raw_path) if output_dir is None else output_dir
+    return os.path.join(directory, name + CLEAN_SUFFIX + extensions)
+
+
+def check_clean_paths(raw_paths, output_dir=None) :
+    """ Check that no two raw data files are cleaned into the same file, e.g.
+        "venue1/day1.csv" and "venue2/day1.csv" with an output directory.
+
+    Parameters:
+        raw_paths (list[str]): Names of the raw data files.
+        output_dir (str): See clean_path_for.
+
+    Raises:
+        ValueError: if two raw data files have the same cleaned data file.
+    """
+    raw_for = {}            # Raw data file of each cleaned data file
+    for raw_path in raw_paths :
+        clean_path = clean_path_for(raw_path, output_dir)
+        key = os.path.normcase(os.path.abspath(clean_path))
+        if key in raw_for and not os.path.samefile(raw_for[key], raw_path) :
+            raise ValueError("{0} and {1} would both be cleaned into {2}".format(
+                raw_for[key], raw_path, clean_path))
+        raw_for[key] = raw_path
+
+
+def is_up_to_date(raw_path, clean_path) :
+    """(bool) True if the cleaned data file exists and is newer than the raw data file."""
+    try :
+        return os.path.getmtime(clean_path) >= os.path.getmtime(raw_path)
+    except OSError :
+        return False
+
+
+def clean_one(task) :
+    """ Clean one raw data file, in a worker process.
+
+    The cleaned data is written to a temporary file that replaces the cleaned
+    data file once it is complete, so an interrupted batch never leaves a
+    partial file that looks up to date.
+
+    Parameters:
+        task (tuple<str, str>): Names of the raw and cleaned data files.
+
+    Return:
+        tuple<str, int, int, float>: Name of the raw data file, the number of
+                                     rows and bytes cleaned, and the seconds taken.
+    """
+    raw_path, clean_path = task
+    start = time.perf_counter()
+    temp_path = os.path.join(os.path.dirname(clean_path),
+                             ".tmp-{0}-{1}".format(os.getpid(), os.path.basename(clean_path)))
+    try :
+        row_count = clean_file(raw_path, temp_path)
+        os.replace(temp_path, clean_path)
+    finally :
+        if os.path.exists(temp_path) :
+            os.remove(temp_path)
+    return raw_path, row_count, os.path.getsize(raw_path), time.perf_counter() - start
+
+
+def clean_batch(raw_paths, output_dir=None, processes=None, force=False) :
+    """ Clean raw data files on a pool of worker processes.
+
+    Parameters:
+        raw_paths (list[str]): Names of the raw data files.
+        output_dir (str): Directory of the cleaned data files (None for next
+                          to each raw data file). Created if it does not exist.
+        processes (int): Number of worker processes (None for one per CPU).
+        force (bool): Clean files even if their cleaned data file is up to date.
+
+    Return:
+        tuple<list[tuple<str, int, int, float>], list[str]>: Results of each
+            file cleaned (see clean_one), and the names of the files skipped.
+
+    Raises:
+        ValueError: if two raw data files have the same cleaned data file
+                    (see check_clean_paths). Nothing is cleaned.
+    """
+    check_clean_paths(raw_paths, output_dir)
+    if output_dir is not None :
+        os.makedirs(output_dir, exist_ok=True)
+    tasks = []
+    skipped = []
+    for raw_path in raw_paths :
+        clean_path = clean_path_for(raw_path, output_dir)
+        if not force and is_up_to_date(raw_path, clean_path) :
+            skipped.append(raw_path)
+        else :
+            tasks.append((raw_path, clean_path))
+    if not tasks :
+        return [], skipped
+    with multiprocessing.Pool(min(processes or os.cpu_count() or 1, len(tasks))) as pool :
+        results = list(pool.imap_unordered(clean_one, tasks))  # Largest files need not finish first
+    return results, skipped
+
+
+def print_summary(results, skipped, seconds) :
+    """ Print the number of files, rows and bytes cleaned, and the throughput.
+
+    Parameters:
+        results (list[tuple<str, int, int, float>]): See clean_batch.
+        skipped (list[str]): Names of the files skipped.
+        seconds (float): Wall clock time of the whole batch.
+    """
+    row_count = sum([rows for raw_path, rows, byte_count, file_seconds in results])
+    byte_count = sum([byte_count for raw_path, rows, byte_count, file_seconds in results])
+    seconds = max(seconds, 1e-9)
+    print("Files cleaned: {0}   Skipped (up to date): {1}".format(len(results), len(skipped)))
+    print("Rows: {0:,}   MB: {1:.2f}   Seconds: {2:.2f}".format(row_count, byte_count / 1e6,
+                                                              seconds))
+    print("Rows/sec: {0:,.0f}   MB/sec: {1:.2f}".format(row_count / seconds,
+                                                       byte_count / seconds / 1e6))
+
+
+def main() :
+    """Clean the raw data files given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+",
+                        help="directories, raw data files or glob patterns, e.g. 'raw/*.csv.gz'")
+    parser.add_argument("-o", "--output-dir", default=None,
+                        help="directory for the cleaned files (default: next to each raw file)")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="clean files even if their cleaned file is up to date")
+    args = parser.parse_args()
+
+    raw_paths = find_raw_files(args.inputs)
+    try :
+        check_clean_paths(raw_paths, args.output_dir)
+    except ValueError as error :
+        parser.error(str(error))
+
+    start = time.perf_counter()
+    results, skipped = clean_batch(raw_paths, args.output_dir, args.processes, args.force)
+    print_summary(results, skipped, time.perf_counter() - start)
+
+
+# Call the main() function if this module is executed
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,204 @@
+"""
+Throughput benchmark for the Olympics data cleaner.
+
+Reports rows per second, MB per second and peak memory for cleaning a whole
+raw data file (as main() does), and for parsing, each corruption rule and
+cleaning separately on a sample of the file's rows. A raw data file of any
+size can be generated first (see assign1_generate).
+
+The whole file is cleaned once, and its peak memory is the peak resident set
+size of the process (resource.getrusage), so the file is not cleaned again
+under memory tracing. Steps on the sample are traced with tracemalloc.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try :
+    import resource
+except ImportError :        # Not on Windows; the file's peak memory is not reported
+    resource = None
+
+from assign1 import ATHLETE_RULES, clean_file, clean_row
+from assign1_generate import parse_rates, write_raw_file
+from assign1_io import read_row_blocks
+from assign1_utilities import parse_row
+
+
+SAMPLE_ROWS = 100000    # Default number of rows used to benchmark each rule
+
+
+def peak_resident_memory() :
+    """ Return the peak resident set size of this process so far.
+
+    Return:
+        int: Bytes, or None if the platform does not report it.
+    """
+    if resource is None :
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024   # KiB except on macOS
+
+
+def measure(function, row_count, byte_count) :
+    """ Return the throughput and peak memory of one call of the function.
+
+    The function is called twice: once timed, and once with memory tracing
+    (which slows it down) to find its peak memory use.
+
+    Parameters:
+        function (callable): Function of no arguments to be measured.
+        row_count (int): Number of rows the function processes.
+        byte_count (int): Number of bytes the function processes.
+
+    Return:
+        dict: "rows", "seconds", "rows_per_sec", "mb_per_sec" and
+              "peak_memory" (bytes allocated at the peak) of the call.
+    """
+    start = time.perf_counter()
+    function()
+    seconds = max(time.perf_counter() - start, 1e-9)
+
+    tracemalloc.start()
+    try :
+        function()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally :
+        tracemalloc.stop()
+
+    return {"rows": row_count,
+            "seconds": seconds,
+            "rows_per_sec": row_count / seconds,
+            "mb_per_sec": byte_count / seconds / 1e6,
+            "peak_memory": peak_memory}
+
+
+def benchmark_file(raw_path) :
+    """ Return the measurements of cleaning the whole raw data file.
+
+    The file is read once first, to warm the file cache, and cleaned once.
+    Its peak memory is the process's peak resident set size after cleaning
+    (see peak_resident_memory), which includes the interpreter itself.
+
+    Parameters:
+        raw_path (str): Name of the raw data file.
+
+    Return:
+        dict: See measure ("peak_memory" is None where it is not reported).
+    """
+    for rows in read_row_blocks(raw_path) :
+        pass
+    start = time.perf_counter()
+    row_count = clean_file(raw_path, os.devnull)
+    seconds = max(time.perf_counter() - start, 1e-9)
+    return {"rows": row_count,
+            "seconds": seconds,
+            "rows_per_sec": row_count / seconds,
+            "mb_per_sec": os.path.getsize(raw_path) / seconds / 1e6,
+            "peak_memory": peak_resident_memory()}
+
+
+def read_sample(raw_path, sample_rows=SAMPLE_ROWS) :
+    """ Return the first rows of the raw data file.
+
+    Parameters:
+        raw_path (str): Name of the raw data file.
+        sample_rows (int): Maximum number of rows to return.
+
+    Return:
+        list[str]: Raw rows, without end of line characters.
+    """
+    sample = []
+    for rows in read_row_blocks(raw_path) :
+        sample.extend(rows[:sample_rows - len(sample)])
+        if len(sample) >= sample_rows :
+            break
+    return sample
+
+
+def benchmark_steps(rows) :
+    """ Return the measurements of each step of cleaning on a sample of rows.
+
+    Parameters:
+        rows (list[str]): Raw rows, without end of line characters.
+
+    Return:
+        dict[str, dict]: Measurements (see measure) of "parse_row", each rule
+                         in ATHLETE_RULES and "clean_row", keyed by name.
+                         Rules also report the number of rows they marked
+                         corrupt as "hits".
+    """
+    byte_count = sum([len(row) + 1 for row in rows])
+    parsed = [parse_row(row) for row in rows]
+    steps = {"parse_row": measure(lambda : [parse_row(row) for row in rows],
+                                  len(rows), byte_count)}
+    for name, check in ATHLETE_RULES :
+        steps[name] = measure(lambda : [check(fields) for fields in parsed],
+                              len(rows), byte_count)
+        steps[name]["hits"] = sum([bool(check(fields)) for fields in parsed])
+    steps["clean_row"] = measure(lambda : [clean_row(list(fields), False) for fields in parsed],
+                                 len(rows), byte_count)
+    return steps
+
+
+def print_report(file_results, step_results) :
+    """ Print the benchmark measurements as a table.
+
+    Parameters:
+        file_results (dict): Measurements of cleaning the whole file.
+        step_results (dict[str, dict]): Measurements of each step.
+    """
+    line = "{0:<28} {1:>12} {2:>14} {3:>10} {4:>12} {5:>8}"
+    print(line.format("Step", "Rows", "Rows/sec", "MB/sec", "Peak (KiB)", "Hits"))
+    results = [("clean_file", file_results)] + list(step_results.items())
+    for name, result in results :
+        print(line.format(name, result["rows"],
+                          "{0:,.0f}".format(result["rows_per_sec"]),
+                          "{0:.2f}".format(result["mb_per_sec"]),
+                          "-" if result["peak_memory"] is None
+                          else "{0:,.0f}".format(result["peak_memory"] / 1024),
+                          result.get("hits", "")))
+
+
+def main() :
+    """Benchmark the cleaner, as given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("raw_path", nargs="?", default=None,
+                        help="raw data file (default athlete_data.csv); required "
+                             "with --rows, as the generated file is written to it")
+    parser.add_argument("-n", "--rows", type=int, default=None,
+                        help="first generate a raw data file with this many rows")
+    parser.add_argument("-r", "--rates", type=parse_rates, default={},
+                        help="corruption rates of generated rows, e.g. all=0.01")
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    parser.add_argument("--sample", type=int, default=SAMPLE_ROWS,
+                        help="rows used to benchmark each step")
+    parser.add_argument("--json", default=None,
+                        help="also save the measurements to this file")
+    args = parser.parse_args()
+    if args.raw_path is None :
+        if args.rows is not None :
+            parser.error("--rows needs a raw_path to write the generated file to")
+        args.raw_path = "athlete_data.csv"
+
+    if args.rows is not None :
+        write_raw_file(args.raw_path, args.rows, args.rates, args.seed)
+    file_results = benchmark_file(args.raw_path)
+    step_results = benchmark_steps(read_sample(args.raw_path, args.sample))
+    print_report(file_results, step_results)
+    if args.json is not None :
+        with open(args.json, "w") as json_file :
+            json.dump({"clean_file": file_results, "steps": step_results},
+                      json_file, indent=2)
+
+
+# Call the main() function if this module is executed
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,161 @@
+"""
+Streaming detection of duplicate rows in a raw Olympics data file.
+
+DuplicateFilter remembers the key of every row it has seen, where the key is
+the data in chosen columns. Keys are kept exactly, in a set, until they would
+take more than a memory limit. The set is then replaced by a Bloom filter of
+fixed size, so files far larger than memory can be deduplicated in one pass.
+A Bloom filter never misses a duplicate, but may report a row as a duplicate
+when it is not, at about the configured false positive rate.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import hashlib
+import math
+import sys
+
+
+MEMORY_LIMIT = 256 * 1024 * 1024    # Default bytes of exact keys kept before switching to a Bloom filter
+ERROR_RATE = 0.001                  # Default false positive rate of the Bloom filter
+BLOOM_CAPACITY = 10000000           # Default number of keys the Bloom filter is sized for
+KEY_OVERHEAD = 32                   # Approximate bytes used by the set for each key
+KEY_SEPARATOR = "\x00"              # Separates the columns of a key
+
+
+class BloomFilter(object) :
+    """Fixed size set of strings that may report false positives."""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=ERROR_RATE) :
+        """
+        Parameters:
+            capacity (int): Number of keys to be added. The false positive
+                            rate rises above 'error_rate' beyond it.
+            error_rate (float): False positive rate at 'capacity' keys.
+
+        Preconditions:
+            capacity > 0 and 0 < error_rate < 1
+        """
+        bit_count = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._bit_count = max(bit_count, 8)
+        self._hash_count = max(1, int(round(self._bit_count / capacity * math.log(2))))
+        self._bits = bytearray((self._bit_count + 7) // 8)
+
+    def add(self, key) :
+        """ Add a key to the filter.
+
+        Parameters:
+            key (str): Key to be added.
+
+        Return:
+            bool: True if the key may have been added before, False if it
+                  certainly was not.
+        """
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1     # Double hashing
+        bits = self._bits
+        seen = True
+        for i in range(self._hash_count) :
+            bit = (first + i * step) % self._bit_count
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not bits[byte] & mask :
+                seen = False
+                bits[byte] |= mask
+        return seen
+
+    def get_size(self) :
+        """(int) Number of bytes used by the filter's bits."""
+        return len(self._bits)
+
+
+class DuplicateFilter(object) :
+    """Finds rows whose key has already been seen, in bounded memory."""
+
+    def __init__(self, columns=None, memory_limit=MEMORY_LIMIT, error_rate=ERROR_RATE,
+                 capacity=BLOOM_CAPACITY) :
+        """
+        Parameters:
+            columns (list[int]): Columns that make up the key of a row (None
+                                 for every column).
+            memory_limit (int): Approximate bytes of exact keys kept before
+                                switching to a Bloom filter.
+            error_rate (float): False positive rate of the Bloom filter.
+            capacity (int): Number of keys the Bloom filter is sized for. It
+                            is never sized for fewer keys than it starts with.
+        """
+        self._columns = None if columns is None else tuple(columns)
+        self._memory_limit = memory_limit
+        self._error_rate = error_rate
+        self._capacity = capacity
+        self._keys = set()          # Exact keys, until _bloom is created
+        self._memory = 0            # Approximate bytes used by _keys
+        self._bloom = None
+        self._rows = 0
+        self._duplicates = 0
+
+    def get_key(self, fields) :
+        """(str) Key of a parsed row (see assign1_utilities.parse_row)."""
+        if self._columns is None :
+            return KEY_SEPARATOR.join(fields)
+        return KEY_SEPARATOR.join([fields[column] for column in self._columns])
+
+    def is_duplicate(self, fields) :
+        """ Return True if a row with the same key has been seen, and remember the row.
+
+        Parameters:
+            fields (list[str]): Data in each column of the row (see parse_row).
+
+        Return:
+            bool: True if the row is (or, once a Bloom filter is used, is
+                  probably) a duplicate.
+        """
+        key = self.get_key(fields)
+        self._rows += 1
+        if self._bloom is not None :
+            duplicate = self._bloom.add(key)
+        elif key in self._keys :
+            duplicate = True
+        else :
+            duplicate = False
+            self._keys.add(key)
+            self._memory += sys.getsizeof(key) + KEY_OVERHEAD
+            if self._memory > self._memory_limit :
+                self._switch_to_bloom()
+        if duplicate :
+            self._duplicates += 1
+        return duplicate
+
+    def _switch_to_bloom(self) :
+        """Moves the exact keys into a new Bloom filter and frees them."""
+        self._bloom = BloomFilter(max(self._capacity, 2 * len(self._keys)), self._error_rate)
+        for key in self._keys :
+            self._bloom.add(key)
+        self._keys = set()
+        self._memory = 0
+
+    def is_exact(self) :
+        """(bool) True while keys are still kept exactly."""
+        return self._bloom is None
+
+    def get_stats(self) :
+        """(dict) "rows" seen, "duplicates" found, whether the keys are
+                  still "exact", and the approximate "memory" used in bytes.
+        """
+        return {"rows": self._rows,
+                "duplicates": self._duplicates,
+                "exact": self.is_exact(),
+                "memory": self._memory if self.is_exact() else self._bloom.get_size()}
+
+    def __str__(self) :
+        stats = self.get_stats()
+        return "Rows: {0}   Duplicates: {1}   Keys: {2}, about {3:,.0f} KiB".format(
+            stats["rows"], stats["duplicates"],
+            "exact" if stats["exact"] else "Bloom filter", stats["memory"] / 1024)
+
+
+# Check if an attempt is made to execute this module and output error message
+if __name__ == "__main__" :
+    print("This module provides duplicate row detection for the Olympic",
+          "results data cleaner and is not meant to be executed on its own.")
@@ -0,0 +1,195 @@
+"""
+Cross-row validation of the events in a raw Olympics data file.
+
+The corruption rules check one row at a time, so an event with two gold
+medals, or two athletes in the same place, passes them. find_event_violations
+reads the raw data file once and spills the event, place and medal of each
+row into partition files on disk, chosen by a hash of the event, so that
+every row of an event lands in the same partition. Each partition is then
+checked on its own, keeping memory within a budget however large the file is.
+
+Whether a row breaks an event invariant depends only on its event, place and
+medal, so the result is small: the (event, place) pairs that are shared and
+the events with more than one gold medal. EventViolations turns it into rules
+(see assign1_rules.compile_rules) that mark the offending rows as corrupt
+while the file is cleaned.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import math
+import os
+import shutil
+import tempfile
+import zlib
+
+from assign1_io import read_input_blocks, is_stream, ENCODING
+from assign1_utilities import parse_row
+
+
+EVENT_COLUMN = 1                    # Column holding the event (sport) of a row
+PLACE_COLUMN = 5
+MEDAL_COLUMN = 8
+MEMORY_BUDGET = 64 * 1024 * 1024    # Default bytes of records held in memory
+PARTITIONS = 16                     # Minimum number of partition files
+COMPRESSION_RATIO = 4               # Assumed size of a compressed file once decompressed
+SEPARATOR = "\x00"                  # Separates the event, place and medal of a record
+
+
+def partition_count(raw_path, memory_budget) :
+    """ Return the number of partitions needed for each to fit in the memory budget.
+
+    Parameters:
+        raw_path (str): Name of the raw data file.
+        memory_budget (int): Bytes of records that may be held in memory.
+
+    Return:
+        int: Number of partitions, at least PARTITIONS.
+    """
+    size = os.path.getsize(raw_path)
+    if is_stream(raw_path) :
+        size *= COMPRESSION_RATIO
+    return max(PARTITIONS, int(math.ceil(size / memory_budget)))
+
+
+class EventPartitioner(object) :
+    """Spills the event, place and medal of rows into partition files by event."""
+
+    def __init__(self, directory, partitions, memory_budget=MEMORY_BUDGET) :
+        """
+        Parameters:
+            directory (str): Directory to write the partition files in.
+            partitions (int): Number of partition files.
+            memory_budget (int): Bytes of records buffered before they are
+                                 written to the partition files.
+        """
+        self._paths = [os.path.join(directory, "events.{0}".format(number))
+                       for number in range(partitions)]
+        self._buffers = [[] for path in self._paths]
+        self._buffered = 0          # Number of characters in _buffers
+        self._memory_budget = memory_budget
+
+    def add(self, fields) :
+        """Adds the record of a row, if it has a place or a gold medal.
+
+        Parameters:
+            fields (list[str]): Data in each column of the row (see parse_row).
+        """
+        event = fields[EVENT_COLUMN]
+        place = fields[PLACE_COLUMN]
+        medal = fields[MEDAL_COLUMN].upper()
+        if not place.isdecimal() and medal != "GOLD" :
+            return                  # Cannot break an event invariant
+        record = event + SEPARATOR + place + SEPARATOR + medal + "\n"
+        partition = zlib.crc32(event.encode(ENCODING)) % len(self._paths)
+        self._buffers[partition].append(record)
+        self._buffered += len(record)
+        if self._buffered >= self._memory_budget :
+            self.flush()
+
+    def flush(self) :
+        """Appends the buffered records to the partition files."""
+        for path, buffer in zip(self._paths, self._buffers) :
+            if buffer :
+                with open(path, "a", encoding=ENCODING, newline="\n") as partition_file :
+                    partition_file.write("".join(buffer))
+                del buffer[:]
+        self._buffered = 0
+
+    def get_paths(self) :
+        """(list[str]) Names of the partition files that have been written."""
+        return [path for path in self._paths if os.path.exists(path)]
+
+
+def check_partition(path) :
+    """ Return the event invariants broken by the records in a partition file.
+
+    Parameters:
+        path (str): Name of a partition file written by EventPartitioner.
+
+    Return:
+        tuple<set[tuple<str, str>], set[str]>: (event, place) of places held
+            by more than one row, and events with more than one gold medal.
+    """
+    places = {}         # Number of rows with each (event, place)
+    golds = {}          # Number of gold medals in each event
+    with open(path, "r", encoding=ENCODING, newline="\n") as partition_file :
+        for record in partition_file :
+            event, place, medal = record[:-1].split(SEPARATOR)
+            if place.isdecimal() :
+                key = (event, str(int(place)))
+                places[key] = places.get(key, 0) + 1
+            if medal == "GOLD" :
+                golds[event] = golds.get(event, 0) + 1
+    return (set([key for key, count in places.items() if count > 1]),
+            set([event for event, count in golds.items() if count > 1]))
+
+
+class EventViolations(object) :
+    """The event invariants broken in a raw data file, as corruption rules."""
+
+    def __init__(self, shared_places, multiple_golds) :
+        """
+        Parameters:
+            shared_places (set[tuple<str, str>]): (event, place) of places
+                                                  held by more than one row.
+            multiple_golds (set[str]): Events with more than one gold medal.
+        """
+        self._shared_places = shared_places
+        self._multiple_golds = multiple_golds
+
+    def has_shared_place(self, fields) :
+        """(bool) True if another row of the event has the row's place."""
+        place = fields[PLACE_COLUMN]
+        return (place.isdecimal()
+                and (fields[EVENT_COLUMN], str(int(place))) in self._shared_places)
+
+    def has_multiple_golds(self, fields) :
+        """(bool) True if the row has a gold medal in an event with more than one."""
+        return (fields[MEDAL_COLUMN].upper() == "GOLD"
+                and fields[EVENT_COLUMN] in self._multiple_golds)
+
+    def get_rules(self) :
+        """(list[tuple<str, callable>]) (name, check) of each event invariant."""
+        return [("unique_place_per_event", self.has_shared_place),
+                ("one_gold_per_event", self.has_multiple_golds)]
+
+    def __str__(self) :
+        return "Events with shared places: {0}   Events with more than one gold: {1}".format(
+            len(set([event for event, place in self._shared_places])),
+            len(self._multiple_golds))
+
+
+def find_event_violations(raw_path, memory_budget=MEMORY_BUDGET, temp_dir=None) :
+    """ Find the event invariants broken in the raw data file, within a memory budget.
+
+    Parameters:
+        raw_path (str): Name of the raw data file. Compressed files (.gz, .bz2,
+                        .xz) are decompressed. Standard input cannot be used,
+                        as the file has to be read again to be cleaned.
+        memory_budget (int): Approximate bytes of records held in memory, when
+                             partitioning and when checking each partition.
+        temp_dir (str): Directory for the partition files (None for the
+                        system's temporary directory).
+
+    Return:
+        EventViolations: Shared places and events with more than one gold medal.
+    """
+    directory = tempfile.mkdtemp(prefix="assign1_events_", dir=temp_dir)
+    try :
+        partitioner = EventPartitioner(directory, partition_count(raw_path, memory_budget),
+                                       memory_budget)
+        for rows in read_input_blocks(raw_path) :
+            for row in rows :
+                partitioner.add(parse_row(row))
+        partitioner.flush()
+        shared_places = set()
+        multiple_golds = set()
+        for path in partitioner.get_paths() :
+            places, golds = check_partition(path)
+            shared_places.update(places)
+            multiple_golds.update(golds)
+    finally :
+        shutil.rmtree(directory, ignore_errors=True)
+    return EventViolations(shared_places, multiple_golds)
@@ -0,0 +1,196 @@
+"""
+Synthetic raw Olympics data generator for testing the data cleaner at scale.
+
+Generated rows follow the raw athlete data format (athlete_data.csv). Each
+corruption rule in assign1.ATHLETE_SCHEMA can be given its own rate, which is
+the chance that a row is changed so that it breaks that rule.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import argparse
+import random
+
+from assign1_io import BulkWriter
+
+
+SCORED_EVENTS = ["Men's Moguls", "Women's Moguls", "Men's Aerials", "Women's Aerials",
+                 "Men's Half-Pipe", "Women's Half-Pipe", "Men's Slopestyle",
+                 "Women's Slopestyle"]
+TIMED_EVENTS = ["Men's Luge", "Women's Luge", "Men's Speedskating 500m",
+                "Men's Speedskating 1000m", "Men's Speedskating 5000m",
+                "Women's Speedskating 500m", "Women's Speedskating 1000m"]
+FIRST_NAMES = ["Rohan", "Matt", "Brodie", "Madii", "Jakara", "Britteny", "Mikael",
+               "Chloe", "Justine", "Sven", "Arianna", "Shaun", "Nao", "Miho",
+               "Marc-Antoine", "Sverre Lunde"]
+SURNAMES = ["Chapman-Davies", "Graham", "Summers", "Himbury", "Kingsbury", "Kramer",
+            "Fontana", "White", "Kodaira", "Takagi", "O'Brien", "Dufour-Lapointe",
+            "van Kerkhof", "De Haitre"]
+COUNTRIES = ["AUS", "AUT", "CAN", "CHN", "FIN", "FRA", "GBR", "GER", "ITA", "JPN",
+             "KAZ", "KOR", "MEX", "NED", "NOR", "USA"]
+MEDALS = {1: "Gold", 2: "Silver", 3: "Bronze"}
+
+
+def _valid_row(identifier, rng) :
+    """(list[str]) Fields of a random row that breaks none of the rules."""
+    timed = rng.random() < 0.5
+    event = rng.choice(TIMED_EVENTS if timed else SCORED_EVENTS)
+    fields = [str(identifier), event, rng.choice(FIRST_NAMES), rng.choice(SURNAMES),
+              rng.choice(COUNTRIES), "", "", "", "", "", "", ""]
+    if rng.random() < 0.05 :
+        fields[5] = rng.choice(["DNS", "DNF", "PEN"])
+        return fields
+    place = rng.randint(1, 30)
+    fields[5] = str(place)
+    value = "{0:.2f}".format(rng.uniform(30, 400 if timed else 100))
+    fields[7 if timed else 6] = value
+    fields[8] = MEDALS.get(place, "")
+    if rng.random() < 0.01 :
+        fields[9] = fields[10] = value          # New olympic and world record
+    return fields
+
+
+def _break_missing_entry(fields, rng) :
+    """Leave one of the required columns empty."""
+    fields[rng.randint(1, 4)] = ""
+
+
+def _break_max_char(fields, rng) :
+    """Make the country code too long."""
+    fields[4] = fields[4] + "X"
+
+
+def _break_valid_medal(fields, rng) :
+    """Use a medal that does not exist."""
+    fields[8] = "Tin"
+
+
+def _break_col_6_7_8(fields, rng) :
+    """Give a placed row both a score and a time."""
+    fields[5] = str(rng.randint(4, 30))
+    fields[6] = fields[7] = "50.00"
+
+
+def _break_col_9_6(fields, rng) :
+    """Give first place the wrong medal."""
+    fields[5] = "1"
+    fields[8] = "Silver"
+
+
+def _break_world_olympic_record(fields, rng) :
+    """Set a world record that differs from the olympic record."""
+    fields[9] = "60.00"
+    fields[10] = "59.99"
+
+
+def _break_place(fields, rng) :
+    """Use a place that is not a number or DNS/DNF/PEN."""
+    fields[5] = "XX"
+
+
+def _break_illegal_character(fields, rng) :
+    """Add an illegal character to the first name."""
+    fields[2] = fields[2] + "$"
+
+
+def _break_numbers(fields, rng) :
+    """Put a letter in the score."""
+    fields[5] = "DNF"
+    fields[6] = "7a.1"
+
+
+# How to break each rule in assign1.ATHLETE_SCHEMA, by rule name
+CORRUPTIONS = {
+    "check_missing_entry": _break_missing_entry,
+    "max_char_corrupt": _break_max_char,
+    "check_valid_medal": _break_valid_medal,
+    "check_col_6_7_8": _break_col_6_7_8,
+    "check_col_9_6": _break_col_9_6,
+    "check_world_olympic_record": _break_world_olympic_record,
+    "rule_place": _break_place,
+    "rule_illegal_character": _break_illegal_character,
+    "rule_numbers": _break_numbers,
+}
+
+
+def generate_rows(count, corruption_rates=None, seed=None) :
+    """ Return an iterator over randomly generated raw data rows.
+
+    Parameters:
+        count (int): Number of rows to generate.
+        corruption_rates (dict[str, float]): Chance (0 to 1) that a row breaks
+                                             each rule, keyed by rule name.
+        seed (int): Seed for the random number generator, for repeatable data.
+
+    Return:
+        iterator[str]: Rows in CSV format, ending with "\\n".
+
+    Raises:
+        KeyError: If a corruption rate is given for an unknown rule.
+    """
+    rng = random.Random(seed)
+    corruptions = [(CORRUPTIONS[name], rate)
+                   for name, rate in (corruption_rates or {}).items()]
+    for identifier in range(1, count + 1) :
+        fields = _valid_row(identifier, rng)
+        for corrupt, rate in corruptions :
+            if rng.random() < rate :
+                corrupt(fields, rng)
+        yield ",".join(fields) + "\n"
+
+
+def write_raw_file(raw_path, count, corruption_rates=None, seed=None) :
+    """ Write a raw data file of randomly generated rows.
+
+    Parameters:
+        raw_path (str): Name of the raw data file to (over)write.
+        count (int): Number of rows to generate.
+        corruption_rates (dict[str, float]): See generate_rows.
+        seed (int): See generate_rows.
+    """
+    with BulkWriter(raw_path) as raw_data_file :
+        for row in generate_rows(count, corruption_rates, seed) :
+            raw_data_file.write(row)
+
+
+def parse_rates(text) :
+    """ Return corruption rates parsed from the command line.
+
+    Parameters:
+        text (str): "rule=rate" pairs separated by commas, or "all=rate" to
+                    give every rule the same rate.
+
+    Return:
+        dict[str, float]: Rate for each rule.
+
+    Raises:
+        ValueError: If a rule name or rate is not valid.
+    """
+    rates = {}
+    for pair in text.split(",") :
+        name, rate = pair.split("=")
+        if name == "all" :
+            rates.update(dict.fromkeys(CORRUPTIONS, float(rate)))
+        elif name in CORRUPTIONS :
+            rates[name] = float(rate)
+        else :
+            raise ValueError("Unknown rule: " + name)
+    return rates
+
+
+def main() :
+    """Generate a raw data file, as given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("raw_path", help="raw data file to write")
+    parser.add_argument("rows", type=int, help="number of rows, e.g. 1000000")
+    parser.add_argument("-r", "--rates", type=parse_rates, default={},
+                        help="corruption rates, e.g. all=0.01,rule_place=0.05")
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    args = parser.parse_args()
+    write_raw_file(args.raw_path, args.rows, args.rates, args.seed)
+
+
+# Call the main() function if this module is executed
+if __name__ == "__main__" :
+    main()
@@ -0,0 +1,158 @@
+"""
+Resumable, incremental cleaning of an append-only raw Olympics data file.
+
+After each run a checkpoint is saved next to the cleaned data file. It
+records how many bytes of the raw file have been cleaned and a chain of
+hashes of those bytes, one per block. The next run only cleans and appends
+the rows added since, unless any of the already cleaned part of the raw
+file (or the cleaned file itself) has changed, in which case the whole file
+is cleaned again.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import argparse
+import hashlib
+import json
+import os
+
+from assign1 import clean_rows
+from assign1_io import read_row_blocks, BulkWriter
+
+
+CHECKPOINT_SUFFIX = ".checkpoint"   # Added to the cleaned file name for the checkpoint file
+BLOCK_SIZE = 1024 * 1024            # Bytes of the raw file covered by each hash in the chain
+
+
+def block_hashes(raw_path, start, end, previous="") :
+    """ Return the chained hashes of the blocks of the raw data file from
+        'start' to 'end'.
+
+    Each hash covers the hash before it and the next BLOCK_SIZE bytes (fewer
+    for the last block), so the last hash fingerprints every byte from the
+    start of the file, and a chain can be extended without reading the
+    blocks before 'start' again.
+
+    Parameters:
+        raw_path (str): Name of the raw data file.
+        start (int): Offset of the first block, a multiple of BLOCK_SIZE.
+        end (int): Offset of the end of the last block.
+        previous (str): Hash of the block before 'start' ("" if start is 0).
+
+    Return:
+        list[str]: Hexadecimal SHA-256 digest of each block.
+    """
+    hashes = []
+    with open(raw_path, "rb") as raw_data_file :
+        raw_data_file.seek(start)
+        while start < end :
+            block = raw_data_file.read(min(BLOCK_SIZE, end - start))
+            if not block :
+                break                       # File is shorter than 'end'
+            previous = hashlib.sha256(previous.encode("ascii") + block).hexdigest()
+            hashes.append(previous)
+            start += len(block)
+    return hashes
+
+
+def load_checkpoint(clean_path) :
+    """ Return the checkpoint saved for the cleaned data file.
+
+    Parameters:
+        clean_path (str): Name of the cleaned data file.
+
+    Return:
+        dict: Saved checkpoint, or None if there is no readable checkpoint.
+    """
+    try :
+        with open(clean_path + CHECKPOINT_SUFFIX, "r") as checkpoint_file :
+            return json.load(checkpoint_file)
+    except (OSError, ValueError) :
+        return None
+
+
+def save_checkpoint(clean_path, checkpoint) :
+    """ Save the checkpoint for the cleaned data file, replacing any previous one.
+
+    Parameters:
+        clean_path (str): Name of the cleaned data file.
+        checkpoint (dict): Checkpoint to be saved.
+    """
+    checkpoint_path = clean_path + CHECKPOINT_SUFFIX
+    with open(checkpoint_path + ".tmp", "w") as checkpoint_file :
+        json.dump(checkpoint, checkpoint_file)
+    os.replace(checkpoint_path + ".tmp", checkpoint_path)  # Never leave a partly written checkpoint
+
+
+def resume_offset(raw_path, clean_path, checkpoint) :
+    """ Return the byte offset of the raw data file to resume cleaning from.
+
+    Parameters:
+        raw_path (str): Name of the raw data file.
+        clean_path (str): Name of the cleaned data file.
+        checkpoint (dict): Checkpoint from the previous run, or None.
+
+    Return:
+        int: Offset of the first row not yet cleaned, or 0 if the whole file
+             needs to be cleaned again.
+    """
+    if checkpoint is None or checkpoint.get("raw_path") != os.path.abspath(raw_path) :
+        return 0
+    offset = checkpoint["offset"]
+    if not os.path.exists(clean_path) or os.path.getsize(clean_path) != checkpoint["clean_size"] :
+        return 0                            # Cleaned file is missing or has been changed
+    if os.path.getsize(raw_path) < offset :
+        return 0                            # Raw file has been truncated or replaced
+    if block_hashes(raw_path, 0, offset) != checkpoint.get("block_hashes") :
+        return 0                            # Already cleaned rows have changed
+    if offset > 0 and os.path.getsize(raw_path) > offset :
+        with open(raw_path, "rb") as raw_data_file :
+            raw_data_file.seek(offset - 1)
+            if raw_data_file.read(1) != b"\n" :
+                return 0                    # Last cleaned row was incomplete and has grown
+    return offset
+
+
+def clean_file_incremental(raw_path, clean_path) :
+    """ Clean the rows added to the raw data file since the last run.
+
+    Parameters:
+        raw_path (str): Name of the raw data file.
+        clean_path (str): Name of the cleaned data file to append to.
+
+    Return:
+        int: Byte offset cleaning resumed from (0 for a full clean).
+    """
+    checkpoint = load_checkpoint(clean_path)
+    start = resume_offset(raw_path, clean_path, checkpoint)
+    end = os.path.getsize(raw_path)         # Rows appended during this run wait for the next one
+    with BulkWriter(clean_path, append=start > 0) as clean_data_file :
+        for rows in read_row_blocks(raw_path, start, end) :
+            clean_data_file.write(clean_rows(rows))
+    hashes = checkpoint["block_hashes"][:start // BLOCK_SIZE] if start > 0 else []
+    hashes.extend(block_hashes(raw_path, len(hashes) * BLOCK_SIZE, end,
+                               hashes[-1] if hashes else ""))   # Only the new blocks are read
+    save_checkpoint(clean_path, {"raw_path": os.path.abspath(raw_path),
+                                 "offset": end,
+                                 "block_hashes": hashes,
+                                 "clean_size": os.path.getsize(clean_path)})
+    return start
+
+
+def main() :
+    """Incrementally clean a raw data file, as given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("raw_path", nargs="?", default="athlete_data.csv")
+    parser.add_argument("clean_path", nargs="?", default="athlete_data_clean.csv")
+    args = parser.parse_args()
+    start = clean_file_incremental(args.raw_path, args.clean_path)
+    if start > 0 :
+        print("Resumed cleaning at byte", start)
+    else :
+        print("Cleaned the whole file")
+
+
+# Call the main() function if this module is executed
+if __name__ == "__main__" :
+    main()
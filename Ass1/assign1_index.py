@@ -0,0 +1,216 @@
+"""
+Binary index of why each row of a cleaned Olympics data file is corrupt.
+
+The index holds one fixed size record per cleaned row: the byte offset of the
+row in the (uncompressed) cleaned data file, and a bitmask of every rule the
+row failed (bit i is rule i of the schema, so 0 means the row is clean).
+Loaders can seek straight to the rows they want, and triage tools can count
+failure reasons, without validating the rows again.
+
+File layout:
+    INDEX_MAGIC, a 4 byte little endian header length, a JSON header
+    ({"rules": [rule names in bit order]}) and then the records.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import argparse
+import json
+import struct
+
+
+INDEX_MAGIC = b"A1IX"               # First bytes of every index file
+RECORD = struct.Struct("<QI")       # Row offset (8 bytes) and rule mask (4 bytes)
+MAX_RULES = 32                      # Number of bits in the rule mask
+
+
+def rule_mask(rules, fields) :
+    """ Return a bitmask of every rule the row fails, checking all of them.
+
+    Parameters:
+        rules (list[tuple<str, callable>]): (name, check) of each rule, see
+                                            assign1_rules.compile_rules.
+        fields (list[str]): Data in each column of the row (see parse_row).
+
+    Return:
+        int: Bit i is set if rule i marks the row as corrupt.
+    """
+    mask = 0
+    bit = 1
+    for name, check in rules :
+        if check(fields) :
+            mask |= bit
+        bit <<= 1
+    return mask
+
+
+class IndexWriter(object) :
+    """Writes the records of an index file."""
+
+    def __init__(self, index_path, rule_names) :
+        """
+        Parameters:
+            index_path (str): Name of the index file to (over)write.
+            rule_names (list[str]): Names of the rules, in bit order.
+
+        Raises:
+            ValueError: If there are more rules than bits in the mask.
+        """
+        if len(rule_names) > MAX_RULES :
+            raise ValueError("At most {0} rules can be indexed".format(MAX_RULES))
+        header = json.dumps({"rules": list(rule_names)}).encode("utf-8")
+        self._file = open(index_path, "wb")
+        self._file.write(INDEX_MAGIC + struct.pack("<I", len(header)) + header)
+
+    def write_records(self, records) :
+        """Adds the records of a block of rows to the index.
+
+        Parameters:
+            records (list[tuple<int, int>]): (offset, mask) of each row.
+        """
+        self._file.write(b"".join([RECORD.pack(offset, mask)
+                                   for offset, mask in records]))
+
+    def close(self) :
+        """Closes the index file."""
+        self._file.close()
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) :
+        self.close()
+
+
+class IndexReader(object) :
+    """Reads the records of an index file."""
+
+    def __init__(self, index_path) :
+        """
+        Parameters:
+            index_path (str): Name of the index file.
+
+        Raises:
+            ValueError: If the file is not an index file.
+        """
+        self._file = open(index_path, "rb")
+        if self._file.read(len(INDEX_MAGIC)) != INDEX_MAGIC :
+            self._file.close()
+            raise ValueError(index_path + " is not a corrupt row index")
+        header_length = struct.unpack("<I", self._file.read(4))[0]
+        self._rules = json.loads(self._file.read(header_length).decode("utf-8"))["rules"]
+        self._start = self._file.tell()     # Offset of the first record
+
+    def get_rules(self) :
+        """(list[str]) Names of the rules, in bit order."""
+        return list(self._rules)
+
+    def get_record(self, row_number) :
+        """ Return the record of one row, found by seeking.
+
+        Parameters:
+            row_number (int): Number of the row in the cleaned file, from 0.
+
+        Return:
+            tuple<int, int>: (offset, mask) of the row.
+
+        Raises:
+            IndexError: If there is no such row.
+        """
+        data = b""
+        if row_number >= 0 :
+            self._file.seek(self._start + row_number * RECORD.size)
+            data = self._file.read(RECORD.size)
+        if len(data) < RECORD.size :
+            raise IndexError("No row " + str(row_number) + " in the index")
+        return RECORD.unpack(data)
+
+    def records(self) :
+        """(iterator[tuple<int, int>]) (offset, mask) of every row, in order."""
+        self._file.seek(self._start)
+        while True :
+            data = self._file.read(RECORD.size * 65536)
+            if not data :
+                return
+            yield from RECORD.iter_unpack(data)
+
+    def select(self, rule_names=None) :
+        """ Return the row numbers and offsets of corrupt rows.
+
+        Parameters:
+            rule_names (list[str]): Only select rows failing one of these rules
+                                    (None for any rule).
+
+        Return:
+            iterator[tuple<int, int>]: (row number, offset) of each selected row.
+        """
+        wanted = self.mask_of(rule_names) if rule_names is not None else ~0
+        for row_number, (offset, mask) in enumerate(self.records()) :
+            if mask & wanted :
+                yield row_number, offset
+
+    def mask_of(self, rule_names) :
+        """ Return the bitmask of the named rules.
+
+        Parameters:
+            rule_names (list[str]): Names of rules in the index.
+
+        Return:
+            int: Mask with the bit of each rule set.
+
+        Raises:
+            ValueError: If a rule is not in the index.
+        """
+        mask = 0
+        for name in rule_names :
+            mask |= 1 << self._rules.index(name)
+        return mask
+
+    def count_failures(self) :
+        """ Return how many rows failed each rule, and how many rows there are.
+
+        Return:
+            tuple<dict[str, int], int>: Number of rows failing each rule, keyed
+                                        by rule name, and the number of rows.
+        """
+        counts = [0] * len(self._rules)
+        masks = {}                          # Number of rows with each mask
+        row_count = 0
+        for offset, mask in self.records() :
+            masks[mask] = masks.get(mask, 0) + 1
+            row_count += 1
+        for mask, rows in masks.items() :
+            for bit in range(len(self._rules)) :
+                if mask & (1 << bit) :
+                    counts[bit] += rows
+        return dict(zip(self._rules, counts)), row_count
+
+    def close(self) :
+        """Closes the index file."""
+        self._file.close()
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) :
+        self.close()
+
+
+def main() :
+    """Print how many rows failed each rule, for an index given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("index_path")
+    args = parser.parse_args()
+    with IndexReader(args.index_path) as index :
+        counts, row_count = index.count_failures()
+    print("{0:<28} {1:>12} {2:>8}".format("Rule", "Rows failed", "Rate"))
+    for name, count in counts.items() :
+        print("{0:<28} {1:>12} {2:>8}".format(
+            name, count, "{0:.2%}".format(count / row_count if row_count else 0)))
+    print("{0:<28} {1:>12}".format("Rows", row_count))
+
+
+# Call the main() function if this module is executed
+if __name__ == "__main__" :
+    main()
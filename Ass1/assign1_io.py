@@ -0,0 +1,315 @@
+"""
+Bulk input and output for the Olympics data cleaner.
+
+read_row_blocks memory maps the raw data file and finds line boundaries on
+the raw bytes, so each block of rows is decoded with a single call instead of
+one decode per line. BulkWriter collects cleaned rows and writes them to the
+cleaned data file in large blocks, encoding each block once.
+
+Files named *.gz, *.bz2, *.xz or *.lzma are compressed and decompressed
+transparently, and "-" stands for standard input or output. Such streams are
+read ahead in a background thread (see read_input_blocks), so decompression
+overlaps with validation.
+
+prefetch and BackgroundWriter move reading and writing into their own
+threads, connected to the validation by bounded queues of row blocks.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import bz2
+import gzip
+import lzma
+import mmap
+import os
+import queue
+import sys
+import threading
+
+
+BLOCK_SIZE = 1024 * 1024    # Default number of bytes read or written at a time
+ENCODING = "utf-8"          # Encoding of the raw and cleaned data files
+READ_AHEAD = 4              # Number of blocks a background reader may read ahead
+STANDARD_STREAM = "-"       # File name standing for standard input or output
+
+# Function to open a compressed file, for each compressed file name extension
+COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open,
+                      ".lzma": lzma.open}
+
+
+def is_stream(path) :
+    """(bool) True if 'path' is compressed or standard input or output, so it
+              can only be read or written in order.
+    """
+    return (path == STANDARD_STREAM
+            or os.path.splitext(path)[1].lower() in COMPRESSED_OPENERS)
+
+
+def open_binary(path, mode) :
+    """ Open a file in binary mode, compressing or decompressing it if its
+    name has a compressed file name extension.
+
+    Parameters:
+        path (str): Name of the file, or "-" for standard input or output.
+        mode (str): "rb", "wb" or "ab".
+
+    Return:
+        file: Binary file object. Standard input and output are not closed
+              when it is closed.
+    """
+    if path == STANDARD_STREAM :
+        stream = sys.stdin if "r" in mode else sys.stdout
+        return os.fdopen(os.dup(stream.fileno()), mode)
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(path)[1].lower(), open)
+    return opener(path, mode)
+
+
+def prefetch(items, depth=READ_AHEAD) :
+    """ Return an iterator over items produced ahead of time by a background thread.
+
+    Reading and decompression release the interpreter lock, so producing the
+    items overlaps with processing the earlier ones. At most 'depth' items
+    wait to be processed, so a slow consumer holds back the producer.
+
+    Parameters:
+        items (iterable): Items to produce, e.g. blocks read from a file.
+        depth (int): Number of items that may wait to be processed.
+
+    Return:
+        iterator: The same items, in order.
+    """
+    waiting = queue.Queue(depth)
+    stopped = threading.Event()     # Set when the items are no longer needed
+
+    def put(item) :
+        while not stopped.is_set() :
+            try :
+                waiting.put(item, timeout=0.1)
+                return
+            except queue.Full :
+                pass
+
+    def producer() :
+        try :
+            for item in items :
+                if stopped.is_set() :
+                    return
+                put((True, item))
+            put((False, None))                  # No more items
+        except Exception as error :
+            put((False, error))                 # Raised again where the items are used
+
+    thread = threading.Thread(target=producer, daemon=True)
+    thread.start()
+    try :
+        while True :
+            more, item = waiting.get()
+            if not more :
+                if item is not None :
+                    raise item
+                return
+            yield item
+    finally :
+        stopped.set()
+        thread.join()
+
+
+def read_ahead(raw_file, block_size=BLOCK_SIZE, depth=READ_AHEAD) :
+    """ Return an iterator over blocks of bytes read by a background thread.
+
+    Parameters:
+        raw_file (file): Binary file object to read.
+        block_size (int): Number of bytes to read at a time.
+        depth (int): Number of blocks that may wait to be processed.
+
+    Return:
+        iterator[bytes]: Contents of the file, in order.
+    """
+    return prefetch(iter(lambda : raw_file.read(block_size), b""), depth)
+
+
+def read_stream_blocks(raw_file, block_size=BLOCK_SIZE) :
+    """ Return an iterator over blocks of rows in a stream, read ahead in the background.
+
+    Parameters:
+        raw_file (file): Binary file object to read.
+        block_size (int): Approximate number of bytes decoded at a time.
+
+    Return:
+        iterator[list[str]]: Rows of each block, in order, without end of
+                             line characters.
+    """
+    partial = b""                               # Start of a row continued in the next block
+    for data in read_ahead(raw_file, block_size) :
+        data = partial + data
+        stop = data.rfind(b"\n") + 1
+        partial = data[stop:]
+        if stop > 0 :
+            yield data[:stop - 1].decode(ENCODING).split("\n")
+    if partial :
+        yield [partial.decode(ENCODING)]        # Last row did not end with a new line
+
+
+def read_input_blocks(raw_path, block_size=BLOCK_SIZE) :
+    """ Return an iterator over blocks of rows of the whole raw data file.
+
+    Plain files are memory mapped (see read_row_blocks). Compressed files and
+    standard input are read ahead in a background thread.
+
+    Parameters:
+        raw_path (str): Name of the raw data file, or "-" for standard input.
+        block_size (int): Approximate number of bytes decoded at a time.
+
+    Return:
+        iterator[list[str]]: Rows of each block, in file order, without end of
+                             line characters.
+    """
+    if not is_stream(raw_path) :
+        yield from read_row_blocks(raw_path, block_size=block_size)
+        return
+    with open_binary(raw_path, "rb") as raw_data_file :
+        yield from read_stream_blocks(raw_data_file, block_size)
+
+
+def read_row_blocks(raw_path, start=0, end=None, block_size=BLOCK_SIZE) :
+    """ Return an iterator over blocks of rows in a byte range of the raw data file.
+
+    Parameters:
+        raw_path (str): Name of the raw data file.
+        start (int): Byte offset of the first row to read. Must be the start of a line.
+        end (int): Byte offset to stop reading at (None for the end of the file).
+        block_size (int): Approximate number of bytes decoded at a time.
+
+    Return:
+        iterator[list[str]]: Rows of each block, in file order, without end of
+                             line characters.
+
+    Preconditions:
+        block_size > 0
+    """
+    with open(raw_path, "rb") as raw_data_file :
+        size = os.fstat(raw_data_file.fileno()).st_size
+        if end is None or end > size :
+            end = size
+        if start >= end :
+            return                          # Nothing to read (mmap rejects empty files)
+        with mmap.mmap(raw_data_file.fileno(), 0, access=mmap.ACCESS_READ) as data :
+            position = start
+            while position < end :
+                stop = data.find(b"\n", min(position + block_size, end) - 1, end)
+                stop = end if stop == -1 else stop + 1  # Block ends after a new line
+                rows = data[position:stop].decode(ENCODING).split("\n")
+                if rows[-1] == "" :
+                    rows.pop()              # Block ended with a new line, not a partial row
+                yield rows
+                position = stop
+
+
+class BulkWriter(object) :
+    """Writes text to a file in large blocks."""
+
+    def __init__(self, clean_path, append=False, block_size=BLOCK_SIZE) :
+        """
+        Parameters:
+            clean_path (str): Name of the file to write, compressed if it has
+                              a compressed file name extension, or "-" for
+                              standard output.
+            append (bool): Add to the end of the file instead of overwriting it.
+            block_size (int): Number of characters buffered before writing.
+        """
+        self._file = open_binary(clean_path, "ab" if append else "wb")
+        self._block_size = block_size
+        self._buffer = []
+        self._buffered = 0      # Number of characters in _buffer
+
+    def write(self, text) :
+        """Adds text to the file, writing the buffer once it is full.
+
+        Parameters:
+            text (str): Text to be written.
+        """
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._block_size :
+            self.flush()
+
+    def flush(self) :
+        """Writes all buffered text to the file."""
+        if self._buffer :
+            self._file.write("".join(self._buffer).encode(ENCODING))
+            self._buffer = []
+            self._buffered = 0
+        self._file.flush()
+
+    def close(self) :
+        """Writes all buffered text and closes the file."""
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) :
+        self.close()
+
+
+class BackgroundWriter(object) :
+    """Passes text to a writer (e.g. a BulkWriter) in a background thread,
+       through a bounded queue, so writing overlaps with producing the text.
+    """
+
+    def __init__(self, writer, depth=READ_AHEAD) :
+        """
+        Parameters:
+            writer (BulkWriter): Writer that the text is passed to, in order.
+                                 It is closed when this writer is closed.
+            depth (int): Number of writes that may wait before write blocks.
+        """
+        self._writer = writer
+        self._waiting = queue.Queue(depth)
+        self._error = None          # First exception raised by the writer
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) :
+        """Writes the waiting text until close is called."""
+        while True :
+            text = self._waiting.get()
+            if text is None :
+                return
+            if self._error is None :
+                try :
+                    self._writer.write(text)
+                except Exception as error :
+                    self._error = error     # Raised again by write or close
+
+    def write(self, text) :
+        """Adds text to be written, waiting if too much text is waiting already.
+
+        Parameters:
+            text (str): Text to be written.
+        """
+        if self._error is not None :
+            raise self._error
+        self._waiting.put(text)
+
+    def close(self) :
+        """Waits for all text to be written, then closes the writer."""
+        self._waiting.put(None)
+        self._thread.join()
+        self._writer.close()
+        if self._error is not None :
+            raise self._error
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) :
+        self.close()
+
+
+# Check if an attempt is made to execute this module and output error message
+if __name__ == "__main__" :
+    print("This module provides input and output functions for the Olympic",
+          "results data cleaner and is not meant to be executed on its own.")
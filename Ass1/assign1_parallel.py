@@ -0,0 +1,100 @@
+"""
+Multi-process chunked cleaning of large raw Olympics data files.
+
+The raw data file is split into byte ranges that start and end on line
+boundaries. Each range is validated and transformed in a worker process using
+the rules in assign1, and the cleaned chunks are written out in the original
+row order.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import argparse
+import multiprocessing
+import os
+
+from assign1 import clean_rows
+from assign1_io import read_row_blocks, BulkWriter
+
+
+CHUNK_SIZE = 16 * 1024 * 1024   # Default number of bytes given to a worker at a time
+
+
+def find_chunks(raw_path, chunk_size=CHUNK_SIZE) :
+    """ Return byte ranges of the file, each ending on a line boundary.
+
+    Parameters:
+        raw_path (str): Name of the raw data file.
+        chunk_size (int): Approximate number of bytes in each range.
+
+    Return:
+        list[tuple<int, int>]: (start, end) byte offsets of each range, in
+                               file order. Together they cover the whole file.
+
+    Preconditions:
+        chunk_size > 0
+    """
+    size = os.path.getsize(raw_path)
+    chunks = []
+    with open(raw_path, "rb") as raw_data_file :
+        start = 0
+        while start < size :
+            raw_data_file.seek(min(start + chunk_size, size))
+            raw_data_file.readline()        # Move on to the end of the current line
+            end = min(raw_data_file.tell(), size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def clean_chunk(chunk) :
+    """ Return the cleaned output for one byte range of the raw data file.
+
+    Parameters:
+        chunk (tuple<str, int, int>): Name of the raw data file, and the start
+                                      and end byte offsets of the range.
+
+    Return:
+        str: Cleaned rows of the range, in their original order.
+    """
+    raw_path, start, end = chunk
+    return "".join([clean_rows(rows)
+                    for rows in read_row_blocks(raw_path, start, end)])
+
+
+def clean_file_parallel(raw_path, clean_path, processes=None,
+                        chunk_size=CHUNK_SIZE) :
+    """ Clean the raw data file using a pool of worker processes.
+
+    Parameters:
+        raw_path (str): Name of the raw data file.
+        clean_path (str): Name of the cleaned data file to (over)write.
+        processes (int): Number of worker processes (None for one per CPU).
+        chunk_size (int): Approximate number of bytes cleaned per task.
+    """
+    tasks = [(raw_path, start, end)
+             for start, end in find_chunks(raw_path, chunk_size)]
+    with multiprocessing.Pool(processes) as pool, \
+         BulkWriter(clean_path) as clean_data_file :
+        for cleaned in pool.imap(clean_chunk, tasks) :   # imap keeps the chunks in order
+            clean_data_file.write(cleaned)
+
+
+def main() :
+    """Clean a raw data file in parallel, as given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("raw_path", nargs="?", default="athlete_data.csv")
+    parser.add_argument("clean_path", nargs="?", default="athlete_data_clean.csv")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="approximate bytes per chunk")
+    args = parser.parse_args()
+    clean_file_parallel(args.raw_path, args.clean_path, args.processes,
+                        args.chunk_size)
+
+
+# Call the main() function if this module is executed
+if __name__ == "__main__" :
+    main()
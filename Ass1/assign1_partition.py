@@ -0,0 +1,117 @@
+"""
+Partitioned output for the Olympics data cleaner.
+
+PartitionedWriter writes each cleaned row to one file per value of a column
+(e.g. one file per sport or per country) in an output directory, so readers
+only open the partitions they need. Only a bounded pool of the partition
+files is open at a time: the least recently used one is closed when another
+has to be opened, and reopened for appending if it is written to again. When
+the writer is closed it saves a manifest of the rows in each partition.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import json
+import os
+import re
+import zlib
+from collections import OrderedDict
+
+from assign1_io import ENCODING
+
+
+MAX_OPEN_FILES = 64             # Default number of partition files open at a time
+BUFFER_SIZE = 64 * 1024         # Bytes buffered by each open partition file
+MANIFEST_NAME = "manifest.json" # Name of the manifest in the output directory
+UNSAFE_CHARACTERS = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def partition_file_name(value) :
+    """ Return the name of the file holding the rows with a value.
+
+    Characters that are not safe in file names are replaced by "_", and a
+    checksum of the value is then added so different values get different names.
+
+    Parameters:
+        value (str): Value of the partition column.
+
+    Return:
+        str: File name, ending in ".csv".
+    """
+    safe = UNSAFE_CHARACTERS.sub("_", value) or "_"
+    if safe != value :
+        safe = "{0}-{1:08x}".format(safe, zlib.crc32(value.encode(ENCODING)))
+    return safe + ".csv"
+
+
+class PartitionedWriter(object) :
+    """Writes cleaned rows to one file per value of a column."""
+
+    def __init__(self, directory, column=None, max_open=MAX_OPEN_FILES) :
+        """
+        Parameters:
+            directory (str): Directory to write the partition files and the
+                             manifest in. It is created if it does not exist.
+                             Partitions written by an earlier run are overwritten.
+            column (int): Column the rows are partitioned by, recorded in the manifest.
+            max_open (int): Number of partition files open at a time.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._column = column
+        self._max_open = max(1, max_open)
+        self._open_files = OrderedDict()    # Open file of each value, least recently used first
+        self._rows = {}                     # Number of rows written for each value
+
+    def write_rows(self, rows) :
+        """Adds a block of cleaned rows to their partitions, with one write per partition.
+
+        Parameters:
+            rows (list[tuple<str, str>]): (value, cleaned row) of each row.
+        """
+        partitions = {}                     # Cleaned rows of each value, in order
+        for value, row in rows :
+            partitions.setdefault(value, []).append(row)
+        for value, partition_rows in partitions.items() :
+            self._get_file(value).write("".join(partition_rows).encode(ENCODING))
+            self._rows[value] += len(partition_rows)
+
+    def _get_file(self, value) :
+        """(file) Open partition file of 'value', closing the least recently used
+                  file if too many are open.
+        """
+        partition_file = self._open_files.get(value)
+        if partition_file is not None :
+            self._open_files.move_to_end(value)
+            return partition_file
+        if len(self._open_files) >= self._max_open :
+            self._open_files.popitem(last=False)[1].close()
+        mode = "ab" if value in self._rows else "wb"    # Overwrite the partition the first time
+        self._rows.setdefault(value, 0)
+        partition_file = open(os.path.join(self._directory, partition_file_name(value)),
+                              mode, buffering=BUFFER_SIZE)
+        self._open_files[value] = partition_file
+        return partition_file
+
+    def get_manifest(self) :
+        """(dict) The partition "column", the "value", "file" and "rows" of each
+                  of the "partitions", sorted by value, and the total number of "rows".
+        """
+        partitions = [{"value": value, "file": partition_file_name(value), "rows": rows}
+                      for value, rows in sorted(self._rows.items())]
+        return {"column": self._column, "partitions": partitions,
+                "rows": sum(self._rows.values())}
+
+    def close(self) :
+        """Closes every partition file and saves the manifest."""
+        while self._open_files :
+            self._open_files.popitem()[1].close()
+        with open(os.path.join(self._directory, MANIFEST_NAME), "w") as manifest_file :
+            json.dump(self.get_manifest(), manifest_file, indent=2)
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) :
+        self.close()
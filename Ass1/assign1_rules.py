@@ -0,0 +1,425 @@
+"""
+Declarative validation rules for the Olympics data cleaner.
+
+A schema is a list of rules, each a tuple of (name, kind, arguments). The
+kind selects how the rule's arguments are compiled into a fast check of one
+parsed row (see assign1_utilities.parse_row):
+
+    required:    {"columns": (int, ...)}
+                 Corrupt if any of the columns is empty.
+    max_length:  {"limits": {column: int}}
+                 Corrupt if a column is longer than its limit.
+    enum:        {"column": int, "values": (str, ...), "ignore_case": bool}
+                 Corrupt if the column is not one of the values.
+    format:      {"columns": (int, ...), "format": str, "allow": (str, ...),
+                  "first_present": bool}
+                 Corrupt if a column does not match the format ("whole",
+                 "decimal" or a regular expression) and is not an allowed
+                 value. With "first_present" only the first non-empty column
+                 is checked.
+    charset:     {"columns": (int, ...), "characters": str}
+                 Corrupt if a column contains any other character.
+    exactly_one: {"columns": (int, int), "when": (int, format)}
+                 Corrupt if the 'when' column matches the format and not
+                 exactly one of the columns has a value.
+    mapping:     {"key": int, "column": int, "values": {str: str},
+                  "ignore_case": bool}
+                 Corrupt if the key column is in 'values' and the column does
+                 not hold the value it maps to.
+    equal:       {"column": int, "other": int}
+                 Corrupt if the column has a value that differs from 'other'.
+
+Rules are checked in schema order and checking stops at the first rule that
+marks the row as corrupt. New kinds are added to RULE_COMPILERS.
+
+Checks of a single column's value (enum, format and charset) can be memoized
+in bounded, per-column ColumnCaches, as many columns only hold a few distinct
+values.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import re
+from functools import lru_cache
+from time import perf_counter
+
+
+WARM_UP_ROWS = 10000    # Default number of rows profiled before adaptive reordering
+CACHE_SIZE = 4096       # Default number of values remembered by each column cache
+
+FORMATS = {
+    "whole": str.isdigit,                           # Whole number, e.g. a place
+    "decimal": re.compile(r"[0-9.]*").fullmatch,    # Time, score or record
+}
+
+
+def compile_format(format_name) :
+    """ Return a function that tests if a string matches the format.
+
+    Parameters:
+        format_name (str): A name in FORMATS, or a regular expression that
+                           must match the whole string.
+
+    Return:
+        callable: Function of one string, returning a true value on a match.
+    """
+    if format_name in FORMATS :
+        return FORMATS[format_name]
+    return re.compile(format_name).fullmatch
+
+
+def _compile_required(columns, memo=None) :
+    """(callable) Check that none of the 'columns' is empty."""
+    columns = tuple(columns)
+
+    def check(fields) :
+        for column in columns :
+            if fields[column] == "" :
+                return True
+        return False
+    return check
+
+
+def _compile_max_length(limits, memo=None) :
+    """(callable) Check that no column is longer than its entry in 'limits'."""
+    limits = tuple(sorted(limits.items()))
+
+    def check(fields) :
+        for column, limit in limits :
+            if len(fields[column]) > limit :
+                return True
+        return False
+    return check
+
+
+def _compile_enum(column, values, ignore_case=False, memo=None) :
+    """(callable) Check that 'column' holds one of 'values'."""
+    if ignore_case :
+        values = frozenset([value.upper() for value in values])
+        if memo is None :
+            return lambda fields : fields[column].upper() not in values
+        bad = memo(column, lambda data : data.upper() not in values)
+    else :
+        values = frozenset(values)
+        if memo is None :
+            return lambda fields : fields[column] not in values
+        bad = memo(column, lambda data : data not in values)
+    return lambda fields : bad(fields[column])
+
+
+def _compile_format(columns, format, allow=(), first_present=False, memo=None) :
+    """(callable) Check that 'columns' match 'format' or an 'allow'ed value."""
+    matches = compile_format(format)
+    allow = frozenset(allow)
+
+    def bad(data) :
+        return not matches(data) and data not in allow
+    columns = tuple([(column, bad if memo is None else memo(column, bad))
+                     for column in columns])
+
+    def check(fields) :
+        for column, bad_data in columns :
+            data = fields[column]
+            if first_present and data == "" :
+                continue                    # Only the first column with a value is checked
+            if bad_data(data) :
+                return True
+            if first_present :
+                return False
+        return False
+    return check
+
+
+def _compile_charset(columns, characters, memo=None) :
+    """(callable) Check that 'columns' only contain the legal 'characters'."""
+    legal = re.compile("[" + re.escape(characters) + "]*").fullmatch
+    if memo is None :
+        columns = tuple(columns)
+
+        def check(fields) :
+            for column in columns :
+                if not legal(fields[column]) :
+                    return True
+            return False
+        return check
+
+    columns = tuple([(column, memo(column, lambda data : legal(data) is None))
+                     for column in columns])
+
+    def check(fields) :
+        for column, bad in columns :
+            if bad(fields[column]) :
+                return True
+        return False
+    return check
+
+
+def _compile_exactly_one(columns, when, memo=None) :
+    """(callable) Check that exactly one of two columns has a value, but only
+    when the 'when' column matches its format.
+    """
+    first, second = columns
+    when_column, when_format = when
+    matches = compile_format(when_format)
+    return lambda fields : (bool(matches(fields[when_column]))
+                            and (fields[first] == "") == (fields[second] == ""))
+
+
+def _compile_mapping(key, column, values, ignore_case=False, memo=None) :
+    """(callable) Check that 'column' holds the value that 'key' maps to."""
+    if ignore_case :
+        values = dict([(k, v.upper()) for k, v in values.items()])
+
+    def check(fields) :
+        expected = values.get(fields[key])
+        if expected is None :
+            return False
+        data = fields[column].upper() if ignore_case else fields[column]
+        return data != expected
+    return check
+
+
+def _compile_equal(column, other, memo=None) :
+    """(callable) Check that 'column', if it has a value, equals 'other'."""
+    return lambda fields : fields[column] != "" and fields[column] != fields[other]
+
+
+# Compiler for each kind of rule, called with the rule's arguments and a
+# memo(column, function) that memoizes a check of one column's value (or None).
+RULE_COMPILERS = {
+    "required": _compile_required,
+    "max_length": _compile_max_length,
+    "enum": _compile_enum,
+    "format": _compile_format,
+    "charset": _compile_charset,
+    "exactly_one": _compile_exactly_one,
+    "mapping": _compile_mapping,
+    "equal": _compile_equal,
+}
+
+
+def compile_rules(schema, caches=None) :
+    """ Compile every rule in the schema into a check of one parsed row.
+
+    Parameters:
+        schema (list[tuple<str, str, dict>]): (name, kind, arguments) of each
+                                              rule, in checking order.
+        caches (ColumnCaches): Caches to memoize checks of column values in
+                               (None to not memoize).
+
+    Return:
+        list[tuple<str, callable>]: (name, check) of each rule, in schema order.
+                                    check(fields) is True if the row is corrupt.
+
+    Raises:
+        ValueError: If a rule is of an unknown kind.
+    """
+    checks = []
+    for name, kind, arguments in schema :
+        if kind not in RULE_COMPILERS :
+            raise ValueError("Unknown kind of rule '{0}' for {1}".format(kind, name))
+        memo = caches.memoizer(name) if caches is not None else None
+        checks.append((name, RULE_COMPILERS[kind](memo=memo, **arguments)))
+    return checks
+
+
+def chain_checks(checks) :
+    """ Return an is_corrupt(fields) function that runs the checks in order.
+
+    Parameters:
+        checks (list[callable]): check(fields) of each rule, in checking order.
+
+    Return:
+        callable: is_corrupt(fields), True if any check marks the parsed row
+                  as corrupt. Checking stops at the first such check.
+    """
+    checks = tuple(checks)
+
+    def is_corrupt(fields) :
+        for check in checks :
+            if check(fields) :
+                return True
+        return False
+    return is_corrupt
+
+
+def compile_schema(schema, caches=None) :
+    """ Return an is_corrupt(fields) function that checks every rule in the schema.
+
+    Parameters:
+        schema (list[tuple<str, str, dict>]): (name, kind, arguments) of each
+                                              rule, in checking order.
+        caches (ColumnCaches): See compile_rules.
+
+    Return:
+        callable: is_corrupt(fields), True if any rule marks the parsed row
+                  as corrupt. Checking stops at the first such rule.
+    """
+    return chain_checks([check for name, check in compile_rules(schema, caches)])
+
+
+class ColumnCaches(object) :
+    """Bounded, least recently used caches of functions of one column's value,
+       which report how often they are hit.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE, columns=None) :
+        """
+        Parameters:
+            max_size (int): Number of values remembered by each cache.
+            columns (set[int]): Columns to memoize (None for all). Columns with
+                                many distinct values are not worth caching.
+        """
+        self._max_size = max_size
+        self._columns = columns
+        self._caches = {}       # Cached function for each label
+
+    def memoize(self, label, function) :
+        """ Return the function, memoized in a new cache.
+
+        Parameters:
+            label (str): Name of the cache in reports, e.g. "rule[column]".
+            function (callable): Function of one column's value.
+
+        Return:
+            callable: Memoized 'function'.
+        """
+        cached = lru_cache(maxsize=self._max_size)(function)
+        self._caches[label] = cached
+        return cached
+
+    def memoizer(self, name) :
+        """(callable) memo(column, function) for the rule or step called 'name'.
+                      Functions of columns that are not cached are returned
+                      unchanged.
+        """
+        def memo(column, function) :
+            if self._columns is not None and column not in self._columns :
+                return function
+            return self.memoize("{0}[{1}]".format(name, column), function)
+        return memo
+
+    def get_stats(self) :
+        """(list[dict]) "label", "hits", "misses", "size" and "hit_rate" of
+                        each cache, in the order they were created.
+        """
+        stats = []
+        for label, cached in self._caches.items() :
+            info = cached.cache_info()
+            lookups = info.hits + info.misses
+            stats.append({"label": label,
+                          "hits": info.hits,
+                          "misses": info.misses,
+                          "size": info.currsize,
+                          "hit_rate": info.hits / lookups if lookups else 0.0})
+        return stats
+
+    def __str__(self) :
+        line = "{0:<32} {1:>12} {2:>10} {3:>8} {4:>9}"
+        lines = [line.format("Cache", "Hits", "Misses", "Size", "Hit rate")]
+        for stats in self.get_stats() :
+            lines.append(line.format(stats["label"], stats["hits"], stats["misses"],
+                                     stats["size"], "{0:.1%}".format(stats["hit_rate"])))
+        return "\n".join(lines)
+
+
+class RuleProfiler(object) :
+    """Checks rows against compiled rules, counting the calls, hits and time
+       spent in each rule.
+
+       In adaptive mode the rules are reordered by their cost per hit once
+       'warm_up' rows have been checked, so the rules that find corrupt rows
+       most cheaply are tried first. Profiling then stops and the reordered
+       rules are checked without timing. Every rule is still checked until
+       one marks the row as corrupt, so the same rows are marked corrupt in
+       any order.
+    """
+
+    def __init__(self, rules, adaptive=False, warm_up=WARM_UP_ROWS) :
+        """
+        Parameters:
+            rules (list[tuple<str, callable>]): (name, check) of each rule,
+                                                see compile_rules.
+            adaptive (bool): Reorder the rules after the warm up.
+            warm_up (int): Number of rows profiled before reordering.
+        """
+        self._rules = list(rules)
+        self._calls = [0] * len(self._rules)
+        self._hits = [0] * len(self._rules)
+        self._seconds = [0.0] * len(self._rules)
+        self._order = list(range(len(self._rules)))     # Index of each rule, in checking order
+        self._adaptive = adaptive
+        self._warm_up = warm_up
+        self._rows = 0              # Number of rows profiled
+        self._fast_check = None     # Unprofiled is_corrupt, once the warm up is over
+
+    def is_corrupt(self, fields) :
+        """ Return True if any of the rules marks the row as corrupt.
+
+        Parameters:
+            fields (list[str]): Data in each column of the row (see parse_row).
+
+        Return:
+            bool: True if the row is corrupt.
+        """
+        if self._fast_check is not None :
+            return self._fast_check(fields)
+
+        corrupt = False
+        for index in self._order :
+            start = perf_counter()
+            hit = self._rules[index][1](fields)
+            self._seconds[index] += perf_counter() - start
+            self._calls[index] += 1
+            if hit :
+                self._hits[index] += 1
+                corrupt = True
+                break
+
+        self._rows += 1
+        if self._adaptive and self._rows >= self._warm_up :
+            self.reorder()
+            self._fast_check = chain_checks([self._rules[index][1]
+                                             for index in self._order])
+        return corrupt
+
+    def reorder(self) :
+        """Orders the rules from lowest to highest cost per hit so far."""
+        self._order.sort(key=self._cost_per_hit)
+
+    def _cost_per_hit(self, index) :
+        """(float) Seconds spent in a rule for each row it marked corrupt."""
+        if self._hits[index] == 0 :
+            return float("inf")
+        return self._seconds[index] / self._hits[index]
+
+    def get_order(self) :
+        """(list[str]) Names of the rules, in checking order."""
+        return [self._rules[index][0] for index in self._order]
+
+    def get_stats(self) :
+        """(list[dict]) "name", "calls", "hits", "seconds" and "cost_per_hit"
+                        of each rule, in checking order.
+        """
+        return [{"name": self._rules[index][0],
+                 "calls": self._calls[index],
+                 "hits": self._hits[index],
+                 "seconds": self._seconds[index],
+                 "cost_per_hit": self._cost_per_hit(index)}
+                for index in self._order]
+
+    def __str__(self) :
+        line = "{0:<28} {1:>10} {2:>10} {3:>12} {4:>14}"
+        lines = [line.format("Rule", "Calls", "Hits", "Time (ms)", "us/hit")]
+        for stats in self.get_stats() :
+            lines.append(line.format(stats["name"], stats["calls"], stats["hits"],
+                                     "{0:.2f}".format(stats["seconds"] * 1e3),
+                                     "{0:.2f}".format(stats["cost_per_hit"] * 1e6)))
+        return "\n".join(lines)
+
+
+# Check if an attempt is made to execute this module and output error message
+if __name__ == "__main__" :
+    print("This module provides the validation rule engine for the Olympic",
+          "results data cleaner and is not meant to be executed on its own.")
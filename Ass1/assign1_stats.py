@@ -0,0 +1,249 @@
+"""
+Single pass, bounded memory statistics of a raw Olympics data file.
+
+Used by the cleaner's dry run, which checks every rule of every row without
+transforming or writing anything. DataStatistics counts how many rows fail
+each rule, estimates the number of distinct values in chosen columns with a
+HyperLogLog sketch, and keeps the minimum, maximum and a fixed bucket
+histogram of numeric columns. Memory use does not grow with the file.
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import math
+
+from assign1_index import rule_mask
+from assign1_utilities import parse_row
+
+
+PRECISION = 12      # Default HyperLogLog precision: 4096 registers, about 1.6% error
+HASH_BITS = 64      # Number of bits of a hash used by HyperLogLog
+
+
+class HyperLogLog(object) :
+    """Estimates the number of distinct values added, in fixed memory."""
+
+    def __init__(self, precision=PRECISION) :
+        """
+        Parameters:
+            precision (int): Number of hash bits used to choose a register
+                             (4 to 16). More registers give a better estimate.
+        """
+        self._precision = precision
+        self._registers = bytearray(1 << precision)
+        self._rank_bits = HASH_BITS - precision
+
+    def add(self, value) :
+        """Adds a value to the sketch.
+
+        Parameters:
+            value (str): Value to be counted. Values are hashed with hash(), so
+                         estimates are only valid within one run.
+        """
+        hashed = hash(value) & ((1 << HASH_BITS) - 1)
+        register = hashed & ((1 << self._precision) - 1)
+        rank = self._rank_bits - (hashed >> self._precision).bit_length() + 1
+        if rank > self._registers[register] :
+            self._registers[register] = rank
+
+    def estimate(self) :
+        """(int) Estimated number of distinct values added."""
+        size = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum([2.0 ** -rank for rank in self._registers])
+        empty = self._registers.count(0)
+        if estimate <= 2.5 * size and empty > 0 :
+            estimate = size * math.log(size / empty)    # Linear counting for small sets
+        return int(round(estimate))
+
+
+class Histogram(object) :
+    """Counts of numeric values in equal width buckets between fixed bounds."""
+
+    def __init__(self, low, high, buckets) :
+        """
+        Parameters:
+            low (float): Lower bound of the first bucket.
+            high (float): Upper bound of the last bucket.
+            buckets (int): Number of buckets.
+        """
+        self._low = low
+        self._width = (high - low) / buckets
+        self._counts = [0] * buckets
+        self._below = 0         # Number of values below 'low'
+        self._above = 0         # Number of values at or above 'high'
+        self._count = 0
+        self._total = 0.0
+        self._min = None
+        self._max = None
+
+    def add(self, value) :
+        """Adds a value to the histogram.
+
+        The value is checked before anything is counted, so a value that is
+        rejected leaves the histogram unchanged.
+
+        Parameters:
+            value (float): Value to be counted.
+
+        Raise:
+            ValueError: if 'value' is not a finite number (e.g. inf or nan).
+        """
+        value = float(value)
+        if not math.isfinite(value) :
+            raise ValueError("Histogram values must be finite, not {0}".format(value))
+        bucket = int((value - self._low) // self._width)
+        self._count += 1
+        self._total += value
+        if self._min is None or value < self._min :
+            self._min = value
+        if self._max is None or value > self._max :
+            self._max = value
+        if bucket < 0 :
+            self._below += 1
+        elif bucket >= len(self._counts) :
+            self._above += 1
+        else :
+            self._counts[bucket] += 1
+
+    def get_count(self) :
+        """(int) Number of values added."""
+        return self._count
+
+    def get_min(self) :
+        """(float) Smallest value added, or None if there are none."""
+        return self._min
+
+    def get_max(self) :
+        """(float) Largest value added, or None if there are none."""
+        return self._max
+
+    def get_mean(self) :
+        """(float) Mean of the values added, or None if there are none."""
+        return self._total / self._count if self._count else None
+
+    def get_buckets(self) :
+        """(list[tuple<float, float, int>]) (low, high, count) of each bucket."""
+        return [(self._low + index * self._width, self._low + (index + 1) * self._width, count)
+                for index, count in enumerate(self._counts)]
+
+    def get_out_of_bounds(self) :
+        """(tuple<int, int>) Number of values below the first bucket and above the last."""
+        return self._below, self._above
+
+
+class DataStatistics(object) :
+    """Statistics of the rows of a raw data file, gathered in one pass."""
+
+    def __init__(self, rules, distinct_columns, numeric_columns, precision=PRECISION) :
+        """
+        Parameters:
+            rules (list[tuple<str, callable>]): (name, check) of each rule, see
+                                                assign1_rules.compile_rules.
+            distinct_columns (dict[int, str]): Name of each column to estimate
+                                               the number of distinct values of.
+            numeric_columns (dict[int, tuple<str, float, float, int>]): Name,
+                lower bound, upper bound and number of histogram buckets of
+                each numeric column.
+            precision (int): See HyperLogLog.
+        """
+        self._rules = list(rules)
+        self._failures = [0] * len(self._rules)     # Rows failing each rule
+        self._rows = 0
+        self._corrupt = 0
+        self._distinct = [(column, name, HyperLogLog(precision))
+                          for column, name in distinct_columns.items()]
+        self._numeric = [(column, name, Histogram(low, high, buckets))
+                         for column, (name, low, high, buckets) in numeric_columns.items()]
+        self._non_numeric = dict([(column, 0) for column in numeric_columns])
+
+    def add_rows(self, rows) :
+        """Adds a block of raw rows to the statistics.
+
+        Parameters:
+            rows (list[str]): Raw rows of the data file.
+        """
+        for row in rows :
+            self.add(parse_row(row))
+
+    def add(self, fields) :
+        """Adds one parsed row to the statistics.
+
+        Parameters:
+            fields (list[str]): Data in each column of the row (see parse_row).
+        """
+        self._rows += 1
+        mask = rule_mask(self._rules, fields)
+        if mask :
+            self._corrupt += 1
+            for bit in range(len(self._rules)) :
+                if mask & (1 << bit) :
+                    self._failures[bit] += 1
+        for column, name, sketch in self._distinct :
+            sketch.add(fields[column])
+        for column, name, histogram in self._numeric :
+            data = fields[column]
+            if data == "" :
+                continue
+            try :
+                value = float(data)
+            except ValueError :
+                value = None                            # e.g. DNS in the Place column
+            if value is None or not math.isfinite(value) :
+                self._non_numeric[column] += 1          # inf and nan are not counted either
+            else :
+                histogram.add(value)
+
+    def get_row_count(self) :
+        """(int) Number of rows added."""
+        return self._rows
+
+    def get_corrupt_count(self) :
+        """(int) Number of rows failing at least one rule."""
+        return self._corrupt
+
+    def get_failures(self) :
+        """(dict[str, int]) Number of rows failing each rule, by rule name."""
+        return dict(zip([name for name, check in self._rules], self._failures))
+
+    def get_distinct(self) :
+        """(dict[str, int]) Estimated number of distinct values, by column name."""
+        return dict([(name, sketch.estimate()) for column, name, sketch in self._distinct])
+
+    def get_non_numeric(self) :
+        """(dict[str, int]) Number of values that are not finite numbers, by column name."""
+        return dict([(name, self._non_numeric[column])
+                     for column, name, histogram in self._numeric])
+
+    def get_histograms(self) :
+        """(dict[str, Histogram]) Histogram of each numeric column, by column name."""
+        return dict([(name, histogram) for column, name, histogram in self._numeric])
+
+    def __str__(self) :
+        rate = lambda count : "{0:.2%}".format(count / self._rows if self._rows else 0)
+        lines = ["Rows: {0}   Corrupt: {1} ({2})".format(self._rows, self._corrupt,
+                                                         rate(self._corrupt)),
+                 "",
+                 "{0:<28} {1:>12} {2:>8}".format("Rule", "Rows failed", "Rate")]
+        for name, count in self.get_failures().items() :
+            lines.append("{0:<28} {1:>12} {2:>8}".format(name, count, rate(count)))
+        lines.append("")
+        for name, estimate in self.get_distinct().items() :
+            lines.append("Distinct {0}: ~{1}".format(name, estimate))
+        for column, name, histogram in self._numeric :
+            lines.append("")
+            lines.append("{0}: {1} values, min {2}, max {3}, mean {4}, {5} not numeric".format(
+                name, histogram.get_count(), histogram.get_min(), histogram.get_max(),
+                None if histogram.get_mean() is None else round(histogram.get_mean(), 3),
+                self._non_numeric[column]))
+            buckets = histogram.get_buckets()
+            below, above = histogram.get_out_of_bounds()
+            if below :
+                lines.append("  {0:<20} {1:>10}".format("< {0:.2f}".format(buckets[0][0]), below))
+            for low, high, count in buckets :
+                if count :
+                    lines.append("  [{0:>8.2f}, {1:>8.2f}) {2:>10}".format(low, high, count))
+            if above :
+                lines.append("  {0:<20} {1:>10}".format(">= {0:.2f}".format(buckets[-1][1]), above))
+        return "\n".join(lines)
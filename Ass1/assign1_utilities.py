@@ -15,6 +15,65 @@ __date__ = "15/02/2018"
 __copyright__ = "The University of Queensland, 2018"
 
 
+import csv
+
+
+
+def parse_row(row) :
+    """Return the data in every column of the row, splitting the row only once.
+
+    Quoted fields (e.g. "Smith, Jr") may contain commas and doubled quote
+    characters. The end of line characters are not part of the last column.
+
+    Parameters:
+        row (str): String of data with comma separators (CSV format).
+
+    Return:
+        list[str]: Data at each column position in 'row'.
+
+    Preconditions:
+        row != None
+    """
+    row = row.rstrip("\r\n")
+    if '"' not in row :
+        return row.split(',')       # No quoted fields, so a plain split is exact
+    return next(csv.reader([row]))
+
+
+
+def format_row(fields) :
+    """Return a CSV row, including the end of line, containing the fields.
+
+    This is the inverse of parse_row. Fields containing a comma, quote or
+    end of line character are quoted.
+
+    Parameters:
+        fields (list[str]): Data for each column of the row.
+
+    Return:
+        str: 'fields' with comma separators (CSV format), ending with "\n".
+
+    Preconditions:
+        fields != None
+    """
+    return ",".join([_quote_field(field) for field in fields]) + "\n"
+
+
+
+def _quote_field(field) :
+    """Return 'field' quoted for CSV output if it contains special characters.
+
+    Parameters:
+        field (str): Data for one column.
+
+    Return:
+        str: 'field', quoted and with quotes doubled if necessary.
+    """
+    if ',' in field or '"' in field or '\n' in field or '\r' in field :
+        return '"' + field.replace('"', '""') + '"'
+    return field
+
+
 
 def get_column(row, column_number) :
     """Return a string containing the data at the indicated column in the row.
@@ -52,12 +111,37 @@ def replace_column(row, data, column_number) :
     """
     row_data = row.split(',')
     row_data[column_number] = data
+    return ",".join(row_data)       # Join once, with a comma between each column
+
+
+
+def rewrite_columns(fields, transforms, dropped_columns=(), extra_columns=()) :
+    """Return a CSV row with a whole set of column transforms applied in one pass.
+
+    Parameters:
+        fields (list[str]): Data for each column of the row (see parse_row).
+        transforms (dict[int, callable]): Function to apply to the data in each
+            column, keyed by column number. Columns not in 'transforms' are
+            copied unchanged.
+        dropped_columns (set[int]): Columns left out of the resulting row.
+        extra_columns (list[str]): Data appended after the last column.
+
+    Return:
+        str: Updated row in CSV format, ending with "\n" (see format_row).
 
-    # Create resulting string with updated data in column_number
-    resulting_row = ""
-    for column_data in row_data :
-        resulting_row += column_data + ","    # Add comma between each column
-    return resulting_row[:-1]           # Remove extra comma at end of string
+    Preconditions:
+        fields != None and transforms != None
+    """
+    resulting_fields = []
+    for column_number, data in enumerate(fields) :
+        if column_number in dropped_columns :
+            continue
+        transform = transforms.get(column_number)
+        if transform is not None :
+            data = transform(data)
+        resulting_fields.append(data)
+    resulting_fields.extend(extra_columns)
+    return format_row(resulting_fields)
 
 
 
@@ -0,0 +1,599 @@
+"""
+Tests of the raw data cleaner and its support modules.
+
+Run from the Ass1 directory with:
+    python -m unittest test_assign1
+"""
+
+__author__ = "Minjae Lee, 45363809"
+
+
+import bz2
+import contextlib
+import gzip
+import io
+import json
+import lzma
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import assign1
+import assign1_batch
+import assign1_benchmark
+import assign1_incremental
+import assign1_parallel
+from assign1_dedup import BloomFilter, DuplicateFilter
+from assign1_events import find_event_violations
+from assign1_generate import generate_rows, parse_rates, write_raw_file, CORRUPTIONS
+from assign1_index import IndexReader, rule_mask
+from assign1_partition import MANIFEST_NAME, partition_file_name
+from assign1_io import read_row_blocks, read_input_blocks, BulkWriter, BackgroundWriter
+from assign1_io import prefetch
+from assign1_rules import ColumnCaches, RuleProfiler, compile_rules
+from assign1_stats import Histogram, DataStatistics
+from assign1_utilities import parse_row, format_row, replace_column, rewrite_columns
+
+
+VALID_ROW = "1,Moguls,Rohan,Chapman-Davies,AUS,4,73.96,,,,,\n"
+
+
+def raw_row(**columns) :
+    """(str) VALID_ROW with the given columns (e.g. c11="12.5") replaced."""
+    fields = parse_row(VALID_ROW)
+    for name, data in columns.items() :
+        fields[int(name[1:])] = data
+    return ",".join(fields) + "\n"
+
+
+class TempDirTestCase(unittest.TestCase) :
+    """Test case with a temporary directory, removed afterwards."""
+
+    def setUp(self) :
+        self._temp = tempfile.TemporaryDirectory()
+        self.directory = self._temp.name
+
+    def tearDown(self) :
+        self._temp.cleanup()
+
+    def path(self, name) :
+        """(str) Name of a file in the temporary directory."""
+        return os.path.join(self.directory, name)
+
+    def write(self, name, text) :
+        """Write 'text' to a file in the temporary directory, returning its name."""
+        with open(self.path(name), "w", encoding="utf-8") as data_file :
+            data_file.write(text)
+        return self.path(name)
+
+    def read(self, name) :
+        """(str) Contents of a file in the temporary directory."""
+        with open(self.path(name), encoding="utf-8") as data_file :
+            return data_file.read()
+
+
+class UtilitiesTests(unittest.TestCase) :
+    """Parsing rows once and rewriting their columns in one pass."""
+
+    def test_parse_and_format_are_inverses(self) :
+        fields = ["1", "Moguls", "Smith, Jr", 'The "Flash"', "AUS", "", ""]
+        row = format_row(fields)
+        self.assertEqual(row, '1,Moguls,"Smith, Jr","The ""Flash""",AUS,,\n')
+        self.assertEqual(parse_row(row), fields)
+        self.assertEqual(parse_row("a,b,c\r\n"), ["a", "b", "c"])
+
+    def test_rewrite_columns(self) :
+        fields = parse_row(VALID_ROW)
+        row = rewrite_columns(fields, {1: str.upper, 4: str.lower}, {0}, ["CORRUPT"])
+        self.assertEqual(row, "MOGULS,Rohan,Chapman-Davies,aus,4,73.96,,,,,,CORRUPT\n")
+        self.assertEqual(rewrite_columns(fields, {}), VALID_ROW)
+
+    def test_replace_column(self) :
+        self.assertEqual(replace_column("a,b,c", "x", 1), "a,x,c")
+
+
+class CleanerTests(TempDirTestCase) :
+    """Cleaning rows and files."""
+
+    def test_rows_clean_as_before(self) :
+        # Expected output of the original row-by-row cleaner
+        cases = [
+            ("1,Moguls,Rohan,Chapman-Davies,aus,1,73.96,,gold,,,\n",
+             "Moguls,Rohan,Chapman-Davies,AUS,1,73.96,,Gold,,,\n"),
+            ("2,Moguls,Matt,Graham,AUS,2,82.57,,Bronze,,,\n",
+             "Moguls,Matt,Graham,AUS,2,82.57,,Bronze,,,,CORRUPT\n"),
+            ("3,Moguls,Brodie,Summers,AUS,DNF,,,,,,\n",
+             "Moguls,Brodie,Summers,AUS,DNF,,,,,,\n"),
+            ("4,Speed Skating 500m,A Very Long First Name That Goes On,Smith,CAN,4,,"
+             "34.934,,34.934,34.934,12345678\n",
+             "Speed Skating 500m,A Very Long First Name That Go,Smith,CAN,4,,"
+             "34.934,,34.934,34.934,12345678,CORRUPT\n"),
+            ("5,Luge,Chris,Mazdzer,USA,4,,190.72a,,,,\n",
+             "Luge,Chris,Mazdzer,USA,4,,190.72a,,,,,CORRUPT\n"),
+        ]
+        for row, cleaned in cases :
+            self.assertEqual(assign1.clean_raw_row(row), cleaned)
+        raw_path = self.write("raw.csv", "".join([row for row, cleaned in cases]))
+        self.assertEqual(assign1.clean_file(raw_path, self.path("clean.csv")), len(cases))
+        self.assertEqual(self.read("clean.csv"), "".join([cleaned for row, cleaned in cases]))
+
+    def test_valid_row(self) :
+        self.assertEqual(assign1.clean_raw_row(VALID_ROW),
+                         "Moguls,Rohan,Chapman-Davies,AUS,4,73.96,,,,,\n")
+
+    def test_last_column_counts_end_of_line(self) :
+        # The last column was always measured with its "\n", so 8 characters are too long
+        self.assertFalse(assign1.is_corrupt(parse_row(raw_row(c11="1234567"))))
+        self.assertTrue(assign1.is_corrupt(parse_row(raw_row(c11="12345678"))))
+        self.assertFalse(assign1.is_corrupt(parse_row(raw_row(c9="12345678",
+                                                              c10="12345678"))))
+
+
+class RuleTests(unittest.TestCase) :
+    """The compiled corruption rules."""
+
+    def test_generated_rows_are_valid(self) :
+        for row in generate_rows(500, seed=1) :
+            self.assertFalse(assign1.is_corrupt(parse_row(row)), row)
+
+    def test_generator_is_repeatable(self) :
+        self.assertEqual(list(generate_rows(20, {"rule_place": 0.5}, seed=3)),
+                         list(generate_rows(20, {"rule_place": 0.5}, seed=3)))
+        self.assertEqual(parse_rates("all=0.1,rule_place=0.5")["rule_place"], 0.5)
+        self.assertEqual(parse_rates("all=0.1")["rule_numbers"], 0.1)
+        self.assertRaises(ValueError, parse_rates, "no_such_rule=0.1")
+
+    def test_each_rule_catches_generated_corruption(self) :
+        rules = dict(assign1.ATHLETE_RULES)
+        self.assertEqual(sorted(rules), sorted(CORRUPTIONS))
+        for name in CORRUPTIONS :
+            for row in generate_rows(50, {name: 1.0}, seed=2) :
+                fields = parse_row(row)
+                self.assertTrue(rules[name](fields), (name, row))
+                self.assertTrue(assign1.is_corrupt(fields), (name, row))
+
+    def test_each_rule_catches_its_corruption(self) :
+        corruptions = {"check_missing_entry": raw_row(c1=""),
+                       "max_char_corrupt": raw_row(c4="AUST"),
+                       "check_valid_medal": raw_row(c8="Tin"),
+                       "check_col_6_7_8": raw_row(c6=""),
+                       "check_col_9_6": raw_row(c5="1"),
+                       "check_world_olympic_record": raw_row(c9="74.50", c10="73.10"),
+                       "rule_place": raw_row(c5="4th"),
+                       "rule_illegal_character": raw_row(c2="Ro#han"),
+                       "rule_numbers": raw_row(c6="73.9s")}
+        rules = dict(assign1.ATHLETE_RULES)
+        self.assertEqual(sorted(rules), sorted(corruptions))
+        for name, row in corruptions.items() :
+            fields = parse_row(row)
+            self.assertEqual([rule for rule, check in assign1.ATHLETE_RULES if check(fields)],
+                             [name])
+            self.assertTrue(assign1.is_corrupt(fields), (name, row))
+        self.assertFalse(assign1.is_corrupt(parse_row(VALID_ROW)))
+
+    def test_cached_rules_and_transforms(self) :
+        caches = ColumnCaches(64, assign1.CACHED_COLUMNS)
+        rules = compile_rules(assign1.ATHLETE_SCHEMA, caches)
+        transforms = assign1.cached_transforms(caches)
+        for row in generate_rows(200, {"rule_place": 0.2}, seed=5) :
+            fields = parse_row(row)
+            corrupt = any([check(fields) for name, check in rules])
+            self.assertEqual(corrupt, assign1.is_corrupt(fields))
+            self.assertEqual(assign1.clean_row(fields, corrupt, transforms),
+                             assign1.clean_raw_row(row))
+        labels = [stats["label"] for stats in caches.get_stats()]
+        self.assertIn("clean_row[4]", labels)
+        for column in (2, 3) :          # Names have too many distinct values
+            self.assertNotIn("clean_row[{0}]".format(column), labels)
+            self.assertNotIn("rule_illegal_character[{0}]".format(column), labels)
+
+
+class ProfilerTests(unittest.TestCase) :
+    """Counting the rules' calls and hits, and reordering them."""
+
+    def setUp(self) :
+        self.rows = [parse_row(row) for row in generate_rows(300, {"rule_place": 0.3}, seed=7)]
+        self.corrupt = [assign1.is_corrupt(fields) for fields in self.rows]
+
+    def test_counts(self) :
+        profiler = RuleProfiler(assign1.ATHLETE_RULES)
+        self.assertEqual([profiler.is_corrupt(fields) for fields in self.rows], self.corrupt)
+        stats = profiler.get_stats()
+        self.assertEqual(stats[0]["calls"], len(self.rows))
+        self.assertEqual(sum([rule["hits"] for rule in stats]), sum(self.corrupt))
+        self.assertEqual(profiler.get_order(), [name for name, check in assign1.ATHLETE_RULES])
+
+    def test_adaptive_reordering(self) :
+        profiler = RuleProfiler(assign1.ATHLETE_RULES, adaptive=True, warm_up=100)
+        self.assertEqual([profiler.is_corrupt(fields) for fields in self.rows], self.corrupt)
+        costs = [rule["cost_per_hit"] for rule in profiler.get_stats()]
+        self.assertEqual(costs, sorted(costs))
+        self.assertEqual(profiler.get_order()[0], "rule_place")   # The only rule with hits
+        self.assertEqual(profiler.get_stats()[0]["calls"], 100)    # Not profiled after warm up
+
+
+class BenchmarkTests(TempDirTestCase) :
+    """Measuring the cleaner on a raw data file."""
+
+    def test_file_is_measured(self) :
+        raw_path = self.path("raw.csv")
+        write_raw_file(raw_path, 200, parse_rates("all=0.1"), seed=3)
+        result = assign1_benchmark.benchmark_file(raw_path)
+        self.assertEqual(result["rows"], 200)
+        if assign1_benchmark.resource is not None :
+            self.assertGreater(result["peak_memory"], 0)
+
+    def test_generating_needs_a_raw_path(self) :
+        arguments = ["assign1_benchmark.py", "-n", "10"]
+        with mock.patch("sys.argv", arguments), contextlib.redirect_stderr(io.StringIO()) :
+            self.assertRaises(SystemExit, assign1_benchmark.main)
+
+
+class DuplicateTests(TempDirTestCase) :
+    """Finding duplicate rows in bounded memory."""
+
+    def test_bloom_filter(self) :
+        bloom = BloomFilter(2000, 0.01)       # Room for the keys and the others
+        keys = ["key{0}".format(number) for number in range(1000)]
+        self.assertLess([bloom.add(key) for key in keys].count(True), 50)
+        self.assertTrue(all([bloom.add(key) for key in keys]))      # Never misses one
+        others = [bloom.add("other{0}".format(number)) for number in range(1000)]
+        self.assertLess(others.count(True), 50)
+
+    def test_exact_keys_then_bloom_filter(self) :
+        rows = [parse_row(row) for row in generate_rows(300, seed=11)]
+        expected = []
+        seen = set()
+        for fields in rows + rows[:50] :
+            expected.append(tuple(fields[1:5]) in seen)
+            seen.add(tuple(fields[1:5]))
+        for memory_limit in (10 ** 9, 2000) :
+            duplicates = DuplicateFilter([1, 2, 3, 4], memory_limit, capacity=1000)
+            found = [duplicates.is_duplicate(fields) for fields in rows + rows[:50]]
+            self.assertEqual(duplicates.is_exact(), memory_limit > 2000)
+            if duplicates.is_exact() :
+                self.assertEqual(found, expected)
+            else :              # No duplicate missed, few rows wrongly reported
+                self.assertTrue(all([found[number] for number, duplicate
+                                     in enumerate(expected) if duplicate]))
+                self.assertLess(found.count(True) - expected.count(True), 5)
+            self.assertEqual(duplicates.get_stats()["duplicates"], found.count(True))
+
+    def test_clean_file_marks_or_drops_duplicates(self) :
+        rows = [VALID_ROW, raw_row(c0="2"), raw_row(c2="Matt"), VALID_ROW]
+        raw_path = self.write("raw.csv", "".join(rows))
+        assign1.clean_file(raw_path, self.path("clean.csv"),
+                           duplicates=DuplicateFilter([1, 2, 3, 4]))
+        lines = self.read("clean.csv").splitlines()
+        self.assertEqual([line.endswith(",DUPLICATE") for line in lines],
+                         [False, True, False, True])
+        assign1.clean_file(raw_path, self.path("clean.csv"),
+                           duplicates=DuplicateFilter(), drop_duplicates=True)
+        self.assertEqual(len(self.read("clean.csv").splitlines()), 3)
+
+
+class EventTests(TempDirTestCase) :
+    """Event invariants checked across rows, partitioned on disk."""
+
+    def test_violations(self) :
+        rows = [raw_row(c1="Luge", c5="1", c8="Gold"),
+                raw_row(c1="Luge", c5="01", c8="Gold"),         # Same place, second gold
+                raw_row(c1="Luge", c5="2"),
+                raw_row(c1="Moguls", c5="1", c8="Gold"),
+                raw_row(c1="Moguls", c5="DNF"),
+                raw_row(c1="Moguls", c5="DNF"),                 # Not a place
+                raw_row(c1="Moguls", c5="\u00b2"),
+                raw_row(c1="Moguls", c5="\u00b2")]              # A digit, but not a number
+        rows += list(generate_rows(100, seed=12))
+        raw_path = self.write("raw.csv", "".join(rows))
+        violations = find_event_violations(raw_path, memory_budget=64, temp_dir=self.directory)
+        self.assertEqual(os.listdir(self.directory), ["raw.csv"])   # Partitions removed
+        rules = dict(violations.get_rules())
+        marked = [[name for name in sorted(rules) if rules[name](parse_row(row))]
+                  for row in rows[:8]]
+        both = ["one_gold_per_event", "unique_place_per_event"]
+        self.assertEqual(marked, [both, both, [], [], [], [], [], []])
+
+
+class PartitionTests(TempDirTestCase) :
+    """Writing one cleaned file per value of a column."""
+
+    def test_partition_file_names(self) :
+        self.assertEqual(partition_file_name("AUS"), "AUS.csv")
+        self.assertNotEqual(partition_file_name("a/b"), partition_file_name("a_b"))
+        self.assertNotEqual(partition_file_name(""), partition_file_name("_"))
+
+    def test_partitions_hold_every_cleaned_row(self) :
+        rows = list(generate_rows(300, {"max_char_corrupt": 0.05}, seed=13))
+        rows.append(raw_row(c4="aus"))          # Partitioned by the cleaned value
+        raw_path = self.write("raw.csv", "".join(rows))
+        directory = self.path("out")
+        self.assertEqual(assign1.clean_file_partitioned(raw_path, directory, 4, max_open=3),
+                         len(rows))
+        with open(os.path.join(directory, MANIFEST_NAME)) as manifest_file :
+            manifest = json.load(manifest_file)
+        self.assertEqual((manifest["column"], manifest["rows"]), (4, len(rows)))
+        expected = {}
+        for row in rows :
+            code = parse_row(row)[4].upper()
+            expected.setdefault(code, []).append(assign1.clean_raw_row(row))
+        self.assertEqual(sorted([partition["value"] for partition in manifest["partitions"]]),
+                         sorted(expected))
+        for partition in manifest["partitions"] :
+            self.assertEqual(self.read(os.path.join("out", partition["file"])),
+                             "".join(expected[partition["value"]]))
+            self.assertEqual(partition["rows"], len(expected[partition["value"]]))
+
+    def test_partition_column_is_checked(self) :
+        raw_path = self.write("raw.csv", "".join(generate_rows(10, seed=13)))
+        for column in ("12", "-1") :
+            arguments = ["assign1.py", "--partition-by", column, raw_path, self.path("out")]
+            with mock.patch("sys.argv", arguments), contextlib.redirect_stderr(io.StringIO()) :
+                self.assertRaises(SystemExit, assign1.main)
+        self.assertFalse(os.path.exists(self.path("out")))
+
+
+class IndexTests(TempDirTestCase) :
+    """The corrupt row index written alongside the cleaned file."""
+
+    def test_index_matches_cleaned_file(self) :
+        rows = list(generate_rows(200, {"rule_place": 0.1, "check_valid_medal": 0.1}, seed=10))
+        rows.append(raw_row(c2="Zoë"))          # Offsets count bytes, not characters
+        rows.append(raw_row(c2="Zoë"))
+        raw_path = self.write("raw.csv", "".join(rows))
+        index_path = self.path("clean.idx")
+        self.assertEqual(assign1.clean_file(raw_path, self.path("clean.csv"),
+                                            index_path=index_path), len(rows))
+        self.assertEqual(self.read("clean.csv"), assign1.clean_rows(rows))
+        with open(self.path("clean.csv"), "rb") as clean_data_file :
+            lines = clean_data_file.read().splitlines(True)
+        masks = [rule_mask(assign1.ATHLETE_RULES, parse_row(row)) for row in rows]
+        with IndexReader(index_path) as index :
+            self.assertEqual(index.get_rules(), [name for name, check in assign1.ATHLETE_RULES])
+            records = list(index.records())
+            self.assertEqual([mask for offset, mask in records], masks)
+            offsets = [sum([len(line) for line in lines[:number]]) for number in range(len(lines))]
+            self.assertEqual([offset for offset, mask in records], offsets)
+            self.assertEqual(index.get_record(len(rows) - 1), records[-1])
+            self.assertRaises(IndexError, index.get_record, len(rows))
+            place = index.mask_of(["rule_place"])
+            self.assertEqual([number for number, offset in index.select(["rule_place"])],
+                             [number for number, mask in enumerate(masks) if mask & place])
+            counts, row_count = index.count_failures()
+            self.assertEqual(row_count, len(rows))
+            self.assertEqual(counts["rule_place"], len([mask for mask in masks if mask & place]))
+
+    def test_not_an_index(self) :
+        self.assertRaises(ValueError, IndexReader, self.write("clean.idx", "not an index"))
+
+
+class StatisticsTests(unittest.TestCase) :
+    """Single pass statistics of a dry run."""
+
+    def test_histogram(self) :
+        histogram = Histogram(0, 10, 5)
+        for value in (1, 3, 3.5, 9.99, -1, 10) :
+            histogram.add(value)
+        self.assertEqual([count for low, high, count in histogram.get_buckets()],
+                         [1, 2, 0, 0, 1])
+        self.assertEqual(histogram.get_out_of_bounds(), (1, 1))
+        self.assertEqual((histogram.get_min(), histogram.get_max()), (-1, 10))
+
+    def test_histogram_rejects_non_finite_values_unchanged(self) :
+        histogram = Histogram(0, 10, 5)
+        histogram.add(4)
+        for value in (float("inf"), float("-inf"), float("nan"), "x") :
+            self.assertRaises(ValueError, histogram.add, value)
+        self.assertEqual(histogram.get_count(), 1)
+        self.assertEqual((histogram.get_min(), histogram.get_max(), histogram.get_mean()),
+                         (4, 4, 4))
+
+    def test_statistics_count_non_numeric_values_once(self) :
+        statistics = DataStatistics(assign1.ATHLETE_RULES, {}, {6: ("Score", 0, 100, 10)})
+        for score in ("50", "inf", "nan", "DNS", "", "70") :
+            statistics.add(parse_row(raw_row(c6=score)))
+        score = statistics.get_histograms()["Score"]
+        self.assertEqual(score.get_count(), 2)
+        self.assertEqual((score.get_min(), score.get_max(), score.get_mean()), (50, 70, 60))
+        self.assertEqual(statistics.get_non_numeric(), {"Score": 3})
+        self.assertEqual(statistics.get_row_count(), 6)
+
+
+class InputOutputTests(TempDirTestCase) :
+    """Reading blocks of rows and writing in bulk."""
+
+    def rows(self, blocks) :
+        """(list[str]) Rows of every block, in order."""
+        return [row for rows in blocks for row in rows]
+
+    def test_blocks_hold_every_row(self) :
+        rows = ["1,Luge,A,B,AUS,1,,5.1,Gold,,,", "2,Luge,Zoë,Ça,FRA,2,,5.2,Silver,,,", "3,x"]
+        raw_path = self.write("raw.csv", "\n".join(rows))     # No new line at the end
+        for block_size in (1, 7, 40, 1024) :
+            self.assertEqual(self.rows(read_row_blocks(raw_path, block_size=block_size)),
+                             rows)
+        start = len(rows[0]) + 1
+        end = start + len(rows[1].encode("utf-8")) + 1
+        self.assertEqual(self.rows(read_row_blocks(raw_path, start, end, 4)), [rows[1]])
+        self.assertEqual(self.rows(read_input_blocks(raw_path)), rows)
+
+    def test_empty_file(self) :
+        raw_path = self.write("raw.csv", "")
+        self.assertEqual(list(read_row_blocks(raw_path)), [])
+
+    def test_bulk_writer(self) :
+        clean_path = self.path("clean.csv")
+        with BulkWriter(clean_path, block_size=5) as clean_data_file :
+            for row in ("ab\n", "cdé\n", "f\n") :
+                clean_data_file.write(row)
+        with BulkWriter(clean_path, append=True) as clean_data_file :
+            clean_data_file.write("g\n")
+        with open(clean_path, encoding="utf-8") as clean_data_file :
+            self.assertEqual(clean_data_file.read(), "ab\ncdé\nf\ng\n")
+
+
+class PipelineTests(TempDirTestCase) :
+    """Reading and writing in background threads."""
+
+    def test_prefetch_keeps_order_and_errors(self) :
+        self.assertEqual(list(prefetch(iter(range(50)), depth=2)), list(range(50)))
+
+        def failing() :
+            yield 1
+            raise OSError("disk")
+        items = prefetch(failing())
+        self.assertEqual(next(items), 1)
+        self.assertRaises(OSError, next, items)
+
+    def test_abandoned_prefetch_stops(self) :
+        items = prefetch(iter(range(1000)), depth=1)
+        self.assertEqual(next(items), 0)
+        items.close()               # Joins the producer, which must not block
+
+    def test_background_writer(self) :
+        with BackgroundWriter(BulkWriter(self.path("out.txt")), depth=1) as writer :
+            for number in range(100) :
+                writer.write("{0}\n".format(number))
+        self.assertEqual(self.read("out.txt"), "".join(["{0}\n".format(number)
+                                                       for number in range(100)]))
+
+    def test_same_output_as_serial_cleaning(self) :
+        rows = list(generate_rows(300, {"rule_place": 0.1}, seed=9))
+        raw_path = self.write("raw.csv", "".join(rows))
+        self.assertEqual(assign1.clean_file(raw_path, self.path("clean.csv"), pipeline=True),
+                         len(rows))
+        self.assertEqual(self.read("clean.csv"), assign1.clean_rows(rows))
+
+
+class CompressedTests(TempDirTestCase) :
+    """Cleaning compressed files."""
+
+    def test_compressed_input_and_output(self) :
+        rows = list(generate_rows(100, {"rule_place": 0.1}, seed=8))
+        cleaned = assign1.clean_rows(rows)
+        for extension, opener in ((".gz", gzip.open), (".bz2", bz2.open), (".xz", lzma.open)) :
+            raw_path = self.path("raw.csv" + extension)
+            with opener(raw_path, "wt") as raw_data_file :
+                raw_data_file.write("".join(rows))
+            clean_path = self.path("clean.csv" + extension)
+            self.assertEqual(assign1.clean_file(raw_path, clean_path), len(rows))
+            with opener(clean_path, "rt") as clean_data_file :
+                self.assertEqual(clean_data_file.read(), cleaned)
+
+
+class ParallelTests(TempDirTestCase) :
+    """Cleaning byte ranges of a file in worker processes."""
+
+    def setUp(self) :
+        super().setUp()
+        self.rows = list(generate_rows(200, {"rule_place": 0.1}, seed=6))
+        self.raw_path = self.write("raw.csv", "".join(self.rows))
+
+    def test_chunks_cover_the_file_on_line_boundaries(self) :
+        chunks = assign1_parallel.find_chunks(self.raw_path, 1000)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], os.path.getsize(self.raw_path))
+        with open(self.raw_path, "rb") as raw_data_file :
+            data = raw_data_file.read()
+        for (start, end), (next_start, next_end) in zip(chunks, chunks[1:]) :
+            self.assertEqual(end, next_start)
+            self.assertEqual(data[end - 1:end], b"\n")
+
+    def test_same_output_as_serial_cleaning(self) :
+        assign1_parallel.clean_file_parallel(self.raw_path, self.path("clean.csv"),
+                                             processes=2, chunk_size=1000)
+        self.assertEqual(self.read("clean.csv"), assign1.clean_rows(self.rows))
+
+
+class BatchTests(TempDirTestCase) :
+    """Cleaning many raw files on a worker pool."""
+
+    def test_names(self) :
+        self.assertEqual(assign1_batch.split_name("venue/day1.csv.gz"), ("day1", ".csv.gz"))
+        self.assertEqual(assign1_batch.clean_path_for("venue/day1.csv.gz", "out"),
+                         os.path.join("out", "day1_clean.csv.gz"))
+        self.assertTrue(assign1_batch.is_raw_file("day1.CSV"))
+        self.assertFalse(assign1_batch.is_raw_file("day1_clean.csv"))
+        self.assertFalse(assign1_batch.is_raw_file("notes.txt"))
+
+    def test_batch_skips_up_to_date_files(self) :
+        rows = {}
+        for day in range(3) :
+            rows[day] = list(generate_rows(50, {"rule_place": 0.1}, seed=20 + day))
+            self.write("day{0}.csv".format(day), "".join(rows[day]))
+        self.write("notes.txt", "not data")
+        raw_paths = assign1_batch.find_raw_files([self.directory])
+        self.assertEqual(raw_paths, [self.path("day{0}.csv".format(day)) for day in range(3)])
+        output_dir = self.path("out")
+        results, skipped = assign1_batch.clean_batch(raw_paths, output_dir, processes=2)
+        self.assertEqual((len(results), skipped), (3, []))
+        for day in range(3) :
+            self.assertEqual(self.read(os.path.join("out", "day{0}_clean.csv".format(day))),
+                             assign1.clean_rows(rows[day]))
+        results, skipped = assign1_batch.clean_batch(raw_paths, output_dir)
+        self.assertEqual((results, skipped), ([], raw_paths))
+        self.assertEqual(len(assign1_batch.clean_batch(raw_paths, output_dir, 1, True)[0]), 3)
+        self.assertEqual(sorted(os.listdir(output_dir)),
+                         ["day{0}_clean.csv".format(day) for day in range(3)])
+
+    def test_same_names_in_different_directories(self) :
+        raw_paths = []
+        for venue in ("venue1", "venue2") :
+            os.mkdir(self.path(venue))
+            raw_paths.append(self.write(os.path.join(venue, "day1.csv"), raw_row()))
+        self.assertEqual(len(assign1_batch.clean_batch(raw_paths, processes=1)[0]), 2)
+        output_dir = self.path("out")
+        self.assertRaises(ValueError, assign1_batch.clean_batch, raw_paths, output_dir)
+        self.assertFalse(os.path.exists(output_dir))
+        arguments = ["assign1_batch.py", "-o", output_dir] + raw_paths
+        with mock.patch("sys.argv", arguments), contextlib.redirect_stderr(io.StringIO()) :
+            self.assertRaises(SystemExit, assign1_batch.main)
+
+
+class IncrementalTests(TempDirTestCase) :
+    """Resumable cleaning with checkpoints."""
+
+    def setUp(self) :
+        super().setUp()
+        self._block_size = assign1_incremental.BLOCK_SIZE
+        assign1_incremental.BLOCK_SIZE = 64     # Many blocks, even in a small file
+        self.rows = list(generate_rows(40, seed=3))
+        self.raw_path = self.write("raw.csv", "".join(self.rows))
+        self.clean_path = self.path("clean.csv")
+
+    def tearDown(self) :
+        assign1_incremental.BLOCK_SIZE = self._block_size
+        super().tearDown()
+
+    def clean(self) :
+        """(int) Offset an incremental clean of the raw file resumed from."""
+        return assign1_incremental.clean_file_incremental(self.raw_path, self.clean_path)
+
+    def test_resumes_after_appended_rows(self) :
+        self.assertEqual(self.clean(), 0)
+        size = os.path.getsize(self.raw_path)
+        extra = list(generate_rows(5, seed=4))
+        with open(self.raw_path, "a") as raw_data_file :
+            raw_data_file.write("".join(extra))
+        self.assertEqual(self.clean(), size)
+        self.assertEqual(self.read("clean.csv"), assign1.clean_rows(self.rows + extra))
+
+    def test_changed_middle_row_cleans_again(self) :
+        self.clean()
+        fields = parse_row(self.rows[20])          # Same size, far from either end
+        fields[3] = "Q" + fields[3][1:]
+        self.rows[20] = ",".join(fields) + "\n"
+        self.write("raw.csv", "".join(self.rows))
+        self.assertEqual(self.clean(), 0)
+        self.assertEqual(self.read("clean.csv"), assign1.clean_rows(self.rows))
+
+    def test_unchanged_file_appends_nothing(self) :
+        self.clean()
+        self.assertEqual(self.clean(), os.path.getsize(self.raw_path))
+        self.assertEqual(self.read("clean.csv"), assign1.clean_rows(self.rows))
+
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -11,9 +11,19 @@ __author__ = "Minjae Lee"
 __email__ = "m.j.lee@uqconnect.edu.au"
 
 import csv
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+UNPLACED = -1               # Place of a result outside the places awarded in its event
+UNPLACED_TEXT = "unplaced"  # get_place of an UNPLACED result
+MEDALS = (None, "Gold", "Silver", "Bronze", "")    # Medal of places undetermined, 1 to 3
+                                                   # and any other, as counted by athletes
 
 class Athlete(object) :
     """Details of an athlete who is competing at the games."""
+
+    __slots__ = ("_identifier", "_first_name", "_surname", "_country",
+                 "_results", "_events", "_medals", "_version")
     
     def __init__(self, identifier, first_name, surname, country) :
         """
@@ -29,6 +39,8 @@ class Athlete(object) :
         self._country = country
         self._results = {}
         self._events = []
+        self._medals = [0] * len(MEDALS)    # Results counted under each of MEDALS
+        self._version = 0       # Number of changes to the athlete's events and results
 
     def get_result(self, event) :
         """Return the result the athlete obtained in 'event'.
@@ -44,11 +56,32 @@ class Athlete(object) :
     def add_result(self, event, result) :
         """Sets athlete's 'result' in 'event', overwriting if previously set.
 
+        If the event keeps live standings (see Event.start_standings), the
+        result is placed in them straight away.
+
         Parameters:
             event (Event): Event in which this athlete competed.
             result (Result): Final result obtained in event.
+
+        Return:
+            list[Athlete]: Athletes whose place in the event changed, this
+                           athlete first (empty if the event has no standings).
         """
+        previous = self._results.get(event)
+        counted = [(changed, self._times_counted(changed))
+                   for changed in set([previous, result]) if changed is not None]
         self._results[event] = result
+        result._athlete = self
+        for changed, times in counted :
+            self._count_medal(changed, self._times_counted(changed) - times)
+        if previous is not None and previous not in self._results.values() :
+            previous._athlete = None        # No longer counted when it is placed
+        self.mark_changed()
+        event.mark_changed()
+        self._country.mark_changed()
+        if event.has_standings() :
+            return event.update_standings(self, previous, result)
+        return []
         
     def add_event(self, event) :
         """Adds event to those in which this athlete will compete.
@@ -57,6 +90,11 @@ class Athlete(object) :
             event (Event): Event in which this athlete will compete.
         """
         self._events.append(event)
+        if event in self._results :
+            self._count_medal(self._results[event], 1)
+        self.mark_changed()
+        event.mark_changed()
+        self._country.mark_changed()
         
     def add_events(self, events) :
         """Adds all events to those in which this athlete will compete.
@@ -64,12 +102,65 @@ class Athlete(object) :
         Parameters:
             events (list[Event]): List of events in which this athlete will compete.
         """
-        return self._events.extend(list(events))
+        events = list(events)
+        self._events.extend(events)
+        self.mark_changed()
+        for event in events :
+            if event in self._results :
+                self._count_medal(self._results[event], 1)
+            event.mark_changed()
+        self._country.mark_changed()
         
     def get_events(self) :
         """(list[Event]) All events in which this athlete is competing."""
         return list(self._events)
 
+    def get_results(self) :
+        """(list[tuple[Event, Result]]) Every event the athlete has a result
+                                        in, with that result.
+        """
+        return list(self._results.items())
+
+    def count_medals(self, medal) :
+        """Return the number of the athlete's results with a medal, counting
+           the result of each of get_events() as processing would (an event
+           added twice is counted twice).
+
+        Parameters:
+            medal (str): "Gold", "Silver", "Bronze", "" for results without a
+                         medal, or None for results with undetermined places.
+
+        Return:
+            int: Number of results with 'medal'.
+        """
+        return self._medals[MEDALS.index(medal)]
+
+    def _times_counted(self, result) :
+        """(int) Number of the athlete's events in which 'result' is counted."""
+        return sum([1 for event in self._events if self._results.get(event) is result])
+
+    def _count_medal(self, result, times, medal=None) :
+        """Counts a result 'times' more (or fewer) times under its medal.
+
+        Parameters:
+            result (Result): One of the athlete's results.
+            times (int): Change in the number of times it is counted.
+            medal (int): Index in MEDALS to count it under (None for its
+                         current medal).
+        """
+        if times :
+            self._medals[result.get_medal_index() if medal is None else medal] += times
+
+    def get_version(self) :
+        """(int) Number of changes to the athlete's events and results, so
+                 results processed from them can be reused until it changes.
+        """
+        return self._version
+
+    def mark_changed(self) :
+        """Counts a change to the athlete's events or results."""
+        self._version += 1
+
     def get_id(self) :
         """(str) Athlete's identification number."""
         return self._identifier
@@ -87,24 +178,74 @@ class Athlete(object) :
 
 
 
+def parse_result_value(result_value) :
+    """Return a time or score as a number, so it is stored compactly, if
+       the number gives back exactly the same text.
+
+    Parameters:
+        result_value (str|float): Time or score, e.g. "73.96" from a data file.
+
+    Return:
+        (int|float|str): e.g. 92 for "92" and 73.96 for "73.96", but text
+                         that a number would change, such as "82.50" or
+                         "007", and anything that is not a number unchanged.
+    """
+    if not isinstance(result_value, str) :
+        return result_value
+    for number_type in (int, float) :
+        try :
+            number = number_type(result_value)
+        except ValueError :
+            continue
+        if str(number) == result_value :    # e.g. not "82.50", which would become "82.5"
+            return number
+        break
+    return result_value
+
+
+def parse_number(result_value) :
+    """Return a time or score as a number to be ranked on.
+
+    Parameters:
+        result_value (str): Time or score, as given by Result.get_result.
+
+    Return:
+        (float|None): The number, or None for text that is not a number
+                      (e.g. "DNF"), which is ranked after every number.
+    """
+    try :
+        number = float(result_value)
+    except ValueError :
+        return None
+    return None if number != number else number    # NaN cannot be ordered
+
+
 class Result(object) :
     """An athlete's result in an event."""
 
+    __slots__ = ("_result_value", "_place", "_athlete")
+
+    _place_changes = 0      # Number of times any result's place has been set.
+
     def __init__(self, result_value) :
         """
         Parameters:
             result_value (float): Time or score athlete achieved in event.
+                                  Strings are parsed into numbers.
         """
-        self._result_value = result_value
+        self._result_value = parse_result_value(result_value)
         self._place = int()
-        self._medal = str()
+        self._athlete = None        # Athlete counting its medal (see Athlete.add_result)
         
     def get_place(self) :
-        """(str) Place athlete obtained in the final event.
+        """(str) Place athlete obtained in the final event, or "unplaced" if
+                 it was outside the places awarded.
 
         Raise:
             RuntimeError: if places not yet determined.
         """
+        if self._place == UNPLACED :
+            return UNPLACED_TEXT
         if Result.places_determined(self):
             return str(self._place)
         else:
@@ -114,13 +255,23 @@ class Result(object) :
         """Sets the place that the athlete achieved in the final event.
 
         Parameters:
-            place (int): Place that athlete achieved in the event.
+            place (int): Place that athlete achieved in the event, or UNPLACED.
         """
+        previous = self.get_medal_index()
         self._place = place
+        Result._place_changes += 1
+        if self._athlete is not None and self.get_medal_index() != previous :
+            times = self._athlete._times_counted(self)
+            self._athlete._count_medal(self, -times, previous)
+            self._athlete._count_medal(self, times)
+
+    def get_place_changes() :
+        """(int) Number of times any result's place has been set."""
+        return Result._place_changes
 
     def places_determined(self) :
         """(bool) Has places been determined yet or not."""
-        return self._place > 0
+        return self._place > 0 or self._place == UNPLACED
     
     def get_result(self) :
         """(str) Time or score athlete achieved in the final event."""
@@ -134,26 +285,34 @@ class Result(object) :
             RuntimeError: if places not yet determined.
         """
         if Result.places_determined(self):          # If a place is determined
-            if Result.get_place(self) == "3":
-                self._medal = "Bronze"
-            elif Result.get_place(self) == "2":
-                self._medal = "Silver"
-            elif Result.get_place(self) == "1":
-                self._medal = "Gold"
-            else:
-                self._medal = ""
+            return MEDALS[self.get_medal_index()]  # Worked out from the place, not stored
         else:
             raise RuntimeError('Place not yet determined')
-        
-        return str(self._medal)
-        
+
+    def get_medal_index(self) :
+        """(int) Index in MEDALS of the result's medal (0 if places have not
+                 been determined yet).
+        """
+        if 1 <= self._place <= 3 :
+            return self._place
+        return len(MEDALS) - 1 if self.places_determined() else 0
         
     def __str__(self) :
         return ""
 
 
 class Event(object) :
-    """An event in which athletes compete."""
+    """An event in which athletes compete.
+
+    During a live event the results can be kept in standings: a list sorted
+    by time or score, and then by the athlete's full name, maintained with
+    bisect as each result is added, so the places never have to be sorted
+    from scratch. Every result in the standings is placed, even one that
+    was UNPLACED before.
+    """
+
+    __slots__ = ("_event_name", "_timed", "_athletes", "_standing_keys",
+                 "_standing_values", "_standing_athletes", "_version")
     
     def __init__(self, event_name, timed, athletes) :
         """
@@ -165,6 +324,10 @@ class Event(object) :
         self._event_name = event_name
         self._timed = timed
         self._athletes = []
+        self._standing_keys = None      # Sorted (time or -score, name, id), if live
+        self._standing_values = None    # Value part of each key in _standing_keys
+        self._standing_athletes = None  # Athlete of each key in _standing_keys
+        self._version = 0               # Number of changes to the athletes and results
         
     def is_timed(self) :
         """(bool) True if event is timed, False if event is scored."""
@@ -187,6 +350,7 @@ class Event(object) :
             athlete (Athlete): An athlete who will compete in this event.
         """
         self._athletes.append(athlete)
+        self.mark_changed()
         
     def add_athletes(self, athletes) :
         """Adds all athletes to those who will compete in this event.
@@ -195,7 +359,136 @@ class Event(object) :
             athletes (list[Athlete]): List of athletes who will compete
                                       in this event.
         """
-        return self._athletes.extend(list(athlete))
+        self._athletes.extend(list(athletes))
+        self.mark_changed()
+
+    def get_version(self) :
+        """(int) Number of changes to the event's athletes and their results."""
+        return self._version
+
+    def mark_changed(self) :
+        """Counts a change to the event's athletes or their results."""
+        self._version += 1
+
+    def _standing_key(self, athlete, result) :
+        """Return the key of an athlete's result in the standings.
+
+        Parameters:
+            athlete (Athlete): Athlete who achieved the result.
+            result (Result): Athlete's result in this event.
+
+        Return:
+            tuple<tuple, str, str>: (0, time or negative score, so the best
+                                    result is first), or (1, text) for text
+                                    that is not a number, full name and id.
+        """
+        number = parse_number(result.get_result())
+        if number is None :
+            value = (1, result.get_result())    # After every number, by text
+        else :
+            value = (0, number if self._timed else -number)
+        return (value, athlete.get_full_name(), athlete.get_id())
+
+    def start_standings(self) :
+        """Start keeping live standings, placing the results already added.
+
+        Return:
+            list[Athlete]: Athletes with a result, from best to worst place.
+        """
+        entries = []
+        for athlete in self._athletes :
+            try :
+                result = athlete.get_result(self)
+            except KeyError :           # No result yet
+                continue
+            entries.append((self._standing_key(athlete, result), athlete))
+        entries.sort(key=lambda entry : entry[0])
+        self._standing_keys = [key for key, athlete in entries]
+        self._standing_values = [key[0] for key, athlete in entries]
+        self._standing_athletes = [athlete for key, athlete in entries]
+        self._renumber_standings(0)
+        return list(self._standing_athletes)
+
+    def stop_standings(self) :
+        """Stop keeping live standings, e.g. once places are determined some
+           other way, which the standings would not agree with.
+        """
+        self._standing_keys = None
+        self._standing_values = None
+        self._standing_athletes = None
+
+    def has_standings(self) :
+        """(bool) True if this event keeps live standings."""
+        return self._standing_keys is not None
+
+    def get_standings(self) :
+        """(list[Athlete]) Athletes with a result, from best to worst place.
+
+        Raise:
+            RuntimeError: if this event does not keep live standings.
+        """
+        if self._standing_keys is None :
+            raise RuntimeError('Standings not started')
+        return list(self._standing_athletes)
+
+    def update_standings(self, athlete, previous, result) :
+        """Place an athlete's new result in the standings.
+
+        The position of the result, and so its place, is found with a binary
+        search. Only the results behind it move down a place (and those that
+        were behind a replaced result move up), so only their places change.
+
+        Parameters:
+            athlete (Athlete): Athlete who achieved the result.
+            previous (Result): Athlete's result this replaces (None if none).
+            result (Result): Athlete's new result.
+
+        Return:
+            list[Athlete]: Athletes whose place changed, 'athlete' first.
+        """
+        keys = self._standing_keys
+        values = self._standing_values
+        athletes = self._standing_athletes
+        start = len(keys)               # First position whose place may change
+        if previous is not None :
+            key = self._standing_key(athlete, previous)
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key :
+                del keys[position]
+                del values[position]
+                del athletes[position]
+                start = position
+        key = self._standing_key(athlete, result)
+        position = bisect_right(keys, key)
+        keys.insert(position, key)
+        values.insert(position, key[0])
+        athletes.insert(position, athlete)
+        changed = self._renumber_standings(min(start, position))
+        return [athlete] + [behind for behind in changed if behind is not athlete]
+
+    def _renumber_standings(self, start) :
+        """Set the places of the results from position 'start' of the standings
+           to the end, where they may have moved.
+
+        Parameters:
+            start (int): Position of the first result to place.
+
+        Return:
+            list[Athlete]: Athletes whose place changed, from best to worst.
+        """
+        values = self._standing_values
+        athletes = self._standing_athletes
+        changed = []
+        if start < len(values) :
+            place = bisect_left(values, values[start]) + 1     # 1 + results better
+        for position in range(start, len(values)) :
+            if position > start and values[position] != values[position - 1] :
+                place = position + 1
+            result = athletes[position].get_result(self)
+            if not result.places_determined() or result.get_place() != str(place) :
+                result.set_place(place)
+                changed.append(athletes[position])
+        return changed
 
     def __str__(self) :
         return ""
@@ -205,6 +498,8 @@ class Event(object) :
 class Country(object) :
     """Representation of a country's delegation."""
 
+    __slots__ = ("_country_name", "_country_code", "_athletes", "_version")
+
     def __init__(self, country_name, country_code) :
         """
         Parameters:
@@ -214,6 +509,7 @@ class Country(object) :
         self._country_name = country_name
         self._country_code = country_code
         self._athletes = []
+        self._version = 0       # Number of changes to the athletes and their results
         
     def get_athletes(self) :
         """(list[Athlete]) All athletes competing for this country."""
@@ -227,6 +523,7 @@ class Country(object) :
             athlete (Athlete): An athlete who will compete for this country.
         """
         self._athletes.append(athlete)
+        self.mark_changed()
         
     def add_athletes(self, athletes) :
         """Adds all athletes as members of this country's delegation.
@@ -236,6 +533,30 @@ class Country(object) :
                                       for this country.
         """
         self._athletes.extend(list(athletes))
+        self.mark_changed()
+
+    def count_medals(self, medal) :
+        """Return the number of results of this country's athletes with a medal.
+           Each athlete keeps count of their own medals as places are set, so
+           only the athletes are visited, not their events.
+
+        Parameters:
+            medal (str): "Gold", "Silver", "Bronze", "" for results without a
+                         medal, or None for results with undetermined places.
+
+        Return:
+            int: Number of the athletes' results with 'medal' (see
+                 Athlete.count_medals).
+        """
+        return sum([athlete.count_medals(medal) for athlete in self._athletes])
+
+    def get_version(self) :
+        """(int) Number of changes to the country's athletes and their results."""
+        return self._version
+
+    def mark_changed(self) :
+        """Counts a change to the country's athletes or their results."""
+        self._version += 1
 
     def get_name(self) :
         """(str) Country's official name."""
@@ -251,10 +572,44 @@ class Country(object) :
 
 
 class ManagedDictionary(object) :
-    """A generic collection as a managed dictionary."""
+    """A generic collection as a managed dictionary.
+
+    Secondary indexes can be declared on the collection, each a function of
+    an item's key and the item giving the value it is indexed under, e.g.
+    the country code of an athlete. Indexes are kept up to date as items are
+    added, so find_items answers a query without looking at other items.
+    """
+
+    __slots__ = ("_items", "_indexes", "_index_functions", "_indexed_under")
 
-    def __init__(self) :
+    def __init__(self, indexes=None) :
+        """
+        Parameters:
+            indexes (dict[str, callable]): Function(key, item) giving the value
+                                           each item is indexed under, for each
+                                           index name (None for no indexes).
+        """
         self._items = {}
+        self._indexes = {}              # Keys and items under each value, for each index
+        self._index_functions = {}      # Function of each index, in the same order
+        self._indexed_under = {}        # Values of the indexes (in order), for each key
+        for name, index_function in (indexes or {}).items() :
+            self.add_index(name, index_function)
+
+    def add_index(self, name, index_function) :
+        """Adds a secondary index of the items, including those already added.
+
+        Parameters:
+            name (str): Name of the index, used by find_items.
+            index_function (callable): Function(key, item) giving the value an
+                                       item is indexed under.
+        """
+        for key in self._items :
+            self._unindex_item(key)
+        self._index_functions[name] = index_function
+        self._indexes[name] = {}
+        for key, item in self._items.items() :
+            self._index_item(key, item)
 
     def add_item(self, key, item) :
         """Adds an item to this collection.
@@ -264,7 +619,43 @@ class ManagedDictionary(object) :
             key (immutable): Unique key for the item.
             item (value): The item to be added to this collection.
         """
+        if key in self._items :
+            self._unindex_item(key)
         self._items[key] = item
+        self._index_item(key, item)
+
+    def reindex(self, key) :
+        """Files an item under the values of its indexes again, after a change
+           to the item that its index functions depend on (e.g. a place set).
+
+        Parameters:
+            key (immutable): Unique key for an item.
+
+        Raises:
+            (KeyError): If 'key' does not correspond to an item.
+        """
+        item = self._items[key]
+        self._unindex_item(key)
+        self._index_item(key, item)
+
+    def _index_item(self, key, item) :
+        """Files an item under its value of each index."""
+        if not self._indexes :
+            return
+        values = tuple([index_function(key, item)
+                        for index_function in self._index_functions.values()])
+        for index, value in zip(self._indexes.values(), values) :
+            index.setdefault(value, {})[key] = item
+        self._indexed_under[key] = values
+
+    def _unindex_item(self, key) :
+        """Removes an item from every index."""
+        values = self._indexed_under.pop(key, ())
+        for index, value in zip(self._indexes.values(), values) :
+            items = index[value]
+            del items[key]
+            if not items :
+                del index[value]
         
     def get_items(self) :
         """(list) All items in this collection."""
@@ -284,6 +675,29 @@ class ManagedDictionary(object) :
         """
         return self._items[key]
 
+    def find_items(self, index, value) :
+        """Return the items indexed under a value, in the order they were filed.
+
+        Parameters:
+            index (str): Name of a secondary index.
+            value (immutable): Value of the index, e.g. a country code.
+
+        Return:
+            (list): Items indexed under 'value' (empty if there are none).
+
+        Raises:
+            (KeyError): If there is no index called 'index'.
+        """
+        return list(self._indexes[index].get(value, {}).values())
+
+    def count_items(self, index, value) :
+        """(int) Number of items indexed under 'value' in the index called 'index'."""
+        return len(self._indexes[index].get(value, {}))
+
+    def get_index_values(self, index) :
+        """(list) Values of the index called 'index' that have items."""
+        return list(self._indexes[index])
+
 
 """
     Globally defined collections of all key entity objects.
@@ -294,94 +708,106 @@ all_athletes = ManagedDictionary()
 all_countries = ManagedDictionary()
 all_events = ManagedDictionary()
 
-def load_athletes(athletes):    
-    """ Load the data from files into all_athletes.
+def read_rows(file_name) :
+    """Return the rows of a CSV data file, closing the file once read.
+       Blank lines are skipped (the original loaders failed on them with
+       an IndexError), e.g. one left by an editor at the end of a file.
 
-        Parameters:
-            athletes (str) : Name of file containing athlete data.
-            
+    Parameters:
+        file_name (str): Name of the data file.
+
+    Return:
+        list[list[str]]: Rows of the file, without blank lines.
     """
-    athlete_file = csv.reader(open("athletes.csv"))                                     # Load data from the data file
-    for row in athlete_file:        
-        athlete_country = all_countries.find_item(row[3])                               # Load country names from row 4
-        athlete_sub = Athlete(str(row[0]), row[1], row[2], athlete_country)             # 
-        athlete_country.add_athlete(athlete_sub)
-        all_countries.add_item(athlete_country.get_country_code(), athlete_country)
-        all_athletes.add_item(row[0], athlete_sub)
+    with open(file_name, newline="") as data_file :
+        return [row for row in csv.reader(data_file) if row]
 
-def load_countries(countries):
-    """ Load the data from files into all_countries.
+
+def load_countries(rows) :
+    """ Create the countries of the rows of a country data file.
 
         Parameters:
-            countries (str): Name of file containing country data.
-            
+            rows (list[list[str]]): Rows of country code and name.
+
+        Return:
+            dict[str, Country]: Countries by country code.
     """
-    country_file = csv.reader(open("countries.csv"))
-    for row in country_file:
-        country_sub = Country(row[1], row[0])
-        all_countries.add_item(country_sub.get_country_code(), country_sub)
-         
-         
-def load_events(events):
-    """ Load the data from files into all_events.
+    return dict([(row[0], Country(row[1], row[0])) for row in rows])
+
+
+def load_athletes(rows, countries) :
+    """ Create the athletes of the rows of an athlete data file, and add
+        them to their countries.
 
         Parameters:
-            events (str)   : Name of file containing events data.
-            
+            rows (list[list[str]]): Rows of athlete id, first name, surname
+                                    and country code.
+            countries (dict[str, Country]): Countries by country code.
+
+        Return:
+            dict[str, Athlete]: Athletes by id.
     """
-    event_file = csv.reader(open("events.csv"))
-    for row in event_file:
-        timed = True
-        if(row[1] == "SCORED"):
-            timed == False
-        event_sub = Event(row[0], timed, [])
-        all_events.add_item(row[0], event_sub)
-         
-
-def load_scored_events(scored_event_results):
-    """ Load the data from files into all_athletes and all_events.
+    athletes = {}
+    for row in rows :
+        country = countries[row[3]]
+        athlete = Athlete(str(row[0]), row[1], row[2], country)
+        country.add_athlete(athlete)
+        athletes[row[0]] = athlete
+    return athletes
+
+
+def load_events(rows) :
+    """ Create the events of the rows of an event data file.
+        Events marked "SCORED" are scored, and all others are timed (the
+        original loader compared 'timed == False' instead of assigning it,
+        so it loaded every event as timed).
 
         Parameters:
-            scored_event_results (str): Name of file containing results for scored
-                                     events.
+            rows (list[list[str]]): Rows of event name and "TIMED" or "SCORED".
+
+        Return:
+            dict[str, Event]: Events by name.
     """
-    scored_event_file = csv.reader(open("scored_event_results.csv"))
-    for row in scored_event_file:
-        event_obj = all_events.find_item(row[1])
-        athlete_obj = all_athletes.find_item(row[0])
-        result_obj = Result(row[2])
-        event_obj.add_athlete(athlete_obj)
-        all_events.add_item(event_obj.get_name(), event_obj)
-        athlete_obj.add_event(event_obj)
-        athlete_obj.add_result(event_obj, result_obj)
-        all_athletes.add_item(athlete_obj.get_id(), athlete_obj)
+    return dict([(row[0], Event(row[0], row[1] != "SCORED", [])) for row in rows])
 
 
-def load_timed_events(timed_event_results):
-    """ Load the data from files into all_athletes and all_events.
+def load_results(rows, athletes, events) :
+    """ Link the results of the rows of a results data file to their athletes
+        and events.
 
         Parameters:
-            timed_event_results (str) : Name of file containing results for timed
-                                     events.
+            rows (list[list[str]]): Rows of athlete id, event name and result.
+            athletes (dict[str, Athlete]): Athletes by id.
+            events (dict[str, Event]): Events by name.
+
+        Return:
+            list[tuple<tuple<str, str>, Result>]: Each result, keyed by
+                                                  (athlete id, event name).
     """
-    timed_event_file = csv.reader(open("timed_event_results.csv"))
-    for row in timed_event_file:
-        event_obj = all_events.find_item(row[1])
-        athlete_obj = all_athletes.find_item(row[0])
-        result_obj = Result(row[2])
-        event_obj.add_athlete(athlete_obj)
-        all_events.add_item(event_obj.get_name(), event_obj)
-        athlete_obj.add_event(event_obj)
-        athlete_obj.add_result(event_obj, result_obj)
-        all_athletes.add_item(athlete_obj.get_id(), athlete_obj)
+    results = []
+    for row in rows :
+        athlete = athletes[row[0]]
+        event = events[row[1]]
+        result = Result(row[2])
+        event.add_athlete(athlete)
+        athlete.add_event(event)
+        athlete.add_result(event, result)
+        results.append(((row[0], row[1]), result))
+    return results
+
 
 def load_data(athletes, countries, events,
-              timed_event_results, scored_event_results) :
+              timed_event_results, scored_event_results, workers=None) :
     """Loads the data from the named data files.
 
     Data is loaded into the all_athletes, all_countries and all_events
     collections. Results are accessible through the objects in these collections.
 
+    The files are independent, so they are read and parsed at the same time
+    on a pool of threads. The entities are then created and linked in one
+    pass, looking each other up in dicts built from the rows, and are added
+    to the collections at the end.
+
     Parameters:
         athletes (str) : Name of file containing athlete data.
         countries (str): Name of file containing country data.
@@ -390,13 +816,25 @@ def load_data(athletes, countries, events,
                                      events.
         scored_event_results (str): Name of file containing results for scored
                                      events.
+        workers (int): Number of threads reading files (None for one per file).
     """
-
-    load_countries(countries)                   # Call functions
-    load_athletes(athletes)
-    load_events(events)
-    load_scored_events(scored_event_results)
-    load_timed_events(timed_event_results)
+    file_names = [countries, athletes, events, scored_event_results, timed_event_results]
+    with ThreadPoolExecutor(max_workers=workers or len(file_names)) as pool :
+        country_rows, athlete_rows, event_rows, scored_rows, timed_rows = list(
+            pool.map(read_rows, file_names))
+
+    country_items = load_countries(country_rows)
+    athlete_items = load_athletes(athlete_rows, country_items)
+    event_items = load_events(event_rows)
+    load_results(scored_rows, athlete_items, event_items)
+    load_results(timed_rows, athlete_items, event_items)
+
+    for code, country in country_items.items() :
+        all_countries.add_item(code, country)
+    for identifier, athlete in athlete_items.items() :
+        all_athletes.add_item(identifier, athlete)
+    for name, event in event_items.items() :
+        all_events.add_item(name, event)
 
 
 if __name__ == "__main__" :
@@ -0,0 +1,146 @@
+"""
+    Memory benchmark of the entity classes used in the second assignment.
+
+    Builds a large synthetic games (countries, athletes, events and results,
+    linked as load_data links them) with the entity classes, and reports the
+    bytes allocated per entity of each kind against BASELINE_BYTES: those of
+    the entities before they used __slots__, when each result was the string
+    read from the data file.
+"""
+
+__author__ = "Minjae Lee"
+__email__ = "m.j.lee@uqconnect.edu.au"
+
+import argparse
+import random
+import tracemalloc
+
+from entities import Athlete, Result, Event, Country
+
+
+ATHLETES = 100000           # Default number of athletes generated
+EVENTS = 500                # Default number of events generated
+RESULTS_PER_ATHLETE = 5     # Default number of events each athlete competes in
+COUNTRIES = 200             # Number of countries generated
+
+
+# Bytes allocated per entity by the entity classes before they used __slots__
+# (dict-backed, each result kept as a string), measured with measure() on
+# generate_rows() at its defaults with CPython 3.11. They are kept as numbers
+# because those classes are no longer in the tree.
+BASELINE_BYTES = {"Country": 185.2, "Athlete": 295.0, "Event": 178.8, "Result": 204.1}
+
+ENTITY_CLASSES = {"Country": Country, "Athlete": Athlete, "Event": Event, "Result": Result}
+
+
+def generate_rows(athletes=ATHLETES, events=EVENTS, results_per_athlete=RESULTS_PER_ATHLETE,
+                  seed=0) :
+    """Return the rows of synthetic data files, as csv.reader would read them.
+
+    Parameters:
+        athletes (int): Number of athletes.
+        events (int): Number of events.
+        results_per_athlete (int): Number of events each athlete competes in.
+        seed (int): Seed of the random numbers.
+
+    Return:
+        dict[str, list[list[str]]]: Rows of "countries", "athletes", "events"
+                                    and "results" (athlete id, event name, value).
+    """
+    rng = random.Random(seed)
+    countries = [["C{0:02d}".format(number), "Country {0}".format(number)]
+                 for number in range(COUNTRIES)]
+    athlete_rows = [[str(number), "First{0}".format(number), "Surname{0}".format(number),
+                     rng.choice(countries)[0]] for number in range(1, athletes + 1)]
+    event_rows = [["Event {0}".format(number), rng.choice(["TIMED", "SCORED"])]
+                  for number in range(events)]
+    result_rows = []
+    for athlete in athlete_rows :
+        for event in rng.sample(event_rows, min(results_per_athlete, events)) :
+            result_rows.append([athlete[0], event[0], "{0:.2f}".format(rng.uniform(10, 300))])
+    return {"countries": countries, "athletes": athlete_rows, "events": event_rows,
+            "results": result_rows}
+
+
+def measure(rows, classes) :
+    """Return the bytes allocated to build and link the entities of each kind.
+
+    Parameters:
+        rows (dict[str, list[list[str]]]): See generate_rows.
+        classes (dict[str, type]): Class used for each kind of entity.
+
+    Return:
+        dict[str, tuple<int, int>]: Number of entities and bytes allocated,
+                                    for each kind of entity.
+    """
+    usage = {}
+    tracemalloc.start()
+    try :
+        start = tracemalloc.get_traced_memory()[0]
+        countries = {}
+        for code, name in rows["countries"] :
+            countries[code] = classes["Country"](name, code)
+        after_countries = tracemalloc.get_traced_memory()[0]
+        athletes = {}
+        for identifier, first_name, surname, code in rows["athletes"] :
+            athlete = classes["Athlete"](identifier, first_name, surname, countries[code])
+            countries[code].add_athlete(athlete)
+            athletes[identifier] = athlete
+        after_athletes = tracemalloc.get_traced_memory()[0]
+        events = {}
+        for name, kind in rows["events"] :
+            events[name] = classes["Event"](name, kind == "TIMED", [])
+        after_events = tracemalloc.get_traced_memory()[0]
+        for identifier, name, value in rows["results"] :
+            athlete = athletes[identifier]
+            event = events[name]
+            event.add_athlete(athlete)
+            athlete.add_event(event)
+            value = value[:1] + value[1:]   # New string, as csv.reader makes for each row
+            athlete.add_result(event, classes["Result"](value))
+        after_results = tracemalloc.get_traced_memory()[0]
+    finally :
+        tracemalloc.stop()
+    usage["Country"] = (len(countries), after_countries - start)
+    usage["Athlete"] = (len(athletes), after_athletes - after_countries)
+    usage["Event"] = (len(events), after_events - after_athletes)
+    usage["Result"] = (len(rows["results"]), after_results - after_events)
+    return usage
+
+
+def print_report(usage, baseline=BASELINE_BYTES) :
+    """Print the bytes per entity of each kind, against the baseline.
+
+    Parameters:
+        usage (dict[str, tuple<int, int>]): See measure.
+        baseline (dict[str, float]): Bytes per entity of each kind before.
+    """
+    line = "{0:<10} {1:>10} {2:>14} {3:>14} {4:>8}"
+    print(line.format("Entity", "Count", "Before (B)", "After (B)", "Saved"))
+    total_before = total_after = 0
+    for kind in ("Country", "Athlete", "Event", "Result") :
+        count, bytes_after = usage[kind]
+        bytes_before = baseline[kind] * count
+        total_before += bytes_before
+        total_after += bytes_after
+        print(line.format(kind, count, "{0:.1f}".format(baseline[kind]),
+                          "{0:.1f}".format(bytes_after / count),
+                          "{0:.0%}".format(1 - bytes_after / bytes_before)))
+    print("Total: {0:,.0f} KiB before, {1:,.0f} KiB after".format(total_before / 1024,
+                                                                 total_after / 1024))
+
+
+def main() :
+    """Run the benchmark, as given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-a", "--athletes", type=int, default=ATHLETES)
+    parser.add_argument("-e", "--events", type=int, default=EVENTS)
+    parser.add_argument("-r", "--results-per-athlete", type=int, default=RESULTS_PER_ATHLETE)
+    args = parser.parse_args()
+
+    rows = generate_rows(args.athletes, args.events, args.results_per_athlete)
+    print_report(measure(rows, ENTITY_CLASSES))
+
+
+if __name__ == "__main__" :
+    main()
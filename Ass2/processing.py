@@ -9,7 +9,7 @@
     EventResults  : Provides details of the results of all athlete's who
                     competed in one event.
     DeterminePlaces: Determines the place ranking of all athletes who competed
-                     in one event.
+                     in one or more events.
 """
 
 __author__ = "Minjae Lee"
@@ -17,8 +17,105 @@ __email__ = "m.j.lee@uqconnect.edu.au"
 
 
 
+from collections import OrderedDict
+
 from entities import Athlete, Result, Event, Country, ManagedDictionary
 from entities import all_athletes, all_countries, all_events, load_data
+from entities import UNPLACED_TEXT
+from ranking import determine_places
+
+
+CACHE_SIZE = 1024   # Number of entities whose processed results each command keeps
+
+
+
+def place_order(place) :
+    """Return a place as a number to sort by, with "unplaced" after every place.
+
+    Parameters:
+        place (str): Place from Result.get_place.
+
+    Return:
+        float: The place, or infinity if it is "unplaced".
+    """
+    return float("inf") if place == UNPLACED_TEXT else float(place)
+
+
+
+class ResultsCache(object) :
+    """Processed results of the most recently used entities, each stamped
+       with the entity's version and the number of place changes when they
+       were processed. A stale stamp is a miss, so results are recomputed
+       after add_result, add_athlete, add_event or set_place. The least
+       recently used entity is evicted when the cache is full. Entities
+       without a version, such as the views of a ResultTable, are never cached.
+    """
+
+    def __init__(self, size=CACHE_SIZE) :
+        """
+        Parameters:
+            size (int): Maximum number of entities kept.
+        """
+        self._size = size
+        self._entries = OrderedDict()   # entity -> (stamp, results), oldest first
+        self._hits = 0
+        self._misses = 0
+
+    def _stamp(self, entity) :
+        """(tuple<int, int>) Version of 'entity' and number of place changes
+                             (None if 'entity' has no version).
+        """
+        get_version = getattr(entity, "get_version", None)
+        if get_version is None :
+            return None
+        return get_version(), Result.get_place_changes()
+
+    def get(self, entity) :
+        """Return the cached results of an entity, if still up to date.
+
+        Parameters:
+            entity (Athlete|Event|Country): Entity whose results were processed.
+
+        Return:
+            (list|None): Processed results, or None if not cached or stale.
+        """
+        entry = self._entries.get(entity)
+        if entry is None or entry[0] != self._stamp(entity) :
+            self._misses += 1
+            return None
+        self._entries.move_to_end(entity)
+        self._hits += 1
+        return list(entry[1])
+
+    def put(self, entity, results) :
+        """Cache the results just processed for an entity.
+
+        Parameters:
+            entity (Athlete|Event|Country): Entity whose results were processed.
+            results (list): Processed results.
+        """
+        stamp = self._stamp(entity)
+        if stamp is None :
+            return
+        self._entries[entity] = (stamp, list(results))
+        self._entries.move_to_end(entity)
+        if len(self._entries) > self._size :
+            self._entries.popitem(last=False)
+
+    def clear(self) :
+        """Remove every cached result."""
+        self._entries.clear()
+
+    def get_hits(self) :
+        """(int) Number of lookups answered from the cache."""
+        return self._hits
+
+    def get_misses(self) :
+        """(int) Number of lookups that had to be processed."""
+        return self._misses
+
+    def __len__(self) :
+        return len(self._entries)
 
 
 
@@ -46,6 +143,7 @@ class AthleteResults(ProcessResults) :
     """Determines the resuls achieved by one athlete."""
 
     _athlete_results_counter = 0  # Number of times this command has executed.
+    _cache = ResultsCache()       # Results of recently processed athletes.
 
     def __init__(self, athlete) :
         """
@@ -64,6 +162,12 @@ class AthleteResults(ProcessResults) :
         """
         super().process()                               # Call super class (ProcessResults) method.
         AthleteResults._athlete_results_counter += 1    # Add a count to _athlete_results_counter.
+        cached = AthleteResults._cache.get(self._athlete)
+        if cached is not None :                         # Unchanged since last processed
+            self._results = cached
+            self._processed = True
+            return
+        self._results = []
         events = self._athlete.get_events()
         
         place_sub = []  # A temporary list containing for each event in _athlete, the event object and name, and athlete place.
@@ -75,12 +179,13 @@ class AthleteResults(ProcessResults) :
 
             place_sub.append([event_obj, event_name, place])
 
-        place_sub.sort(key = lambda x: [float(x[2]), x[1]]) # Sort by athlete's place: Learned from web tutorial
+        place_sub.sort(key = lambda x: [place_order(x[2]), x[1]]) # Sort by athlete's place: Learned from web tutorial
         for data in place_sub:
             event_obj = data[0]
             result_obj = self._athlete.get_result(event_obj)
             self._results.append(result_obj)
 
+        AthleteResults._cache.put(self._athlete, self._results)
         self._processed = True          # Data was processed
             
     def get_results(self) :
@@ -132,6 +237,7 @@ class EventResults(ProcessResults) :    ### Implented functionality, however doe
     """Determines the results achieved by all athlete in one event."""
 
     _event_results_counter = 0  # Number of times this command has executed.
+    _cache = ResultsCache()     # Results of recently processed events.
 
     def __init__(self, event) :
         """
@@ -151,6 +257,19 @@ class EventResults(ProcessResults) :    ### Implented functionality, however doe
         super().process()   # Call super class (ProcessResults) method.
         EventResults._event_results_counter += 1        # Add a count to _event_results_counter.
 
+        has_standings = getattr(self._event, "has_standings", None)   # Not on views
+        if has_standings is not None and has_standings() :  # In place order, no sort needed
+            self._results = [athlete.get_result(self._event)
+                             for athlete in self._event.get_standings()]
+            self._processed = True
+            return
+        cached = EventResults._cache.get(self._event)
+        if cached is not None :             # Unchanged since last processed
+            self._results = cached
+            self._processed = True
+            return
+        self._results = []
+
         athletes = self._event.get_athletes()
         place_sub = []  # A temporary list containing for each event in _athlete, the event object and name, and athlete place.
 
@@ -161,12 +280,13 @@ class EventResults(ProcessResults) :    ### Implented functionality, however doe
 
             place_sub.append([athlete_obj, athlete_name, place])
 
-        place_sub.sort(key = lambda x: [int(x[2]), x[1]]) # Sort by athlete's place: Learned from web tutorial
+        place_sub.sort(key = lambda x: [place_order(x[2]), x[1]]) # Sort by athlete's place: Learned from web tutorial
         for data in place_sub:
             athlete_obj = data[0]
             result_obj = athlete_obj.get_result(self._event)
             self._results.append(result_obj)
 
+        EventResults._cache.put(self._event, self._results)
         self._processed = True          # Data was processed
 
     def get_results(self) :
@@ -205,6 +325,7 @@ class CountryResults(ProcessResults) :
     """
 
     _country_results_counter = 0  # Number of times this command has executed.
+    _cache = ResultsCache()       # Results of recently processed countries.
 
     def __init__(self, country) :
         """
@@ -226,22 +347,23 @@ class CountryResults(ProcessResults) :
         super().process()       # Call super class (ProcessResults) method.
         CountryResults._country_results_counter += 1    # Add a count to _country_results_counter.
 
-        for athlete in self._country.get_athletes():
-            athlete_obj = athlete
-            self._athletes += 1
-            
-            for event in athlete_obj.get_events():
-                medal = athlete_obj.get_result(event).get_medal()
-                if(medal == "Gold"):
-                    self._gold_num += 1
-                elif(medal == "Silver"):
-                    self._silver_num +=1
-                elif(medal == "Bronze"):
-                    self._bronze_num +=1
-
-                 
+        cached = CountryResults._cache.get(self._country)
+        if cached is not None :     # Unchanged since last processed
+            self._results = cached
+            self._gold_num, self._silver_num, self._bronze_num, self._athletes = cached
+            self._processed = True
+            return
+
+        if self._country.count_medals(None) :      # Results filed under their medals
+            raise RuntimeError('Place not yet determined')
+        self._gold_num = self._country.count_medals("Gold")
+        self._silver_num = self._country.count_medals("Silver")
+        self._bronze_num = self._country.count_medals("Bronze")
+        self._athletes = len(self._country.get_athletes())
+
         self._results = [self._gold_num, self._silver_num,  # Listing results in the required format
                          self._bronze_num, self._athletes]
+        CountryResults._cache.put(self._country, self._results)
         self._processed = True          # Data was processed
         
     def get_results(self) :
@@ -299,44 +421,52 @@ class CountryResults(ProcessResults) :
     def __str__(self) :
         return ""
     
-class DeterminePlaces(ProcessResults) :     ### Unfinished Implementation
-    """Process results to determine the athlete's final places."""
+class DeterminePlaces(ProcessResults) :
+    """Process results to determine the athlete's final places.
+
+    All events given are placed together, with one sort (see ranking).
+    """
 
     _determine_places_counter = 0  # Number of times this command has executed.
 
-    def __init__(self, places) :
+    def __init__(self, events, places=None) :
         """
         Parameters:
-            athlete (Athlete): Athlete for whom we wish to determine their results.
+            events (Event|iterable[Event]): Event, or events, whose places
+                                            are determined.
+            places (int): Number of places awarded in each event, e.g. 3 for
+                          the podium. Other results are marked "unplaced",
+                          except those tied with the last place awarded
+                          (None to place every result).
         """
+        if hasattr(events, "get_athletes") :    # A single Event (or view of one)
+            events = [events]
+        self._events = list(events)
         self._places = places      # Number of places
         self._results = []
         
         self._processed = False     # Boolean. Keeps track of whether data was processed.
 
     def process(self) :
-        """Obtain all the results for this athlete and
-           order them from best to worst placing.
-           If two or more results have the same place they should be ordered
-           by event name in ascending alphabetical order.
+        """Set the place of every athlete's result in the events.
+           Timed events are placed by ascending time and scored events by
+           descending score. Athletes with the same result share a place and
+           are ordered by full name in ascending alphabetical order.
         """
         super().process()
         DeterminePlaces._determine_places_counter += 1
 
-        if Event.is_timed == True:          # If Event is timed, then call respective method
-            self._results.sort(key = self._sort_results_timed)
-        else:                               # If Event is scored, then call respective method
-            self._results.sort(key = self._sort_results_scored) 
+        self._results = []
+        for athletes in determine_places(self._events, self._places) :
+            self._results.extend(athletes)
         self._processed = True          # Data was processed
 
     def get_results(self) :
-        """Obtain the processed results for _athlete.
+        """Obtain the athletes of the events in order of their places.
 
         Return:
-            list[Result]: Ordered list of the _athlete's results.
-                          Sorted from best to worst, based on place in event.
-                          Results with the same place are ordered by event name
-                          in ascending alphabetical order.
+            list[Athlete]: Athletes of each event (in the order the events
+                           were given), from best to worst place.
 
         Raises:
             ValueError: If process has not yet been executed.
@@ -347,38 +477,14 @@ class DeterminePlaces(ProcessResults) :     ### Unfinished Implementation
             raise ValueError('The process has not yet been executed')   # Raise ValueError if not processed
 
     def get_usage_ratio() :
-        """Ratio of usage of the AthleteResults command against all commands.
+        """Ratio of usage of the DeterminePlaces command against all commands.
 
         Return:
-            float: ratio of _athlete_results_counter by _processing_counter.
+            float: ratio of _determine_places_counter by _processing_counter.
         """
         return (DeterminePlaces._determine_places_counter           # Return ratio counter
                 / DeterminePlaces._processing_counter)
     
-    def _sort_results_scored(self, result):     # Sort scores from highest to lowest
-        """How the scored result should be sorted. 
-
-        Parameters:
-            list[Result]: List of scores we wish to list
-
-        Return:
-            list[Result], tuple<int, int> order of second item then by first
-        """
-        v1, v2 = result
-        return v2, v1
-    
-    def _sort_results_timed(self, result):      # Sort time from lowest to highest
-        """How the scored result should be sorted. 
-
-        Parameters:
-            list[Result]: List of scores we wish to list
-
-        Return:
-            list[Result], tuple<int, int> order of second item then by first
-        """
-        v1, v2 = result
-        return v1, v2
-    
     def __str__(self) :
         return ""
     
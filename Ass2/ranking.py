@@ -0,0 +1,189 @@
+"""
+    Batched place determination used in the second assignment for CSSE1001/7030.
+
+    rank: Places of many results in many events, found with one sort, or
+          only the first few places of each event.
+    determine_places: Sets the place of every result in a list of events.
+
+    Results are grouped by event, timed events are ordered by ascending time
+    and scored events by descending score. Equal values share a place (the
+    next place is skipped, e.g. 1, 2, 2, 4), and are ordered by the athlete's
+    full name. If NumPy is installed the sort and the place numbering are
+    vectorized (numpy.lexsort), otherwise a single Python sort is used.
+
+    A result that is not a number (e.g. "DNF") is placed after every number
+    in its event; such results are ordered by their text, as get_result
+    texts sort, and share a place only with the same text.
+
+    When only the first k places are wanted, the best k results of each event
+    are selected with a heap, in O(n log k), and the rest are UNPLACED.
+    Results tied with the k-th result are placed too.
+"""
+
+__author__ = "Minjae Lee"
+__email__ = "m.j.lee@uqconnect.edu.au"
+
+import heapq
+
+from entities import UNPLACED, parse_number
+
+try :
+    import numpy
+except ImportError :        # NumPy is optional; a single Python sort is used instead
+    numpy = None
+
+
+def rank(groups, values, timed, names, places=None, texts=None) :
+    """Return the order and places of results in many events at once.
+
+    Parameters:
+        groups (list[int]): Event number of each result.
+        values (list[float]): Time or score of each result.
+        timed (list[bool]): Whether each event number is timed (else scored).
+        names (list[str]): Athlete's full name of each result, ordering ties.
+        places (int): Number of places awarded in each event (None for all).
+        texts (list[str]): Text of each result that is not a number (None
+                           for numbers, whose value is used), or None if
+                           every result is a number.
+
+    Return:
+        tuple<list[int], list[int]>: Indexes of the results, sorted by event
+            number and then from best to worst (UNPLACED results last, in
+            their original order), and the place of each result (in the
+            original order).
+    """
+    if not groups :
+        return [], []
+    if places is not None :
+        return _rank_top(groups, values, timed, names, places, texts)
+    if numpy is not None :
+        return _rank_numpy(groups, values, timed, names, texts)
+    signed = _signed_values(groups, values, timed, texts)
+    order = sorted(range(len(groups)), key=lambda index : (groups[index], signed[index],
+                                                           names[index]))
+    places = [0] * len(groups)
+    for position, index in enumerate(order) :
+        if position == 0 or groups[index] != groups[order[position - 1]] :
+            group_start = position                  # First result of an event
+        if (position == group_start
+                or signed[index] != signed[order[position - 1]]) :
+            place = position - group_start + 1      # Not tied with the result before
+        places[index] = place
+    return order, places
+
+
+def _signed_values(groups, values, timed, texts) :
+    """Return the value of each result to sort on, smallest first.
+
+    Parameters:
+        See rank.
+
+    Return:
+        list: Time or negative score of each result, or if any result is
+              text, (0, time or negative score) or (1, text).
+    """
+    signed = [value if timed[group] else -value for group, value in zip(groups, values)]
+    if texts is None :
+        return signed
+    return [(0, value) if text is None else (1, text) for value, text in zip(signed, texts)]
+
+
+def _rank_numpy(groups, values, timed, names, texts) :
+    """rank, with the sort and place numbering vectorized with NumPy."""
+    groups = numpy.asarray(groups, dtype=numpy.int64)
+    values = numpy.asarray(values, dtype=numpy.float64)
+    signed = numpy.where(numpy.asarray(timed, dtype=bool)[groups], values, -values)
+    name_ranks = numpy.unique(numpy.asarray(names), return_inverse=True)[1]
+    keys = (name_ranks, signed, groups)     # Last key is sorted on first
+    if texts is not None :                  # Text after every number, by text
+        is_text = numpy.asarray([text is not None for text in texts])
+        signed = numpy.where(is_text, numpy.inf, signed)
+        text_ranks = numpy.unique(numpy.asarray([text or "" for text in texts]),
+                                  return_inverse=True)[1]
+        keys = (name_ranks, text_ranks, signed, is_text, groups)
+    order = numpy.lexsort(keys)
+    sorted_groups = groups[order]
+    sorted_values = signed[order]
+    positions = numpy.arange(len(order))
+    new_group = numpy.ones(len(order), dtype=bool)
+    new_group[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    new_value = new_group.copy()
+    new_value[1:] |= sorted_values[1:] != sorted_values[:-1]
+    if texts is not None :
+        sorted_texts = text_ranks[order]
+        new_value[1:] |= sorted_texts[1:] != sorted_texts[:-1]
+    group_starts = numpy.maximum.accumulate(numpy.where(new_group, positions, 0))
+    value_starts = numpy.maximum.accumulate(numpy.where(new_value, positions, 0))
+    places = numpy.empty(len(order), dtype=numpy.int64)
+    places[order] = value_starts - group_starts + 1
+    return order.tolist(), places.tolist()
+
+
+def _rank_top(groups, values, timed, names, places, texts) :
+    """rank, awarding only the first 'places' places of each event."""
+    signed = _signed_values(groups, values, timed, texts)
+    key = lambda index : (signed[index], names[index])
+    members = {}                # Indexes of the results of each event, in order
+    for index, group in enumerate(groups) :
+        members.setdefault(group, []).append(index)
+    order = []
+    result_places = [UNPLACED] * len(groups)
+    for group in sorted(members) :
+        indexes = members[group]
+        best = heapq.nsmallest(places, indexes, key=key)    # Sorted, best first
+        if best and len(best) < len(indexes) :
+            chosen = set(best)
+            tied = [index for index in indexes
+                    if signed[index] == signed[best[-1]] and index not in chosen]
+            if tied :                       # Tied with the last place awarded
+                best = sorted(best + tied, key=key)
+        for position, index in enumerate(best) :
+            if position == 0 or signed[index] != signed[best[position - 1]] :
+                place = position + 1
+            result_places[index] = place
+        order.extend(best)
+        order.extend([index for index in indexes if result_places[index] == UNPLACED])
+    return order, result_places
+
+
+def determine_places(events, places=None) :
+    """Set the place of every athlete's result in each of the events.
+       Athletes of an event without a result in it are left out.
+
+    Parameters:
+        events (list[Event]): Events whose results are placed.
+        places (int): Number of places awarded in each event, the rest being
+                      UNPLACED (None to place every result). Live standings
+                      of the events are stopped, as they place every result.
+
+    Return:
+        list[list[Athlete]]: Athletes with a result in each event, from best
+                             to worst place (UNPLACED athletes last).
+    """
+    groups, values, texts, names, entries = [], [], [], [], []
+    timed = [event.is_timed() for event in events]
+    for number, event in enumerate(events) :
+        if places is not None :
+            stop_standings = getattr(event, "stop_standings", None)   # Not on views
+            if stop_standings is not None :
+                stop_standings()            # Would renumber the UNPLACED results
+        for athlete in event.get_athletes() :
+            try :
+                result = athlete.get_result(event)
+            except KeyError :
+                continue                    # Entered, but has no result
+            value = parse_number(result.get_result())
+            groups.append(number)
+            values.append(0.0 if value is None else value)
+            texts.append(result.get_result() if value is None else None)
+            names.append(athlete.get_full_name())
+            entries.append((athlete, result))
+    if all([text is None for text in texts]) :
+        texts = None
+    order, result_places = rank(groups, values, timed, names, places, texts)
+    for (athlete, result), place in zip(entries, result_places) :
+        result.set_place(place)
+    ranked = [[] for event in events]
+    for index in order :
+        ranked[groups[index]].append(entries[index][0])
+    return ranked
@@ -0,0 +1,483 @@
+"""
+    Columnar table of results used in the second assignment for CSSE1001/7030.
+
+    ResultTable: Every result of the games in parallel arrays, one row per
+                 result: athlete number, event number, value and place.
+    AthleteView, EventView, ResultView: The read-only Athlete, Event and
+                 Result interfaces, answered from a ResultTable, so that
+                 AthleteResults, EventResults and DeterminePlaces can be
+                 processed on the table.
+
+    A table is a snapshot of the results when it was made. Places set
+    through it (e.g. by DeterminePlaces on an EventView) are kept in the
+    table only, and later changes to the entities are not seen by it.
+
+    The columns are array.array objects. If NumPy is installed they can also
+    be used as NumPy arrays without copying (see ResultTable.as_numpy), and
+    places are determined and medals counted with vectorized operations.
+"""
+
+__author__ = "Minjae Lee"
+__email__ = "m.j.lee@uqconnect.edu.au"
+
+import math
+from array import array
+
+from entities import UNPLACED, UNPLACED_TEXT, parse_number
+from ranking import rank
+
+try :
+    import numpy
+except ImportError :        # NumPy is optional; the arrays are used directly
+    numpy = None
+
+
+NOT_PLACED = 0              # Place of a result whose place is not yet determined
+MEDALS = {1: "Gold", 2: "Silver", 3: "Bronze"}     # Medal of each medal place
+
+
+def format_value(value) :
+    """(str) Text of a time or score, without decimal places if it is a
+             whole number, as in the data files (e.g. "81" or "49.9").
+    """
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+class ResultTable(object) :
+    """Every result of the games, stored column by column (see the module
+       docstring: the table is a snapshot, apart from its places).
+    """
+
+    __slots__ = ("_athletes", "_athlete_numbers", "_events", "_event_numbers",
+                 "_athlete_column", "_event_column", "_values", "_texts",
+                 "_places", "_rows", "_athlete_rows", "_event_rows")
+
+    def __init__(self) :
+        self._athletes = []             # Athlete of each athlete number
+        self._athlete_numbers = {}      # Athlete number of each athlete identifier
+        self._events = []               # Event of each event number
+        self._event_numbers = {}        # Event number of each event name
+        self._athlete_column = array("i")   # Athlete number of each row
+        self._event_column = array("i")     # Event number of each row
+        self._values = array("d")           # Time or score of each row (NaN if text)
+        self._texts = {}                # Text of each row that its value does not give back
+        self._places = array("i")           # Place of each row (NOT_PLACED if none)
+        self._rows = {}                 # Row of each (athlete number, event number)
+        self._athlete_rows = []         # Rows of each athlete number, in the order added
+        self._event_rows = []           # Rows of each event number, in the order added
+
+    @classmethod
+    def from_entities(cls, athletes) :
+        """Return a table of the results of athletes.
+
+        Parameters:
+            athletes (list[Athlete]): Athletes whose results (in each of their
+                                      events) are put in the table. Events in
+                                      which an athlete has no result are left
+                                      out.
+
+        Return:
+            ResultTable: Table with a row for each result.
+        """
+        table = cls()
+        for athlete in athletes :
+            for event in athlete.get_events() :
+                try :
+                    result = athlete.get_result(event)
+                except KeyError :
+                    continue                # Entered, but has no result
+                row = table.add(athlete, event, result.get_result())
+                if result.places_determined() :
+                    place = result.get_place()
+                    table.set_place(row, UNPLACED if place == UNPLACED_TEXT else int(place))
+        return table
+
+    def _athlete_number(self, athlete) :
+        """(int) Number of an athlete in the table, added if it is new."""
+        number = self._athlete_numbers.get(athlete.get_id())
+        if number is None :
+            number = self._athlete_numbers[athlete.get_id()] = len(self._athletes)
+            self._athletes.append(athlete)
+            self._athlete_rows.append(array("i"))
+        return number
+
+    def _event_number(self, event) :
+        """(int) Number of an event in the table, added if it is new."""
+        number = self._event_numbers.get(event.get_name())
+        if number is None :
+            number = self._event_numbers[event.get_name()] = len(self._events)
+            self._events.append(event)
+            self._event_rows.append(array("i"))
+        return number
+
+    def add(self, athlete, event, value) :
+        """Adds an athlete's result in an event, overwriting a previous result.
+
+        Parameters:
+            athlete (Athlete): Athlete who competed.
+            event (Event): Event in which the athlete competed.
+            value (float|str): Time or score the athlete achieved, or text
+                               that is not a number (e.g. "DNF"), which is
+                               placed after every number (see ranking.rank).
+
+        Return:
+            int: Row of the result.
+        """
+        athlete_number = self._athlete_number(athlete)
+        event_number = self._event_number(event)
+        number = parse_number(value) if isinstance(value, str) else float(value)
+        row = self._rows.get((athlete_number, event_number))
+        if row is None :
+            row = self._rows[(athlete_number, event_number)] = len(self._values)
+            self._athlete_column.append(athlete_number)
+            self._event_column.append(event_number)
+            self._values.append(0.0)
+            self._places.append(NOT_PLACED)
+            self._athlete_rows[athlete_number].append(row)
+            self._event_rows[event_number].append(row)
+        self._places[row] = NOT_PLACED
+        self._values[row] = float("nan") if number is None else number
+        if isinstance(value, str) and (number is None or format_value(number) != value) :
+            self._texts[row] = value        # e.g. "DNF", or "82.50" rather than "82.5"
+        else :
+            self._texts.pop(row, None)
+        return row
+        self._places.append(NOT_PLACED)
+        self._athlete_rows[athlete_number].append(row)
+        self._event_rows[event_number].append(row)
+        return row
+
+    def find_row(self, athlete, event) :
+        """Return the row of an athlete's result in an event.
+
+        Parameters:
+            athlete (Athlete): An athlete (or view of one) in the table.
+            event (Event): An event (or view of one) in the table.
+
+        Return:
+            int: Row of the result.
+
+        Raises:
+            KeyError: If the athlete has no result in the event.
+        """
+        return self._rows[(self._athlete_numbers[athlete.get_id()],
+                           self._event_numbers[event.get_name()])]
+
+    def get_value(self, row) :
+        """(float) Time or score of the result in 'row' (NaN if it is text,
+                   see get_text).
+        """
+        return self._values[row]
+
+    def get_text(self, row) :
+        """(str) Text of the result in 'row' as it was added, if it is not a
+                 number or its value would not give it back (e.g. "82.50"),
+                 else None.
+        """
+        return self._texts.get(row)
+
+    def is_text(self, row) :
+        """(bool) True if the result in 'row' is not a number (e.g. "DNF")."""
+        return math.isnan(self._values[row])
+
+    def get_place(self, row) :
+        """(int) Place of the result in 'row' (NOT_PLACED if not yet
+                 determined, UNPLACED if outside the places awarded).
+        """
+        return self._places[row]
+
+    def set_place(self, row, place) :
+        """Sets the place of the result in 'row'.
+
+        Parameters:
+            row (int): Row of a result.
+            place (int): Place the athlete achieved in the event, or UNPLACED.
+        """
+        self._places[row] = place
+
+    def get_athlete(self, row) :
+        """(Athlete) Athlete of the result in 'row'."""
+        return self._athletes[self._athlete_column[row]]
+
+    def get_event(self, row) :
+        """(Event) Event of the result in 'row'."""
+        return self._events[self._event_column[row]]
+
+    def get_athletes(self) :
+        """(list[Athlete]) Every athlete with a result, in the order added."""
+        return list(self._athletes)
+
+    def get_events(self) :
+        """(list[Event]) Every event with a result, in the order added."""
+        return list(self._events)
+
+    def get_athlete_rows(self, athlete) :
+        """(array[int]) Rows of an athlete's results, in the order added."""
+        return array("i", self._athlete_rows[self._athlete_numbers[athlete.get_id()]])
+
+    def get_event_rows(self, event) :
+        """(array[int]) Rows of the results in an event, in the order added."""
+        return array("i", self._event_rows[self._event_numbers[event.get_name()]])
+
+    def determine_places(self, places=None) :
+        """Set the place of every result in the table, for all events at once
+           (see ranking.rank).
+
+        Parameters:
+            places (int): Number of places awarded in each event, the rest
+                          being UNPLACED (None to place every result).
+        """
+        names = [athlete.get_full_name() for athlete in self._athletes]
+        texts = None
+        if self._texts :
+            texts = [self._texts[row] if self.is_text(row) else None
+                     for row in range(len(self))]
+        order, places = rank(self._event_column, self._values,
+                             [event.is_timed() for event in self._events],
+                             [names[number] for number in self._athlete_column],
+                             places, texts)
+        self._places[:] = array("i", places)    # In place, so NumPy views see the places
+
+    def view_athlete(self, athlete) :
+        """(AthleteView) The Athlete interface of an athlete's results in the table."""
+        return AthleteView(self, athlete)
+
+    def view_event(self, event) :
+        """(EventView) The Event interface of the results in an event in the table."""
+        return EventView(self, event)
+
+    def __len__(self) :
+        return len(self._values)
+
+    def get_columns(self) :
+        """(dict[str, array]) The "athlete", "event", "value" and "place"
+                              columns themselves (not copies).
+        """
+        return {"athlete": self._athlete_column, "event": self._event_column,
+                "value": self._values, "place": self._places}
+
+    def as_numpy(self) :
+        """Return the columns as NumPy arrays sharing memory with the table.
+
+        The table cannot have rows added while the arrays exist (array.array
+        raises BufferError), but places set through the arrays are seen by
+        the table.
+
+        Return:
+            dict[str, numpy.ndarray]: See get_columns.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if numpy is None :
+            raise ImportError("NumPy is needed for as_numpy")
+        return dict([(name, numpy.frombuffer(column, dtype=column.typecode))
+                     for name, column in self.get_columns().items()])
+
+    def get_statistics(self, event) :
+        """Return statistics of the results in an event.
+
+        Parameters:
+            event (Event): An event in the table.
+
+        Return:
+            dict: "count", "min", "max" and "mean" of the values that are
+                  numbers (None when there are none).
+        """
+        values = [self._values[row] for row in self.get_event_rows(event)
+                  if not self.is_text(row)]
+        if not values :
+            return {"count": 0, "min": None, "max": None, "mean": None}
+        return {"count": len(values), "min": min(values), "max": max(values),
+                "mean": sum(values) / len(values)}
+
+    def count_medals(self) :
+        """Return the number of gold, silver and bronze medals of each country.
+
+        Return:
+            dict[str, list[int]]: [gold, silver, bronze] of each country code
+                                  with an athlete in the table.
+        """
+        codes = sorted(set([athlete.get_country().get_country_code()
+                            for athlete in self._athletes]))
+        code_numbers = dict([(code, number) for number, code in enumerate(codes)])
+        athlete_countries = array("i", [code_numbers[athlete.get_country().get_country_code()]
+                                        for athlete in self._athletes])
+        counts = [[0, 0, 0] for code in codes]
+        if numpy is not None and len(self) :
+            places = numpy.frombuffer(self._places, dtype="i")
+            countries = numpy.frombuffer(athlete_countries, dtype="i")[
+                numpy.frombuffer(self._athlete_column, dtype="i")]
+            for place in MEDALS :
+                medals = numpy.bincount(countries[places == place], minlength=len(codes))
+                for number, count in enumerate(medals.tolist()) :
+                    counts[number][place - 1] = count
+        else :
+            for athlete_number, place in zip(self._athlete_column, self._places) :
+                if place in MEDALS :
+                    counts[athlete_countries[athlete_number]][place - 1] += 1
+        return dict(zip(codes, counts))
+
+
+class ResultView(object) :
+    """The Result interface of one row of a ResultTable."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row) :
+        """
+        Parameters:
+            table (ResultTable): Table holding the result.
+            row (int): Row of the result.
+        """
+        self._table = table
+        self._row = row
+
+    def get_place(self) :
+        """(str) Place athlete obtained in the final event, or "unplaced" if
+                 it was outside the places awarded.
+
+        Raise:
+            RuntimeError: if places not yet determined.
+        """
+        if not self.places_determined() :
+            raise RuntimeError('Places not yet determined')
+        place = self._table.get_place(self._row)
+        return UNPLACED_TEXT if place == UNPLACED else str(place)
+
+    def set_place(self, place) :
+        """Sets the place that the athlete achieved in the final event.
+
+        Parameters:
+            place (int): Place that athlete achieved in the event.
+        """
+        self._table.set_place(self._row, place)
+
+    def places_determined(self) :
+        """(bool) Has places been determined yet or not."""
+        return self._table.get_place(self._row) != NOT_PLACED
+
+    def get_result(self) :
+        """(str) Time or score athlete achieved in the final event, with the
+                 same text as the Result it was added from (e.g. "82.50").
+                 Values added as numbers are given by format_value.
+        """
+        text = self._table.get_text(self._row)
+        if text is not None :
+            return text
+        return format_value(self._table.get_value(self._row))
+
+    def get_medal(self) :
+        """(str) Medal athlete achieved or empty string if no medal.
+
+        Raise:
+            RuntimeError: if places not yet determined.
+        """
+        if not self.places_determined() :
+            raise RuntimeError('Place not yet determined')
+        return MEDALS.get(self._table.get_place(self._row), "")
+
+    def __eq__(self, other) :
+        return (isinstance(other, ResultView) and other._table is self._table
+                and other._row == self._row)
+
+    def __hash__(self) :
+        return hash((id(self._table), self._row))
+
+    def __str__(self) :
+        return ""
+
+
+class AthleteView(object) :
+    """The Athlete interface of an athlete's results in a ResultTable."""
+
+    __slots__ = ("_table", "_athlete")
+
+    def __init__(self, table, athlete) :
+        """
+        Parameters:
+            table (ResultTable): Table holding the athlete's results.
+            athlete (Athlete): The athlete.
+        """
+        self._table = table
+        self._athlete = athlete
+
+    def get_result(self, event) :
+        """Return the result the athlete obtained in 'event'.
+
+        Parameters:
+            event (Event): Event (or view of one) for which the athlete's
+                           result is wanted.
+
+        Return:
+            ResultView: Athlete's result in 'event'.
+
+        Raises:
+            KeyError: If the athlete has no result in 'event'.
+        """
+        return ResultView(self._table, self._table.find_row(self._athlete, event))
+
+    def get_events(self) :
+        """(list[EventView]) All events in which this athlete has a result."""
+        return [EventView(self._table, self._table.get_event(row))
+                for row in self._table.get_athlete_rows(self._athlete)]
+
+    def get_id(self) :
+        """(str) Athlete's identification number."""
+        return self._athlete.get_id()
+
+    def get_full_name(self) :
+        """(str) Athlete's full name (first + surname)."""
+        return self._athlete.get_full_name()
+
+    def get_country(self) :
+        """(Country) Country delegation to which this Athlete belongs."""
+        return self._athlete.get_country()
+
+    def __eq__(self, other) :
+        return (isinstance(other, AthleteView) and other._table is self._table
+                and other.get_id() == self.get_id())
+
+    def __hash__(self) :
+        return hash(self.get_id())
+
+    def __str__(self) :
+        return ""
+
+
+class EventView(object) :
+    """The Event interface of the results in one event in a ResultTable."""
+
+    __slots__ = ("_table", "_event")
+
+    def __init__(self, table, event) :
+        """
+        Parameters:
+            table (ResultTable): Table holding the event's results.
+            event (Event): The event.
+        """
+        self._table = table
+        self._event = event
+
+    def is_timed(self) :
+        """(bool) True if event is timed, False if event is scored."""
+        return self._event.is_timed()
+
+    def get_name(self) :
+        """(str) Official name of this event."""
+        return self._event.get_name()
+
+    def get_athletes(self) :
+        """(list[AthleteView]) All athletes with a result in this event."""
+        return [AthleteView(self._table, self._table.get_athlete(row))
+                for row in self._table.get_event_rows(self._event)]
+
+    def __eq__(self, other) :
+        return (isinstance(other, EventView) and other._table is self._table
+                and other.get_name() == self.get_name())
+
+    def __hash__(self) :
+        return hash(self.get_name())
+
+    def __str__(self) :
+        return ""
@@ -0,0 +1,301 @@
+"""
+Tests of the entity classes, beyond those in sample_tests_a2.
+
+Run from the Ass2 directory with:
+    python -m unittest test_entities
+"""
+
+__author__ = "Minjae Lee"
+__email__ = "m.j.lee@uqconnect.edu.au"
+
+import gc
+import os
+import random
+import tempfile
+import tracemalloc
+import unittest
+
+from entities import Athlete, Result, Event, Country, ManagedDictionary
+from entities import UNPLACED, parse_result_value
+from entities import load_countries, load_athletes, load_events, load_results, read_rows
+from ranking import determine_places
+
+
+class ResultValueTests(unittest.TestCase) :
+    """Results stored as numbers where that does not change their text."""
+
+    def test_numbers_are_stored_as_numbers(self) :
+        self.assertEqual(parse_result_value("92"), 92)
+        self.assertEqual(parse_result_value("73.96"), 73.96)
+        self.assertEqual(parse_result_value(35.5), 35.5)
+
+    def test_get_result_gives_back_the_text(self) :
+        for text in ("92", "73.96", "82.50", "007", "1e3", "DNS", "-3", "0.10") :
+            self.assertEqual(Result(text).get_result(), text)
+
+
+def medal_of(key, result) :
+    """(str) Medal of a result ("" for none, or None if its place is not set)."""
+    return result.get_medal() if result.places_determined() else None
+
+
+class IndexTests(unittest.TestCase) :
+    """Secondary indexes of a ManagedDictionary."""
+
+    def setUp(self) :
+        self.results = [Result(str(80 - identifier)) for identifier in range(3)]
+        self.collection = ManagedDictionary({"medal": medal_of})
+        for identifier, result in enumerate(self.results) :
+            self.collection.add_item(identifier, result)
+
+    def test_reindexed_items_follow_changes(self) :
+        self.assertEqual(self.collection.count_items("medal", None), 3)
+        self.results[0].set_place(1)
+        self.results[1].set_place(UNPLACED)
+        self.assertEqual(self.collection.count_items("medal", None), 3)    # Not reindexed yet
+        self.collection.reindex(0)
+        self.collection.reindex(1)
+        self.assertEqual(self.collection.find_items("medal", "Gold"), [self.results[0]])
+        self.assertEqual(self.collection.find_items("medal", ""), [self.results[1]])
+        self.assertEqual(sorted(self.collection.get_index_values("medal"), key=str),
+                         ["", "Gold", None])
+
+    def test_replaced_item_is_unindexed(self) :
+        self.results[0].set_place(1)
+        self.collection.add_item(0, self.results[0])
+        self.collection.add_item(0, Result("50"))
+        self.assertEqual(self.collection.count_items("medal", "Gold"), 0)
+        self.assertEqual(self.collection.count_items("medal", None), 3)
+
+
+class MedalCountTests(unittest.TestCase) :
+    """Medals counted by athletes and countries as places are set."""
+
+    def setUp(self) :
+        self.countries = [Country("Australia", "AUS"), Country("Canada", "CAN")]
+        self.events = [Event("Moguls", False, []), Event("Aerials", False, [])]
+        self.athletes = [Athlete(str(identifier), "First", "Last", self.countries[0])
+                         for identifier in range(3)]
+
+    def scan(self, country) :
+        """(list[int]) Golds, silvers, bronzes, results without a medal and
+                       undetermined results of 'country', from every athlete's
+                       events, as CountryResults used to count them.
+        """
+        medals = [medal_of(None, athlete.get_result(event))
+                  for athlete in country.get_athletes() for event in athlete.get_events()]
+        return [medals.count(medal) for medal in ("Gold", "Silver", "Bronze", "", None)]
+
+    def counts(self, country) :
+        """(list[int]) Counts of 'country', in the same order as scan."""
+        return [country.count_medals(medal) for medal in ("Gold", "Silver", "Bronze", "", None)]
+
+    def assertCountsMatchScan(self) :
+        for country in self.countries :
+            self.assertEqual(self.counts(country), self.scan(country))
+
+    def test_counts_follow_places(self) :
+        self.countries[0].add_athletes(self.athletes)
+        for number, athlete in enumerate(self.athletes) :
+            athlete.add_event(self.events[0])
+            athlete.add_result(self.events[0], Result(str(80 - number)))
+        self.assertEqual(self.counts(self.countries[0]), [0, 0, 0, 0, 3])
+        for place, athlete in enumerate(self.athletes, 1) :
+            athlete.get_result(self.events[0]).set_place(place)
+            self.assertCountsMatchScan()
+        self.assertEqual(self.counts(self.countries[0]), [1, 1, 1, 0, 0])
+        self.athletes[0].get_result(self.events[0]).set_place(UNPLACED)
+        self.assertEqual(self.counts(self.countries[0]), [0, 1, 1, 1, 0])
+
+    def test_counts_match_scan(self) :
+        first, second, third = self.athletes
+        self.countries[0].add_athlete(first)
+        self.countries[1].add_athletes([second, third])     # Not their own country
+        first.add_result(self.events[0], Result("80"))      # Before the event is added
+        first.add_events(self.events)
+        first.add_result(self.events[1], Result("70"))
+        second.add_event(self.events[0])
+        second.add_event(self.events[0])                    # Counted twice, as scanned
+        second.add_result(self.events[0], Result("75"))
+        self.assertCountsMatchScan()
+        for athlete in self.athletes[:2] :
+            for event in athlete.get_events() :
+                athlete.get_result(event).set_place(1)
+        self.assertCountsMatchScan()
+        self.assertEqual(self.counts(self.countries[1]), [2, 0, 0, 0, 0])
+
+    def test_replaced_result_is_not_counted(self) :
+        self.countries[0].add_athlete(self.athletes[0])
+        self.athletes[0].add_event(self.events[0])
+        replaced = Result("80")
+        self.athletes[0].add_result(self.events[0], replaced)
+        self.athletes[0].add_result(self.events[0], Result("85"))
+        replaced.set_place(1)
+        self.assertEqual(self.counts(self.countries[0]), [0, 0, 0, 0, 1])
+        self.assertCountsMatchScan()
+
+
+# Bytes allocated per result added, as measured by FootprintTests.result_bytes,
+# when the entities were first given __slots__. Results are not to grow past it.
+SLOTTED_RESULT_BYTES = 109.6
+
+
+class FootprintTests(unittest.TestCase) :
+    """Memory allocated for each result."""
+
+    def allocated(self, athletes) :
+        """Return the bytes allocated to add five results to each of a number
+           of athletes, whose countries and events are already set up.
+
+        Parameters:
+            athletes (int): Number of athletes, a multiple of 100.
+
+        Return:
+            tuple<int, int>: Number of results added, and bytes allocated.
+        """
+        countries = [Country("Country " + str(number), "C" + str(number))
+                     for number in range(athletes // 20)]
+        events = [Event("Event " + str(number), number % 2 == 0, [])
+                  for number in range(athletes // 10)]
+        entries = []
+        for number in range(athletes) :
+            athlete = Athlete(str(number), "First", "Surname", countries[number % len(countries)])
+            athlete.get_country().add_athlete(athlete)
+            for event in events[number % (len(events) // 5)::len(events) // 5] :
+                event.add_athlete(athlete)
+                athlete.add_event(event)
+                entries.append((athlete, event, "{0:.2f}".format(10 + len(entries) * 0.37)))
+        gc.collect()                    # Nothing left over is freed while tracing
+        tracemalloc.start()
+        try :
+            start = tracemalloc.get_traced_memory()[0]
+            for athlete, event, value in entries :
+                athlete.add_result(event, Result(value))
+            return len(entries), tracemalloc.get_traced_memory()[0] - start
+        finally :
+            tracemalloc.stop()
+
+    def result_bytes(self) :
+        """(float) Bytes allocated per result, leaving out allocations that
+                   do not grow with the number of results (e.g. free lists).
+        """
+        fewer, fewer_bytes = self.allocated(200)
+        more, more_bytes = self.allocated(400)
+        return (more_bytes - fewer_bytes) / (more - fewer)
+
+    def test_results_are_no_larger_than_when_slotted(self) :
+        self.assertLessEqual(self.result_bytes(), SLOTTED_RESULT_BYTES)
+
+
+class StandingsTests(unittest.TestCase) :
+    """Live standings of an event, kept as results are added."""
+
+    def setUp(self) :
+        self.country = Country("Australia", "AUS")
+        self.event = Event("Luge", True, [])
+        self.athletes = [Athlete(str(number), "First", "Athlete " + str(number), self.country)
+                         for number in range(5)]
+        for athlete in self.athletes :
+            self.country.add_athlete(athlete)
+            self.event.add_athlete(athlete)
+            athlete.add_event(self.event)
+
+    def places(self, count=5) :
+        """(list[str]) Place of the result of each of the first 'count' athletes."""
+        return [athlete.get_result(self.event).get_place()
+                for athlete in self.athletes[:count]]
+
+    def test_results_placed_as_added(self) :
+        self.event.start_standings()
+        first, second, third, fourth, fifth = self.athletes
+        self.assertEqual(first.add_result(self.event, Result(50.0)), [first])
+        self.assertEqual(second.add_result(self.event, Result(49.0)), [second, first])
+        self.assertEqual(third.add_result(self.event, Result(49.0)), [third, first])
+        self.assertEqual(fourth.add_result(self.event, Result(51.0)), [fourth])
+        self.assertEqual(fifth.add_result(self.event, Result(48.0)),
+                         [fifth, second, third, first, fourth])
+        self.assertEqual(self.places(), ["4", "2", "2", "5", "1"])
+        self.assertEqual(self.event.get_standings(), [fifth, second, third, first, fourth])
+
+    def test_replaced_result_moves_others_up(self) :
+        for number, athlete in enumerate(self.athletes) :
+            athlete.add_result(self.event, Result(40.0 + number))
+        self.event.start_standings()
+        changed = self.athletes[0].add_result(self.event, Result(60.0))
+        self.assertEqual(changed, self.athletes)
+        self.assertEqual(self.places(), ["5", "1", "2", "3", "4"])
+
+    def test_unplaced_results_are_placed(self) :
+        for number, athlete in enumerate(self.athletes[:3]) :
+            athlete.add_result(self.event, Result(40.0 + number))
+        determine_places([self.event], places=1)
+        self.event.start_standings()
+        self.assertEqual(self.places(3), ["1", "2", "3"])
+        self.athletes[0].get_result(self.event).set_place(UNPLACED)
+        self.athletes[3].add_result(self.event, Result(30.0))
+        self.assertEqual(self.places(4), ["2", "3", "4", "1"])
+
+    def test_text_after_numbers(self) :
+        self.event.start_standings()
+        first, second, third = self.athletes[:3]
+        first.add_result(self.event, Result("DNF"))
+        second.add_result(self.event, Result(49.0))
+        self.assertEqual(third.add_result(self.event, Result(50.0)), [third, first])
+        self.assertEqual(self.places(3), ["3", "1", "2"])
+        self.assertEqual(self.event.get_standings(), [second, third, first])
+
+    def test_medals_follow_standings(self) :
+        self.event.start_standings()
+        for number, athlete in enumerate(self.athletes) :
+            athlete.add_result(self.event, Result(50.0 - number))  # Each takes the lead
+        self.assertEqual(self.country.count_medals("Gold"), 1)
+        self.assertEqual(self.athletes[4].get_result(self.event).get_medal(), "Gold")
+        self.assertEqual(self.country.count_medals(""), 2)
+
+    def test_same_places_as_sorting(self) :
+        rng = random.Random(1)
+        self.event.start_standings()
+        for athlete in rng.choices(self.athletes, k=20) :
+            athlete.add_result(self.event, Result(rng.choice([48.0, 49.0, 50.0, 51.0])))
+        live = self.places()
+        standings = self.event.get_standings()
+        self.assertEqual(determine_places([self.event]), [standings])
+        self.assertEqual(self.places(), live)
+
+
+class LoaderTests(unittest.TestCase) :
+    """Creating the entities from the rows of the data files."""
+
+    def test_scored_events_are_not_timed(self) :
+        events = load_events([["Men's Aerials", "SCORED"], ["Men's Luge", "TIMED"]])
+        self.assertFalse(events["Men's Aerials"].is_timed())
+        self.assertTrue(events["Men's Luge"].is_timed())
+
+    def test_read_rows_skips_blank_lines(self) :
+        with tempfile.TemporaryDirectory() as directory :
+            file_name = os.path.join(directory, "countries.csv")
+            with open(file_name, "w") as data_file :
+                data_file.write('AUS,Australia\n\nKOR,"Korea, Republic of"\n\n')
+            self.assertEqual(read_rows(file_name),
+                             [["AUS", "Australia"], ["KOR", "Korea, Republic of"]])
+
+    def test_entities_are_linked(self) :
+        countries = load_countries([["AUS", "Australia"], ["CAN", "Canada"]])
+        athletes = load_athletes([["1", "Rohan", "Chapman-Davies", "AUS"],
+                                  ["2", "Mikael", "Kingsbury", "CAN"]], countries)
+        events = load_events([["Men's Moguls", "SCORED"]])
+        results = load_results([["1", "Men's Moguls", "73.96"],
+                                ["2", "Men's Moguls", "82.57"]], athletes, events)
+        moguls = events["Men's Moguls"]
+        self.assertEqual(countries["CAN"].get_athletes(), [athletes["2"]])
+        self.assertEqual(athletes["1"].get_country(), countries["AUS"])
+        self.assertEqual(moguls.get_athletes(), [athletes["1"], athletes["2"]])
+        self.assertEqual(athletes["2"].get_events(), [moguls])
+        self.assertEqual(athletes["2"].get_result(moguls).get_result(), "82.57")
+        self.assertEqual([key for key, result in results],
+                         [("1", "Men's Moguls"), ("2", "Men's Moguls")])
+        self.assertRaises(KeyError, load_athletes, [["3", "A", "B", "XXX"]], countries)
+
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Tests of the processing classes, beyond those in sample_tests_a2.
+
+Run from the Ass2 directory with:
+    python -m unittest test_processing
+"""
+
+__author__ = "Minjae Lee"
+__email__ = "m.j.lee@uqconnect.edu.au"
+
+import unittest
+
+from entities import Athlete, Result, Event, Country
+from processing import AthleteResults, CountryResults, DeterminePlaces, EventResults
+
+
+def make_event(name, timed, values, countries) :
+    """ Create an event with an athlete for each value, competing for each
+        country in turn.
+
+        Parameters:
+            name (str): Name of the event.
+            timed (bool): Is the event timed (or scored).
+            values (list[float]): Result of each athlete.
+            countries (list[Country]): Countries the athletes compete for.
+
+        Return:
+            Event: The event, with its athletes and results.
+    """
+    event = Event(name, timed, [])
+    for number, value in enumerate(values) :
+        country = countries[number % len(countries)]
+        athlete = Athlete(name + str(number), "First", "Athlete " + str(number), country)
+        country.add_athlete(athlete)
+        event.add_athlete(athlete)
+        athlete.add_event(event)
+        athlete.add_result(event, Result(value))
+    return event
+
+
+class CountryResultsTests(unittest.TestCase) :
+    """Medal counts of a country's delegation."""
+
+    def setUp(self) :
+        self.countries = [Country("Australia", "AUS"), Country("Canada", "CAN")]
+        self.events = [make_event("Luge", True, [50.1, 49.9, 51.3, 48.2], self.countries),
+                       make_event("Moguls", False, [81.0, 77.5, 90.2], self.countries)]
+
+    def results(self, country) :
+        """(list[int]) Processed results of 'country'."""
+        country_results = CountryResults(country)
+        country_results.process()
+        return country_results.get_results()
+
+    def scan(self, country) :
+        """(list[int]) Results of 'country', counted from every athlete's medals."""
+        medals = [athlete.get_result(event).get_medal()
+                  for athlete in country.get_athletes() for event in athlete.get_events()]
+        return [medals.count("Gold"), medals.count("Silver"), medals.count("Bronze"),
+                len(country.get_athletes())]
+
+    def test_places_not_determined(self) :
+        self.assertRaises(RuntimeError, CountryResults(self.countries[0]).process)
+
+    def test_counts_match_medals(self) :
+        DeterminePlaces(self.events).process()
+        self.assertEqual(self.results(self.countries[0]), [1, 1, 1, 4])
+        for country in self.countries :
+            self.assertEqual(self.results(country), self.scan(country))
+
+    def test_places_set_outside_determine_places(self) :
+        DeterminePlaces(self.events).process()
+        athlete = self.countries[1].get_athletes()[0]
+        athlete.get_result(self.events[0]).set_place(1)     # e.g. after an appeal
+        for country in self.countries :
+            self.assertEqual(self.results(country), self.scan(country))
+
+
+class ResultsCacheTests(unittest.TestCase) :
+    """Cached results are recomputed after every change they depend on."""
+
+    def setUp(self) :
+        self.country = Country("Australia", "AUS")
+        self.other_country = Country("Canada", "CAN")
+        self.events = [make_event("Luge", True, [50.1, 49.9, 51.3], [self.country]),
+                       make_event("Moguls", False, [81.0, 77.5], [self.country])]
+        DeterminePlaces(self.events).process()
+        self.athlete = self.country.get_athletes()[0]
+        self.newcomer = Athlete("99", "New", "Comer", self.country)
+
+    def assertUpToDate(self, command, entity) :
+        """Check that 'command' gives the same results from its cache as
+           when processed from scratch.
+        """
+        cached = command(entity)
+        cached.process()
+        command._cache.clear()
+        fresh = command(entity)
+        fresh.process()
+        self.assertEqual(cached.get_results(), fresh.get_results())
+
+    def assertChangeSeen(self, command, entity, change) :
+        """Process 'command' on 'entity', make a change and check that the
+           results processed again are up to date.
+        """
+        command(entity).process()
+        change()
+        self.assertUpToDate(command, entity)
+
+    def placed_result(self, value, place) :
+        """(Result) A result with its place already set."""
+        result = Result(value)
+        result.set_place(place)
+        return result
+
+    def test_athlete_add_result(self) :
+        luge = self.events[0]
+        for command, entity in ((AthleteResults, self.athlete), (EventResults, luge),
+                                (CountryResults, self.country)) :
+            self.assertChangeSeen(command, entity, lambda :
+                self.athlete.add_result(luge, self.placed_result(40.0, 1)))
+
+    def test_athlete_add_event(self) :
+        # A result added before the event, so only add_event changes the results
+        moguls = self.events[1]
+        self.athlete.add_result(moguls, self.placed_result(99.0, 1))
+        self.assertChangeSeen(AthleteResults, self.athlete,
+                              lambda : self.athlete.add_event(moguls))
+
+    def test_athlete_add_events(self) :
+        moguls = self.events[1]
+        self.athlete.add_result(moguls, self.placed_result(99.0, 1))
+        self.assertChangeSeen(AthleteResults, self.athlete,
+                              lambda : self.athlete.add_events(iter([moguls])))
+
+    def test_add_event_changes_event_and_country(self) :
+        for entity in (self.events[1], self.country) :
+            version = entity.get_version()
+            self.athlete.add_event(self.events[1])
+            self.athlete.add_events([self.events[1]])
+            self.assertEqual(entity.get_version(), version + 2)
+
+    def test_event_add_athlete(self) :
+        luge = self.events[0]
+        self.newcomer.add_event(luge)
+        self.newcomer.add_result(luge, self.placed_result(60.0, 4))
+        self.assertChangeSeen(EventResults, luge, lambda : luge.add_athlete(self.newcomer))
+
+    def test_event_add_athletes(self) :
+        luge = self.events[0]
+        self.newcomer.add_event(luge)
+        self.newcomer.add_result(luge, self.placed_result(60.0, 4))
+        self.assertChangeSeen(EventResults, luge, lambda : luge.add_athletes([self.newcomer]))
+
+    def test_country_add_athlete(self) :
+        self.newcomer.add_result(self.events[0], self.placed_result(30.0, 1))
+        self.assertChangeSeen(CountryResults, self.other_country,
+                              lambda : self.other_country.add_athlete(self.newcomer))
+
+    def test_country_add_athletes(self) :
+        self.newcomer.add_result(self.events[0], self.placed_result(30.0, 1))
+        self.assertChangeSeen(CountryResults, self.other_country,
+                              lambda : self.other_country.add_athletes([self.newcomer]))
+
+    def test_result_set_place(self) :
+        luge = self.events[0]
+        result = self.athlete.get_result(luge)
+        for command, entity in ((AthleteResults, self.athlete), (EventResults, luge),
+                                (CountryResults, self.country)) :
+            self.assertChangeSeen(command, entity, lambda : result.set_place(1))
+            self.assertChangeSeen(command, entity, lambda : result.set_place(3))
+
+    def test_unchanged_results_are_reused(self) :
+        CountryResults(self.country).process()
+        hits = CountryResults._cache.get_hits()
+        self.assertUpToDate(CountryResults, self.country)
+        self.assertEqual(CountryResults._cache.get_hits(), hits + 1)
+
+
+if __name__ == "__main__" :
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Tests of batched place determination.
+
+Run from the Ass2 directory with:
+    python -m unittest test_ranking
+"""
+
+__author__ = "Minjae Lee"
+__email__ = "m.j.lee@uqconnect.edu.au"
+
+import unittest
+
+from entities import Athlete, Result, Event, Country, UNPLACED
+from processing import DeterminePlaces
+from ranking import rank, determine_places
+
+
+class RankTests(unittest.TestCase) :
+    """Places of results in many events at once."""
+
+    def test_timed_and_scored_events(self) :
+        groups = [0, 1, 0, 1, 0, 1]
+        values = [50.0, 7.5, 49.0, 9.0, 50.0, 7.5]
+        names = ["Cid", "Ann", "Bea", "Dan", "Abe", "Ben"]
+        order, places = rank(groups, values, [True, False], names)
+        # Ties share a place, skip the next, and are ordered by name
+        self.assertEqual(order, [2, 4, 0, 3, 1, 5])
+        self.assertEqual(places, [2, 2, 1, 1, 2, 2])
+
+    def test_first_places_only(self) :
+        groups = [0] * 5
+        values = [3.0, 1.0, 2.0, 2.0, 4.0]
+        names = ["A", "B", "C", "D", "E"]
+        order, places = rank(groups, values, [True], names, places=2)
+        # Results tied with the last place awarded are placed too
+        self.assertEqual(places, [UNPLACED, 1, 2, 2, UNPLACED])
+        self.assertEqual(order, [1, 2, 3, 0, 4])
+        self.assertEqual(rank(groups, values, [True], names)[1], [4, 1, 2, 2, 5])
+
+    def test_text_after_numbers(self) :
+        groups = [0] * 5
+        values = [0.0, 7.5, 0.0, 9.0, 0.0]
+        texts = ["DNS", None, "DNF", None, "DNF"]
+        names = ["A", "B", "C", "D", "E"]
+        order, places = rank(groups, values, [False], names, texts=texts)
+        # Text is ordered by text, and shares a place only with the same text
+        self.assertEqual(order, [3, 1, 2, 4, 0])
+        self.assertEqual(places, [5, 2, 3, 1, 3])
+        self.assertEqual(rank(groups, values, [False], names, 3, texts)[1],
+                         [UNPLACED, 2, 3, 1, 3])
+
+    def test_no_results(self) :
+        self.assertEqual(rank([], [], [], []), ([], []))
+
+
+class DeterminePlacesTests(unittest.TestCase) :
+    """Setting the places of events' results."""
+
+    def setUp(self) :
+        country = Country("Australia", "AUS")
+        self.events = [Event("Luge", True, []), Event("Moguls", False, [])]
+        self.athletes = [Athlete(str(number), "First", "Athlete " + str(number), country)
+                         for number in range(3)]
+        for event in self.events :
+            for number, athlete in enumerate(self.athletes) :
+                event.add_athlete(athlete)
+                athlete.add_event(event)
+                if number :                 # The first athlete has no results
+                    athlete.add_result(event, Result(50 + number))
+
+    def test_athletes_without_results_are_left_out(self) :
+        ranked = determine_places(self.events)
+        self.assertEqual(ranked, [self.athletes[1:], self.athletes[:0:-1]])
+        self.assertEqual(self.athletes[2].get_result(self.events[1]).get_place(), "1")
+
+    def test_first_places_awarded(self) :
+        newcomer = Athlete("9", "First", "Athlete 9", self.athletes[0].get_country())
+        self.events[0].add_athlete(newcomer)
+        newcomer.add_result(self.events[0], Result(51))     # Tied for first
+        determine = DeterminePlaces(self.events, places=1)
+        determine.process()
+        self.assertEqual([athlete.get_result(self.events[0]).get_place()
+                          for athlete in self.athletes[1:] + [newcomer]],
+                         ["1", "unplaced", "1"])
+        self.assertEqual(self.athletes[1].get_result(self.events[1]).get_medal(), "")
+        self.assertEqual(determine.get_results()[:3],
+                         [self.athletes[1], newcomer, self.athletes[2]])
+
+    def test_results_that_are_not_numbers(self) :
+        self.athletes[0].add_result(self.events[0], Result("DNF"))
+        ranked = determine_places(self.events)
+        self.assertEqual(ranked[0], [self.athletes[1], self.athletes[2], self.athletes[0]])
+        self.assertEqual(self.athletes[0].get_result(self.events[0]).get_place(), "3")
+
+    def test_first_places_stop_standings(self) :
+        luge = self.events[0]
+        luge.start_standings()
+        determine_places(self.events, places=1)
+        self.assertFalse(luge.has_standings())
+        newcomer = Athlete("9", "First", "Athlete 9", self.athletes[0].get_country())
+        luge.add_athlete(newcomer)
+        newcomer.add_result(luge, Result(60))
+        self.assertEqual(self.athletes[2].get_result(luge).get_place(), "unplaced")
+        self.assertFalse(newcomer.get_result(luge).places_determined())
+
+    def test_events_from_any_iterable(self) :
+        events = dict([(event.get_name(), event) for event in self.events])
+        for given in (events.values(), iter(self.events), self.events[0]) :
+            DeterminePlaces(given).process()
+        for event in self.events :
+            for athlete in self.athletes[1:] :
+                self.assertTrue(athlete.get_result(event).places_determined())
+
+
+if __name__ == "__main__" :
+    unittest.main()
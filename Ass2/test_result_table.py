@@ -0,0 +1,123 @@
+"""
+Tests of the columnar result table and its views.
+
+Run from the Ass2 directory with:
+    python -m unittest test_result_table
+"""
+
+__author__ = "Minjae Lee"
+__email__ = "m.j.lee@uqconnect.edu.au"
+
+import unittest
+
+from entities import Athlete, Result, Event, Country
+from processing import AthleteResults, CountryResults, DeterminePlaces, EventResults
+from result_table import ResultTable
+
+
+class ResultTableTests(unittest.TestCase) :
+    """The processing classes on a table's views, against the entities."""
+
+    def setUp(self) :
+        self.countries = [Country("Australia", "AUS"), Country("Canada", "CAN")]
+        self.events = [Event("Luge", True, []), Event("Moguls", False, [])]
+        self.athletes = []
+        values = [("50.1", "81"), ("49.9", "77.5"), ("51.3", "90.2"), ("49.9", "81")]
+        for number, (time, score) in enumerate(values) :
+            country = self.countries[number % 2]
+            athlete = Athlete(str(number), "First", "Athlete " + str(number), country)
+            country.add_athlete(athlete)
+            self.athletes.append(athlete)
+            for event, value in zip(self.events, (time, score)) :
+                event.add_athlete(athlete)
+                athlete.add_event(event)
+                athlete.add_result(event, Result(value))
+        self.table = ResultTable.from_entities(self.athletes)
+
+    def places(self, results) :
+        """(list[tuple<str, str>]) Result and place of each result."""
+        return [(result.get_result(), result.get_place()) for result in results]
+
+    def processed(self, command, entity) :
+        """(list) Results of 'command' processed on 'entity'."""
+        processing = command(entity)
+        processing.process()
+        return processing.get_results()
+
+    def test_events_without_results_are_left_out(self) :
+        athlete = Athlete("9", "First", "Athlete 9", self.countries[0])
+        for event in self.events :
+            athlete.add_event(event)
+        athlete.add_result(self.events[0], Result(48.0))
+        table = ResultTable.from_entities(self.athletes + [athlete])
+        self.assertEqual(len(table), 9)
+        view = table.view_athlete(athlete)
+        self.assertEqual([event.get_name() for event in view.get_events()], ["Luge"])
+
+    def test_processing_on_views(self) :
+        views = [self.table.view_event(event) for event in self.events]
+        ranked = self.processed(DeterminePlaces, views)
+        DeterminePlaces(self.events).process()
+        self.assertEqual([athlete.get_id() for athlete in ranked],
+                         [athlete.get_id() for athlete in
+                          self.processed(DeterminePlaces, self.events)])
+        for view, event in zip(views, self.events) :
+            self.assertEqual(self.places(self.processed(EventResults, view)),
+                             self.places(self.processed(EventResults, event)))
+        for athlete in self.athletes :
+            self.assertEqual(
+                self.places(self.processed(AthleteResults, self.table.view_athlete(athlete))),
+                self.places(self.processed(AthleteResults, athlete)))
+        for country in self.countries :
+            self.assertEqual(self.table.count_medals()[country.get_country_code()],
+                             self.processed(CountryResults, country)[:3])
+
+    def test_single_event_view(self) :
+        view = self.table.view_event(self.events[0])
+        DeterminePlaces(view).process()
+        self.assertEqual(self.places(self.processed(EventResults, view)),
+                         [("49.9", "1"), ("49.9", "1"), ("50.1", "3"), ("51.3", "4")])
+
+    def test_table_places_match_entities(self) :
+        self.table.determine_places()
+        DeterminePlaces(self.events).process()
+        for athlete in self.athletes :
+            view = self.table.view_athlete(athlete)
+            for event in self.events :
+                self.assertEqual(view.get_result(event).get_place(),
+                                 athlete.get_result(event).get_place())
+
+    def test_table_is_a_snapshot(self) :
+        DeterminePlaces(self.table.view_event(self.events[0])).process()
+        self.assertFalse(self.athletes[0].get_result(self.events[0]).places_determined())
+        self.athletes[3].add_result(self.events[1], Result(60.0))
+        self.assertEqual(self.table.view_athlete(self.athletes[3]).get_result(
+                         self.events[1]).get_result(), "81")
+        self.assertFalse(hasattr(self.table.view_athlete(self.athletes[0]), "add_result"))
+
+    def test_results_that_are_not_numbers(self) :
+        self.athletes[1].add_result(self.events[0], Result("DNF"))
+        self.athletes[2].add_result(self.events[0], Result("DNS"))
+        table = ResultTable.from_entities(self.athletes)
+        table.determine_places()
+        DeterminePlaces(self.events).process()
+        for athlete in self.athletes :
+            self.assertEqual(self.places([table.view_athlete(athlete).get_result(self.events[0])]),
+                             self.places([athlete.get_result(self.events[0])]))
+        self.assertEqual(self.places(self.processed(EventResults, self.events[0])),
+                         [("49.9", "1"), ("50.1", "2"), ("DNF", "3"), ("DNS", "4")])
+        self.assertEqual(table.get_statistics(self.events[0])["count"], 2)
+
+    def test_results_keep_their_text(self) :
+        for value in ("82.50", "007", "81.0", 81.0, 1e20) :
+            self.athletes[0].add_result(self.events[1], Result(value))
+            result = self.athletes[0].get_result(self.events[1])
+            table = ResultTable.from_entities(self.athletes)
+            view = table.view_athlete(self.athletes[0]).get_result(self.events[1])
+            self.assertEqual(view.get_result(), result.get_result())
+        self.assertEqual(self.table.view_athlete(self.athletes[1]).get_result(
+                         self.events[1]).get_result(), "77.5")
+
+
+if __name__ == "__main__" :
+    unittest.main()